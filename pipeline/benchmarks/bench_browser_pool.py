@@ -0,0 +1,83 @@
+"""Benchmark: cold browser per call vs the shared warm pool (utils/crawler.py).
+
+Needs Crawl4AI and its browser.
+
+    python pipeline/benchmarks/bench_browser_pool.py --steps 4 --urls 20
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["CRAWL_CACHE"] = "0"
+os.environ.setdefault("CRAWL_PER_DOMAIN_DELAY", "0")
+os.environ["CRAWL_FAST_PATH"] = "0"  # fixture pages are static; make every page render
+
+from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+from benchmarks.fixtures import slow_server
+from utils.crawler import _render, get_service
+from utils.scheduler import sliding_window
+
+
+async def cold_step(urls: list[str], concurrency: int) -> None:
+    """One step the old way: launch a browser, crawl, tear it down."""
+    async with AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False)) as crawler:
+        async for _ in sliding_window(urls, lambda url: _render(crawler, url, 30), concurrency):
+            pass
+
+
+async def cold_single(url: str) -> None:
+    async with AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False)) as crawler:
+        await _render(crawler, url, 30)
+
+
+async def warm_step(urls: list[str], concurrency: int) -> None:
+    service = get_service()
+    async for _ in sliding_window(urls, lambda url: service.fetch(url, 30), concurrency):
+        pass
+
+
+async def warm_single(url: str) -> None:
+    await get_service().fetch(url, 30)
+
+
+def run(step, single, base_url: str, args) -> tuple[float, float]:
+    """Return (total seconds for all steps, mean seconds per single-URL call)."""
+    started = time.perf_counter()
+    for s in range(args.steps):
+        urls = [f"{base_url}/step{s}-site{i}?delay={args.delay}" for i in range(args.urls)]
+        asyncio.run(step(urls, args.concurrency))
+    total = time.perf_counter() - started
+    started = time.perf_counter()
+    for i in range(args.singles):
+        asyncio.run(single(f"{base_url}/single-{i}?delay={args.delay}"))
+    return total, (time.perf_counter() - started) / max(1, args.singles)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=4)
+    parser.add_argument("--urls", type=int, default=20, help="URLs per step")
+    parser.add_argument("--singles", type=int, default=5, help="Single-URL crawl_url calls")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds per page fetch")
+    args = parser.parse_args()
+
+    with slow_server() as base_url:
+        print(f"{args.steps} steps x {args.urls} URLs, {args.singles} single-URL calls")
+        cold, cold_one = run(cold_step, cold_single, base_url, args)
+        print(f"  cold browsers  steps {cold:6.2f}s  single URL {cold_one:5.2f}s")
+        asyncio.run(warm_single(f"{base_url}/warmup"))  # pool start-up, paid once per process
+        warm, warm_one = run(warm_step, warm_single, base_url, args)
+        print(f"  warm pool      steps {warm:6.2f}s  single URL {warm_one:5.2f}s")
+        print(f"  speedup {cold / warm:.2f}x per run, {cold_one / warm_one:.1f}x per single URL")
+
+
+if __name__ == "__main__":
+    main()
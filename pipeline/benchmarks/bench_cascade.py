@@ -0,0 +1,161 @@
+"""Benchmark: step 3 confidence cascade (utils/cascade.py) vs one model for every page.
+
+The mock Messages API stands in for both models with fixed error rates per
+page kind, so this measures the cascade's routing, not Claude's accuracy.
+
+    python pipeline/benchmarks/bench_cascade.py --pages 500
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "mock-key")
+
+import step3_verify
+from benchmarks.bench_near_dedup import paragraph
+from benchmarks.mock_anthropic import mock_anthropic
+from utils import stream
+from utils.cascade import CASCADE_MODEL, Cascade
+from utils.fetch_policy import FetchResult
+
+CHEAP_MODEL = "claude-haiku-4-5-20251001"
+PRICES = {CHEAP_MODEL: (1.0, 5.0), CASCADE_MODEL: (3.0, 15.0)}  # $ per million input / output tokens
+KINDS = {"clear": 0.8, "mixed": 0.12, "thin": 0.08}
+LABELS = ("MOBILE_GROOMER", "SALON_ONLY", "NOT_GROOMER")
+_ID = re.compile(r"Groomer (\d+) ")
+
+
+def make_pages(rng: random.Random, count: int) -> dict[str, tuple[str, str, str]]:
+    """Return {url: (page text, kind, true label)}."""
+    pages = {}
+    for i in range(count):
+        kind = rng.choices(list(KINDS), weights=list(KINDS.values()))[0]
+        truth = "MOBILE_GROOMER" if kind == "mixed" else rng.choices(LABELS, weights=(0.65, 0.3, 0.05))[0]
+        paragraphs = [f"Groomer {i} offers pet grooming, bath and nail appointments."]
+        paragraphs += [paragraph(rng) for _ in range(2 if kind == "thin" else 8)]
+        pages[f"https://groomer-{i}.example/"] = ("\n\n".join(paragraphs), kind, truth)
+    return pages
+
+
+def simulated_reply(pages: dict, latency: dict[str, float], usage: Counter):
+    """Mock reply for both models: fixed behaviour per page kind, deterministic per (page, model)."""
+    by_id = {int(_ID.search(text).group(1)): (kind, truth) for text, kind, truth in pages.values()}
+    lock = threading.Lock()
+
+    def reply(prompt: str, model: str) -> str:
+        page = int(_ID.search(prompt).group(1))
+        kind, truth = by_id[page]
+        rng = random.Random(f"{page}-{model}")
+        strong = model == CASCADE_MODEL
+        wrong = rng.choice([label for label in LABELS if label != truth])
+        if kind == "clear":
+            label, confidence = (truth, rng.randint(85, 98)) if rng.random() < 0.98 else (wrong, rng.randint(75, 90))
+        elif kind == "mixed":
+            right = rng.random() < (0.92 if strong else 0.45)
+            label, confidence = (truth if right else "SALON_ONLY"), rng.randint(80, 92) if strong else rng.randint(50, 78)
+        else:
+            if strong:
+                label, confidence = (truth, rng.randint(75, 90)) if rng.random() < 0.85 else ("UNCLEAR", 40)
+            else:
+                label, confidence = "UNCLEAR", rng.randint(20, 45)
+        answer = f"{label}|{confidence}|simulated"
+        with lock:
+            usage[model, "in"] += len(prompt) // 4
+            usage[model, "out"] += len(answer) // 4
+        time.sleep(latency[model])
+        return answer
+
+    return reply
+
+
+def run(pages: dict, model: str, cascade: Cascade | None) -> dict[str, str]:
+    """Classify every page like step 3; return {url: final label}."""
+
+    async def fetch(urls: list[str], concurrency: int, timeout: int):
+        for url in urls:
+            yield url, FetchResult(url, pages[url][0], "http")
+
+    labels: dict[str, str] = {}
+    escalated: dict[str, str] = {}
+
+    def save_result(url: str, response: str) -> None:
+        label, confidence, _ = step3_verify.parse_classification(response)
+        labels[url] = label
+        if cascade is not None and cascade.escalate(label, confidence):
+            escalated[url] = label
+
+    stream.crawl_and_classify(
+        {url: url for url in pages},
+        lambda key, text: {"content": step3_verify.select_content(text, "verify")},
+        step3_verify.CLASSIFICATION_PROMPT,
+        save_result,
+        model=model,
+        profile="verify",
+        fetch=fetch,
+        near_dedup=False,
+    )
+    if escalated:
+        texts = {url: pages[url][0] for url in pages}
+        responses = step3_verify.escalate(list(escalated), {url: url for url in pages},
+                                          fetch_pages=lambda urls, **_: {url: texts[url] for url in urls})
+        for url, first in escalated.items():
+            response = responses.get(url)
+            second = step3_verify.parse_classification(response)[0] if response else None
+            cascade.settle(first, second)
+            if second is not None:
+                labels[url] = second
+    return labels
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--cheap-latency", type=float, default=0.3, help="Mock seconds per cheap-model request")
+    parser.add_argument("--strong-latency", type=float, default=1.0, help="Mock seconds per strong-model request")
+    args = parser.parse_args()
+
+    pages = make_pages(random.Random(7), args.pages)
+    kinds = Counter(kind for _, kind, _ in pages.values())
+    print(f"{len(pages)} pages: " + ", ".join(f"{kind} {n}" for kind, n in kinds.items()))
+    latency = {CHEAP_MODEL: args.cheap_latency, CASCADE_MODEL: args.strong_latency}
+
+    results = []
+    for label, model, cascade in (
+        ("cheap model only", CHEAP_MODEL, None),
+        ("cascade", CHEAP_MODEL, Cascade(step3_verify.CASCADE_THRESHOLDS)),
+        ("strong model only", CASCADE_MODEL, None),
+    ):
+        usage: Counter = Counter()
+        with mock_anthropic(latency=0.0, reply=simulated_reply(pages, latency, usage)) as (base_url, _):
+            os.environ["ANTHROPIC_BASE_URL"] = base_url
+            started = time.perf_counter()
+            labels = run(pages, model, cascade)
+            seconds = time.perf_counter() - started
+        cost = sum(usage[m, "in"] * p_in + usage[m, "out"] * p_out for m, (p_in, p_out) in PRICES.items()) / 1e6
+        correct = sum(labels.get(url) == truth for url, (_, _, truth) in pages.items())
+        dropped = sum(
+            truth == "MOBILE_GROOMER" and labels.get(url) not in ("MOBILE_GROOMER", "UNCLEAR")
+            for url, (_, _, truth) in pages.items()
+        )
+        rate = f"{cascade.report.rate:.1%} escalated" if cascade is not None else ""
+        results.append((label, correct, dropped, rate, cost, seconds, cascade))
+
+    for label, correct, dropped, rate, cost, seconds, cascade in results:
+        print(f"  {label:<18} accuracy {correct / len(pages):6.1%}  {dropped:3d} mobile groomers dropped  "
+              f"${cost * 1000 / len(pages):6.2f} per 1k pages  {seconds:5.1f}s  {rate}")
+        if cascade is not None:
+            print(f"    {cascade.report.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Benchmark: sliding-window crawl scheduling vs the old lock-step batches.
+
+Serves a page from a local fixture server where most requests answer in
+0.1 s and every Nth request straggles for several seconds, then fetches the
+same URL list with both schedulers at the same concurrency.
+
+    python pipeline/benchmarks/bench_crawl_scheduler.py
+    python pipeline/benchmarks/bench_crawl_scheduler.py --browser   # via Crawl4AI
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from benchmarks.fixtures import slow_server
+from utils.scheduler import lock_step_batches, sliding_window
+
+
+def make_urls(base_url: str, count: int, straggler_every: int, straggler_delay: float) -> list[str]:
+    """Build fixture URLs, one straggler every `straggler_every` URLs."""
+    urls = []
+    for i in range(count):
+        delay = straggler_delay if i % straggler_every == straggler_every - 1 else 0.1
+        urls.append(f"{base_url}/site-{i}?delay={delay}")
+    return urls
+
+
+async def run_http(scheduler, urls: list[str], concurrency: int) -> float:
+    """Fetch urls with plain HTTP through scheduler, return elapsed seconds."""
+    async with httpx.AsyncClient(timeout=30) as client:
+
+        async def fetch(url: str) -> int:
+            response = await client.get(url)
+            return response.status_code
+
+        started = time.perf_counter()
+        async for _ in scheduler(urls, fetch, concurrency):
+            pass
+        return time.perf_counter() - started
+
+
+async def run_browser(scheduler, urls: list[str], concurrency: int) -> float:
+    """Fetch urls with Crawl4AI through scheduler, return elapsed seconds."""
+    from crawl4ai import AsyncWebCrawler, BrowserConfig
+
+    from utils.crawler import _render
+
+    async with AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False)) as crawler:
+        started = time.perf_counter()
+        async for _ in scheduler(urls, lambda url: _render(crawler, url, 30), concurrency):
+            pass
+        return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--urls", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--straggler-every", type=int, default=10)
+    parser.add_argument("--straggler-delay", type=float, default=3.0)
+    parser.add_argument("--browser", action="store_true", help="Fetch through Crawl4AI instead of httpx")
+    args = parser.parse_args()
+
+    runner = run_browser if args.browser else run_http
+    with slow_server() as base_url:
+        urls = make_urls(base_url, args.urls, args.straggler_every, args.straggler_delay)
+        print(f"{len(urls)} URLs, concurrency {args.concurrency}, "
+              f"1 in {args.straggler_every} delayed {args.straggler_delay}s ({runner.__name__})")
+        batch = asyncio.run(runner(lock_step_batches, urls, args.concurrency))
+        print(f"  lock-step batches: {batch:6.2f}s  ({len(urls) / batch:6.1f} URLs/s)")
+        window = asyncio.run(runner(sliding_window, urls, args.concurrency))
+        print(f"  sliding window:    {window:6.2f}s  ({len(urls) / window:6.1f} URLs/s)")
+        print(f"  speedup:           {batch / window:6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark: crawl throughput from 1 to N worker processes (CRAWL_WORKERS).
+
+--http replaces the browser with a plain HTTP fetch, for machines without one.
+
+    python pipeline/benchmarks/bench_crawl_sharding.py --max-workers 8
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from html.parser import HTMLParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["CRAWL_CACHE"] = "0"
+os.environ.setdefault("CRAWL_PER_DOMAIN_DELAY", "0")
+
+from benchmarks.fixtures import site_farm
+
+_client = None
+
+
+class _TextExtractor(HTMLParser):
+    """Crude HTML -> text, standing in for the browser's markdown conversion."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.parts: list[str] = []
+
+    def handle_data(self, data: str) -> None:
+        if data.strip():
+            self.parts.append(data.strip())
+
+
+async def http_render(url: str, timeout: int) -> str | None:
+    """Renderer used with --http (runs inside each worker process)."""
+    global _client
+    import httpx
+
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=timeout)
+    response = await _client.get(url)
+    if response.status_code != 200:
+        return None
+    parser = _TextExtractor()
+    parser.feed(response.text)
+    return "\n\n".join(parser.parts)
+
+
+async def crawl(urls: list[str], workers: int, concurrency: int, renderer: str | None) -> tuple[float, int, int]:
+    """Return (seconds, pages succeeded, markdown bytes received)."""
+    from utils.crawler import _iter_sharded
+
+    started = time.perf_counter()
+    succeeded = received = 0
+    async for result in _iter_sharded(urls, workers, concurrency, 30, renderer):
+        if result.ok:
+            succeeded += 1
+            received += len(result.text)
+    return time.perf_counter() - started, succeeded, received
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=16, help="Fixture sites (domains) in the farm")
+    parser.add_argument("--pages", type=int, default=400, help="URLs to crawl in total")
+    parser.add_argument("--page-kb", type=float, default=100)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds per page fetch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Pages in flight per worker")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--http", action="store_true", help="Plain HTTP + HTML parsing instead of Crawl4AI")
+    args = parser.parse_args()
+
+    os.environ["CRAWL_PER_DOMAIN_CONCURRENCY"] = str(args.concurrency)
+    renderer = "benchmarks.bench_crawl_sharding:http_render" if args.http else None
+    counts = sorted({1, args.max_workers} | {2**i for i in range(1, 8) if 2**i < args.max_workers})
+
+    with site_farm(args.sites) as sites:
+        urls = [
+            f"{sites[i % len(sites)]}/page-{i}?delay={args.delay}&kb={args.page_kb}" for i in range(args.pages)
+        ]
+        print(
+            f"{len(urls)} pages of {args.page_kb:.0f} KB on {len(sites)} sites, {args.concurrency} in flight "
+            f"per worker, {os.cpu_count()} CPUs ({'http' if args.http else 'crawl4ai'})"
+        )
+        baseline = None
+        for workers in counts:
+            seconds, succeeded, received = asyncio.run(crawl(urls, workers, args.concurrency, renderer))
+            rate = succeeded / seconds
+            baseline = baseline or rate
+            print(
+                f"  {workers:3d} workers  {seconds:6.2f}s  {rate:7.1f} pages/s  ({rate / baseline:.2f}x)  "
+                f"{succeeded}/{len(urls)} ok, {received / 1e6:.1f} MB markdown"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark: fixed timeout, no retries vs adaptive timeouts, hedging and retries.
+
+Fixture pages stall or answer 503 at first; the browser is replaced by a
+second plain GET so no Chromium is needed.
+
+    python pipeline/benchmarks/bench_crawl_tail.py --pages 300
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["CRAWL_CACHE"] = "0"
+os.environ.setdefault("CRAWL_RETRY_BACKOFF", "0.2")
+
+from benchmarks.fixtures import flaky_server
+from utils.crawler import PageFetcher, format_paths
+from utils.fetch_policy import LatencyTracker
+from utils.scheduler import sliding_window
+
+
+class HttpStandIn:
+    """Stands in for BrowserPool: 'renders' with another plain GET."""
+
+    def __init__(self) -> None:
+        self.fetcher: PageFetcher | None = None
+
+    async def fetch(self, url: str, timeout: float):
+        result = await self.fetcher.fast_fetch(url, timeout)
+        result.via = "browser"
+        return result
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> dict:
+        return {}
+
+
+def make_urls(base_url: str, args) -> list[str]:
+    rng = random.Random(11)
+    urls = []
+    for i in range(args.pages):
+        roll = rng.random()
+        extra = ""
+        if roll < args.straggler_share:
+            extra = f"&stall={args.stall}"
+        elif roll < args.straggler_share + args.flaky_share:
+            extra = "&fail=2"
+        urls.append(f"{base_url}/site-{i}?delay={rng.expovariate(1 / args.delay):.3f}{extra}")
+    return urls
+
+
+async def crawl(urls: list[str], adaptive: bool, concurrency: int) -> tuple[list[float], int, str]:
+    """Return (per-page seconds, pages lost, outcome summary)."""
+    pool = HttpStandIn()
+    if adaptive:
+        fetcher = PageFetcher(pool, latency=LatencyTracker())
+    else:
+        fetcher = PageFetcher(pool, latency=LatencyTracker(min_samples=10**9, hedge_budget=0), retries=0)
+    pool.fetcher = fetcher
+
+    async def fetch(url: str):
+        return await fetcher.fetch(url, 15)
+
+    results = [result async for result in sliding_window(urls, fetch, concurrency)]
+    await fetcher.close()
+    lost = sum(not result.ok for result in results)
+    outcomes = fetcher.paths + fetcher.failures
+    outcomes["retried"] = sum(result.attempts > 1 for result in results)
+    outcomes["hedged"] = sum(result.hedged for result in results)
+    return sorted(result.seconds for result in results), lost, format_paths(outcomes)
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--delay", type=float, default=0.1, help="Mean page latency")
+    parser.add_argument("--straggler-share", type=float, default=0.05)
+    parser.add_argument("--stall", type=float, default=8.0)
+    parser.add_argument("--flaky-share", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    for label, adaptive in (("fixed timeout, no retry", False), ("adaptive + hedge + retry", True)):
+        with flaky_server() as site:
+            urls = make_urls(site, args)
+            started = time.perf_counter()
+            seconds, lost, summary = asyncio.run(crawl(urls, adaptive, args.concurrency))
+            wall = time.perf_counter() - started
+        print(f"  {label}:")
+        print(
+            f"    lost {lost}/{len(urls)}  wall {wall:6.2f}s  p50 {percentile(seconds, 50):.2f}s  "
+            f"p95 {percentile(seconds, 95):.2f}s  p99 {percentile(seconds, 99):.2f}s  max {seconds[-1]:.2f}s"
+        )
+        print(f"    {summary}")
+
+
+if __name__ == "__main__":
+    main()
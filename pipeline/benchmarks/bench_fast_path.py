@@ -0,0 +1,73 @@
+"""Benchmark: HTTP fast path vs rendering every page in a browser.
+
+Needs Crawl4AI and its browser.
+
+    python pipeline/benchmarks/bench_fast_path.py --pages 200 --static-share 0.8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["CRAWL_CACHE"] = "0"
+
+from benchmarks.fixtures import VARIANT_PAGES, variant_server
+from utils.crawler import VIA_HTTP, BrowserPool, PageFetcher, format_paths
+from utils.scheduler import sliding_window
+
+
+async def crawl(urls: list[str], fast_path: bool, concurrency: int) -> tuple[float, dict[str, str]]:
+    """Return (seconds, {url: path}) for one crawl of urls."""
+    fetcher = PageFetcher(BrowserPool(size=1, tabs=concurrency), fast_path=fast_path)
+    await fetcher.pool.start()  # both runs start with a warm browser
+
+    async def fetch(url: str) -> tuple[str, str]:
+        result = await fetcher.fetch(url, 30)
+        return url, result.via
+
+    started = time.perf_counter()
+    paths = {url: via async for url, via in sliding_window(urls, fetch, concurrency)}
+    seconds = time.perf_counter() - started
+    print(f"    {format_paths(fetcher.paths + fetcher.failures)}; escalated: {dict(fetcher.escalations) or 'none'}")
+    await fetcher.close()
+    return seconds, paths
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--static-share", type=float, default=0.8, help="Share of static, fast-path pages")
+    parser.add_argument("--page-kb", type=float, default=40)
+    parser.add_argument("--delay", type=float, default=0.05, help="Seconds per page fetch")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    with variant_server() as site:
+        urls = []
+        for i in range(args.pages):
+            kind = "static" if rng.random() < args.static_share else rng.choice(list(VARIANT_PAGES))
+            urls.append(f"{site}/{kind}-{i}?delay={args.delay}&kb={args.page_kb}")
+        print(f"{len(urls)} pages, {args.static_share:.0%} static, concurrency {args.concurrency}")
+
+        print("  browser only:")
+        browser, _ = asyncio.run(crawl(urls, False, args.concurrency))
+        print(f"    wall {browser:6.2f}s  ({len(urls) / browser:5.1f} pages/s)")
+        print("  fast path:")
+        fast, paths = asyncio.run(crawl(urls, True, args.concurrency))
+        print(f"    wall {fast:6.2f}s  ({len(urls) / fast:5.1f} pages/s)  speedup {browser / fast:.2f}x")
+
+        wrong = [url for url, via in paths.items() if (via == VIA_HTTP) != ("/static-" in url)]
+        print(f"  routing: {len(urls) - len(wrong)}/{len(urls)} pages took the expected path")
+        for url in wrong[:5]:
+            print(f"    unexpected: {url} -> {paths[url]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Benchmark: blocking-indexed fuzzy dedup (utils/dedup.py) at increasing scale.
+
+Reports pair precision/recall against synthetic known duplicates, pairs
+scored and runtime.
+
+    python pipeline/benchmarks/bench_fuzzy_dedup.py --sizes 10000 100000 500000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from utils.dedup import fuzzy_dedup
+
+ADJECTIVES = [
+    "happy", "lucky", "golden", "royal", "sunny", "fuzzy", "fluffy", "shaggy", "pampered", "spoiled", "clean",
+    "fresh", "sweet", "gentle", "bubbly", "sparkle", "silver", "little", "big", "wild", "urban", "coastal",
+    "prairie", "lone star", "magnolia", "blue", "red", "green", "top", "first class", "five star", "posh",
+]
+NOUNS = [
+    "paws", "tails", "whiskers", "pup", "pooch", "hound", "mutt", "bark", "wag", "snout", "fur", "bubbles",
+    "suds", "clippers", "brush", "bow", "collar", "biscuit", "bone", "kennel", "paw prints", "tail waggers",
+]
+OWNERS = [
+    "bella", "maria", "jen", "sam", "alex", "chris", "dana", "kim", "lee", "pat", "rosa", "tina", "nick", "amy",
+    "beth", "carl", "dee", "gail", "hank", "ivy", "jo", "kai", "lou", "max", "nora", "olga", "paul", "rey",
+]
+SUFFIXES = ["mobile grooming", "mobile pet spa", "grooming", "pet salon", "dog grooming", "grooming on wheels"]
+CITIES = [
+    ("St. Louis", "MO", 38.63, -90.20), ("St. Petersburg", "FL", 27.77, -82.64), ("Fort Worth", "TX", 32.76, -97.33),
+    ("Austin", "TX", 30.27, -97.74), ("Dallas", "TX", 32.78, -96.80), ("Houston", "TX", 29.76, -95.37),
+    ("Tampa", "FL", 27.95, -82.46), ("Miami", "FL", 25.76, -80.19), ("Boise", "ID", 43.62, -116.21),
+    ("Reno", "NV", 39.53, -119.81), ("San Jose", "CA", 37.34, -121.89), ("Fresno", "CA", 36.74, -119.79),
+    ("Kansas City", "MO", 39.10, -94.58), ("Orlando", "FL", 28.54, -81.38), ("Mt. Pleasant", "SC", 32.79, -79.86),
+]
+CITY_VARIANTS = {"St. Louis": "Saint Louis", "St. Petersburg": "Saint Petersburg", "Fort Worth": "Ft. Worth",
+                 "Mt. Pleasant": "Mount Pleasant"}
+
+
+def _phone(rng: random.Random) -> str:
+    return f"({rng.randint(201, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}"
+
+
+def make_cities(count: int, rng: random.Random) -> list[tuple[str, str, float, float]]:
+    """The named cities plus numbered towns, so each city keeps a realistic ~150 listings."""
+    cities = list(CITIES)
+    states = sorted({state for _, state, _, _ in CITIES})
+    while len(cities) < count:
+        cities.append((f"{rng.choice(['Spring', 'Oak', 'Cedar', 'Lake', 'River'])}ville {len(cities)}",
+                       rng.choice(states), rng.uniform(26, 45), rng.uniform(-120, -80)))
+    return cities
+
+
+def _business(rng: random.Random, key: int, cities: list) -> dict:
+    if rng.random() < 0.3:
+        name = f"{rng.choice(OWNERS).title()}'s {rng.choice(SUFFIXES).title()}"
+    else:
+        name = f"{rng.choice(ADJECTIVES).title()} {rng.choice(NOUNS).title()} {rng.choice(SUFFIXES).title()}"
+    city, state, lat, lng = rng.choice(cities)
+    slug = "".join(c for c in name.lower() if c.isalnum())[:20]
+    has_geo = rng.random() < 0.8
+    return {
+        "name": name,
+        "city": city,
+        "state": state,
+        "full_address": f"{rng.randint(1, 9999)} Main St, {city}, {state}",
+        "phone": _phone(rng) if rng.random() < 0.9 else None,
+        "website": f"https://www.{slug}{key % 997}.com" if rng.random() < 0.6 else None,
+        "latitude": lat + rng.uniform(-0.2, 0.2) if has_geo else None,
+        "longitude": lng + rng.uniform(-0.2, 0.2) if has_geo else None,
+        "place_id": f"ChIJ{key:010d}",
+        "reviews_count": rng.randint(0, 400),
+        "_truth": key,
+    }
+
+
+def _variant(row: dict, rng: random.Random) -> dict:
+    """A repeated listing of the same business."""
+    dup = dict(row, place_id=f"ChIJdup{rng.getrandbits(40):x}", reviews_count=rng.randint(0, 20))
+    kind = rng.choice(["suffix", "phone", "city", "typo", "geo"])
+    if kind == "suffix":
+        dup["name"] = f"{row['name']} LLC"
+        if row["phone"]:
+            dup["phone"] = "+1 " + row["phone"].replace("(", "").replace(") ", "-")
+    elif kind == "phone" and row["phone"]:
+        dup["name"] = f"{rng.choice(OWNERS).title()}'s Grooming"
+    elif kind == "city" and row["city"] in CITY_VARIANTS:
+        dup["city"] = CITY_VARIANTS[row["city"]]
+    elif kind == "typo":
+        name = row["name"]
+        at = rng.randrange(1, len(name) - 1)
+        dup["name"] = name[:at] + name[at + 1] + name[at] + name[at + 2:]
+        dup["phone"] = None
+    elif row["latitude"] is not None:
+        dup["latitude"] = row["latitude"] + 0.0002
+        dup["longitude"] = row["longitude"] - 0.0002
+        dup["name"] = row["name"].upper()
+        dup["phone"] = None
+        dup["website"] = None
+    else:
+        dup["name"] = row["name"] + " Inc"
+    return dup
+
+
+def make_rows(count: int, rng: random.Random, dup_rate: float = 0.08) -> pd.DataFrame:
+    cities = make_cities(max(len(CITIES), count // 150), rng)
+    rows = []
+    key = 0
+    while len(rows) < count:
+        row = _business(rng, key, cities)
+        rows.append(row)
+        if rng.random() < dup_rate:
+            rows.extend(_variant(row, rng) for _ in range(rng.choice([1, 1, 2])))
+        key += 1
+    # Franchise: one call-centre number for every location
+    franchise_phone = _phone(rng)
+    for i in range(min(300, count // 50)):
+        city, state, lat, lng = rng.choice(cities)
+        rows.append({
+            "name": f"Aussie Pet Mobile {rng.choice(OWNERS).title()} {i}", "city": city, "state": state,
+            "full_address": None, "phone": franchise_phone, "website": f"https://aussiepetmobile.com/loc{i}",
+            "latitude": None, "longitude": None, "place_id": f"ChIJfr{i}", "reviews_count": 5, "_truth": -1 - i,
+        })
+    rng.shuffle(rows)
+    df = pd.DataFrame(rows[:count])
+    for col in ("name", "city", "state", "full_address", "phone", "website", "place_id"):
+        df[col] = df[col].astype("string")
+    return df
+
+
+def _pairs(sizes: pd.Series) -> int:
+    return int((sizes * (sizes - 1) // 2).sum())
+
+
+def pair_scores(df: pd.DataFrame, clusters: pd.DataFrame) -> tuple[float, float]:
+    """Pair precision and recall of the predicted clusters against _truth."""
+    truth_pairs = _pairs(df.groupby("_truth").size())
+    if clusters.empty:
+        return 1.0, 0.0 if truth_pairs else 1.0
+    predicted_pairs = _pairs(clusters.groupby("cluster").size())
+    correct = _pairs(clusters.groupby(["cluster", "_truth"]).size())
+    precision = correct / predicted_pairs if predicted_pairs else 1.0
+    # Every true pair the clusters missed is still split across survivors
+    recall = correct / truth_pairs if truth_pairs else 1.0
+    return precision, recall
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 500_000])
+    parser.add_argument("--dup-rate", type=float, default=0.08, help="Share of businesses listed more than once")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    for size in args.sizes:
+        df = make_rows(size, rng, args.dup_rate)
+        true_clusters = int((df.groupby("_truth").size() > 1).sum())
+        started = time.perf_counter()
+        result = fuzzy_dedup(df)
+        elapsed = time.perf_counter() - started
+        precision, recall = pair_scores(df, result.clusters)
+        s = result.stats
+        all_pairs = size * (size - 1) // 2
+        print(
+            f"  {size:>9,} rows  {elapsed:6.2f}s {size / elapsed:>9,.0f} rows/s  "
+            f"clusters {s['clusters']:,} (true {true_clusters:,})  merged {s['removed']:,}  "
+            f"precision {precision:.3f} recall {recall:.3f}  "
+            f"pairs {s['pairs']:,} ({s['pairs'] / all_pairs:.2e} of all-pairs)  oversized {s['oversized']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
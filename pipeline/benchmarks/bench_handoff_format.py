@@ -0,0 +1,71 @@
+"""Benchmark: step hand-off as CSV vs typed Parquet.
+
+    python pipeline/benchmarks/bench_handoff_format.py --rows 50000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from utils import csv_utils
+
+PROJECTION = ["slug", "name", "city", "state", "classification", "svc_full_groom", "is_licensed", "price_range_low"]
+
+
+def make_frame(rows: int, seed: int = 7) -> pd.DataFrame:
+    rng = random.Random(seed)
+    data: dict[str, list] = {}
+    for col, dtype in csv_utils.SCHEMAS["step7"].items():
+        if dtype == "boolean":
+            data[col] = [rng.random() < 0.4 for _ in range(rows)]
+        elif dtype == "Int64":
+            data[col] = [rng.randint(1, 40) if rng.random() < 0.6 else None for _ in range(rows)]
+        elif dtype == "Float64":
+            data[col] = [round(rng.uniform(20, 200), 2) if rng.random() < 0.5 else None for _ in range(rows)]
+        elif dtype == "category":
+            data[col] = [rng.choice(["TX", "CA", "FL", "NY", "MOBILE_GROOMER", "Austin", "Dallas"]) for _ in range(rows)]
+        else:
+            data[col] = [f"{col}-{rng.randint(0, 10**9)} some descriptive text" for _ in range(rows)]
+    return csv_utils.apply_schema(pd.DataFrame(data), "step7")
+
+
+def timed(fn, repeat: int = 3) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        logical = Path(tmp) / "step7_areas.csv"
+        print(f"{args.rows} rows x {len(df.columns)} columns")
+        for fmt in ("csv", "parquet"):
+            csv_utils.FORMAT = fmt
+            for stale in (logical.with_suffix(".csv"), logical.with_suffix(".parquet")):
+                stale.unlink(missing_ok=True)
+            write_s, path = timed(lambda: csv_utils.write_table(df, logical, schema="step7"), repeat=1)
+            read_s, full = timed(lambda: csv_utils.read_table(logical))
+            proj_s, _ = timed(lambda: csv_utils.read_table(logical, columns=PROJECTION))
+            mem_mb = full.memory_usage(deep=True).sum() / 1e6
+            print(f"  {fmt:8s} file {os.path.getsize(path) / 1e6:6.1f} MB  write {write_s:5.2f}s  "
+                  f"read {read_s:5.2f}s  projected read {proj_s:5.2f}s  in memory {mem_mb:6.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
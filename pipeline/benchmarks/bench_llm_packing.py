@@ -0,0 +1,111 @@
+"""Benchmark: packing several step 3 items into one request (utils/llm_pack.py).
+
+The mock Messages API garbles a --malformed share of packed answers, which
+must be re-sent alone.
+
+    python pipeline/benchmarks/bench_llm_packing.py --items 400 --rpm 240
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "mock-key")
+
+from benchmarks.bench_near_dedup import keyword_reply, unique_pages
+from benchmarks.mock_anthropic import mock_anthropic
+from step3_verify import CLASSIFICATION_PROMPT
+from utils import llm
+from utils.content import select_content
+
+_LISTING = re.compile(r'<listing id="(\d+)">\n(.*?)\n</listing>', re.DOTALL)
+_CONTENT = re.compile(r"Website content:\n(.*)\Z", re.DOTALL)
+
+
+def packed_reply(malformed: float, seed: int = 11):
+    """Mock reply: answer each listing of a packed prompt, spoiling a share of the answers."""
+    rng = random.Random(seed)
+
+    def reply(prompt: str) -> str:
+        listings = _LISTING.findall(prompt)
+        if not listings:
+            return keyword_reply(_CONTENT.search(prompt).group(1))  # the instructions mention every keyword
+        lines = []
+        for n, body in listings:
+            roll = rng.random()
+            if roll < malformed / 2:
+                continue  # answer left out
+            answer = keyword_reply(body)
+            if roll < malformed:
+                answer = "Based on the website, " + answer.lower()  # chatty, not the requested format
+            lines += [f"### {n}", answer]
+        return "\n".join(lines)
+
+    return reply
+
+
+async def run(items: list[dict], pack: int, interval: float) -> tuple[list[str], list[float], llm.AsyncClassifier]:
+    answers: list[str] = [""] * len(items)
+    latencies: list[float] = []
+
+    async with llm.AsyncClassifier(CLASSIFICATION_PROMPT, profile="verify", pack=pack) as classifier:
+
+        async def one(i: int) -> None:
+            started = time.perf_counter()
+            answers[i] = await classifier.classify(items[i])
+            latencies.append(time.perf_counter() - started)
+
+        tasks = []
+        for i in range(len(items)):
+            tasks.append(asyncio.ensure_future(one(i)))
+            await asyncio.sleep(interval)
+        await asyncio.gather(*tasks)
+    return answers, latencies, classifier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--packs", default="1,4,8,16", help="LLM_PACK values to compare")
+    parser.add_argument("--rpm", type=int, default=240, help="Requests per minute the mock tier allows")
+    parser.add_argument("--latency", type=float, default=0.4, help="Mock seconds per request")
+    parser.add_argument("--arrival", type=float, default=0.01, help="Seconds between items (crawl pace)")
+    parser.add_argument("--malformed", type=float, default=0.03, help="Share of packed answers spoiled")
+    args = parser.parse_args()
+
+    os.environ["ANTHROPIC_RPM"] = str(args.rpm)
+    rng = random.Random(3)
+    sample = unique_pages(rng, args.items)
+    items = [{"content": select_content(text, "verify")} for text, _ in sample]
+    truth = [label for _, label in sample]
+    print(f"{len(items)} step 3 items, arriving every {args.arrival * 1000:.0f} ms; mock tier {args.rpm} RPM, "
+          f"{args.latency:.1f}s per request, {args.malformed:.0%} of packed answers spoiled")
+
+    for pack in (int(p) for p in args.packs.split(",")):
+        llm._governor = None  # fresh buckets and usage per run
+        llm._prompt_usage.clear()
+        with mock_anthropic(latency=args.latency, reply=packed_reply(args.malformed)) as (base_url, stats):
+            os.environ["ANTHROPIC_BASE_URL"] = base_url
+            started = time.perf_counter()
+            answers, latencies, classifier = asyncio.run(run(items, pack, args.arrival))
+            seconds = time.perf_counter() - started
+        prompt_tokens = stats.input_tokens + stats.cache_read_tokens + stats.cache_write_tokens
+        correct = sum(answer.split("|")[0] == label for answer, label in zip(answers, truth))
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(f"  pack {pack:<3} {stats.requests * 1000 / len(items):6.0f} requests and "
+              f"{prompt_tokens * 1000 // len(items):>9,} prompt tokens per 1,000 items; latency mean "
+              f"{statistics.mean(latencies):5.2f}s p95 {p95:5.2f}s; {classifier.resent:3d} re-sent; "
+              f"correct {correct}/{len(items)}; wall {seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
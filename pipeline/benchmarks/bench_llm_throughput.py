@@ -0,0 +1,88 @@
+"""Benchmark: classify_batch throughput against a local mock Messages API.
+
+    python pipeline/benchmarks/bench_llm_throughput.py --items 500 --concurrency 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "mock-key")
+
+from anthropic import Anthropic
+
+from benchmarks.mock_anthropic import mock_anthropic
+from utils import llm
+
+TEMPLATE = "Classify this business.\n\nWebsite content:\n{content}"
+
+
+def run_executor(items: list[dict], max_concurrent: int) -> float:
+    """Old design: sync client calls pushed through the default thread pool."""
+    client = Anthropic(max_retries=6)
+
+    def call(prompt: str) -> str:
+        response = client.messages.create(
+            model="claude-haiku-4-5-20251001",
+            max_tokens=1024,
+            messages=[{"role": "user", "content": prompt}],
+        )
+        return response.content[0].text
+
+    async def run() -> None:
+        sem = asyncio.Semaphore(max_concurrent)
+        loop = asyncio.get_running_loop()
+
+        async def one(item: dict) -> str:
+            async with sem:
+                return await loop.run_in_executor(None, call, TEMPLATE.format_map(item))
+
+        await asyncio.gather(*(one(item) for item in items))
+
+    started = time.perf_counter()
+    asyncio.run(run())
+    return time.perf_counter() - started
+
+
+def run_async(items: list[dict], max_concurrent: int) -> float:
+    """New design: classify_batch on the pooled async client."""
+    started = time.perf_counter()
+    results = llm.classify_batch(items, TEMPLATE, max_concurrent=max_concurrent)
+    elapsed = time.perf_counter() - started
+    failed = sum(1 for r in results if r is None)
+    if failed:
+        print(f"    ({failed} items failed)")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--rate-limit-every", type=int, default=25)
+    parser.add_argument("--rpm", type=int, default=0, help="Advertise an RPM tier limit in response headers")
+    args = parser.parse_args()
+
+    items = [{"content": f"Mobile grooming business #{i}. We come to you."} for i in range(args.items)]
+    limits = {"requests": args.rpm} if args.rpm else None
+    mock = mock_anthropic(latency=args.latency, rate_limit_every=args.rate_limit_every, limits=limits)
+    with mock as (base_url, stats):
+        os.environ["ANTHROPIC_BASE_URL"] = base_url
+        print(f"{args.items} items, max_concurrent {args.concurrency}, latency {args.latency}s, "
+              f"429 every {args.rate_limit_every} requests")
+        for name, runner in (("thread pool", run_executor), ("async pool", run_async)):
+            stats.max_in_flight = 0
+            elapsed = runner(items, args.concurrency)
+            print(f"  {name:12s} {elapsed:6.2f}s  {args.items / elapsed:7.1f} req/s  "
+                  f"peak in flight {stats.max_in_flight}")
+
+
+if __name__ == "__main__":
+    main()
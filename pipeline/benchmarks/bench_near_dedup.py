@@ -0,0 +1,144 @@
+"""Benchmark: LLM calls saved and accuracy impact of near-duplicate grouping (utils/near_dup.py).
+
+Pages are franchise copies, shared templates (near-misses that must not
+share an answer) and unique sites; the mock answers with a keyword classifier.
+
+    python pipeline/benchmarks/bench_near_dedup.py --brands 20 --cities 8
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "mock-key")
+
+from benchmarks.mock_anthropic import mock_anthropic
+from utils import stream
+from utils.content import select_content
+from utils.fetch_policy import FetchResult
+from utils.near_dup import NearDupIndex, THRESHOLD
+
+PROMPT = "Classify this business.\n\nWebsite content:\n{content}"
+
+WORDS = (
+    "dog cat pet groom bath trim nail brush coat breed puppy senior gentle care clean fresh spa style cut "
+    "shampoo conditioner towel dry ear teeth paw fur shed mat tangle comfort calm happy healthy friendly "
+    "team staff owner family local trusted quality service appointment schedule visit treat reward"
+).split()
+CITIES = [
+    "Austin", "Dallas", "Houston", "Plano", "Frisco", "Katy", "Round Rock", "Irving", "Denton", "Allen",
+    "Garland", "Mesquite", "Pearland", "Sugar Land", "Temple", "Waco",
+]
+NAMES = ["Maria", "James", "Aisha", "Chen", "Priya", "Diego", "Hannah", "Omar", "Grace", "Luca"]
+MOBILE = "We come to you in our fully equipped mobile grooming van, right in your driveway."
+SALON = "Drop off your pet at our salon on Main Street; our storefront is open six days a week."
+
+
+def paragraph(rng: random.Random, words: int = 45) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def franchise_pages(rng: random.Random, brand: int, cities: int) -> list[tuple[str, str]]:
+    mobile = rng.random() < 0.6
+    body = [paragraph(rng) for _ in range(10)]
+    pages = []
+    for city in rng.sample(CITIES, cities):
+        phone = f"({rng.randint(200, 999)}) {rng.randint(200, 999)}-{rng.randint(1000, 9999)}"
+        text = "\n\n".join(
+            [f"# Brand {brand} Pet Grooming {city}", f"Serving {city} and nearby. Call {phone} today.",
+             MOBILE if mobile else SALON, *body, f"Your {city} groomer is {rng.choice(NAMES)}."]
+        )
+        pages.append((text, "MOBILE_GROOMER" if mobile else "SALON_ONLY"))
+    return pages
+
+
+def template_pages(rng: random.Random, template: int, sites: int) -> list[tuple[str, str]]:
+    body = [paragraph(rng) for _ in range(10)]
+    pages = []
+    for site in range(sites):
+        mobile = rng.random() < 0.5
+        name = f"{rng.choice(NAMES)}'s Grooming {template}-{site}"
+        own = paragraph(rng, 25)
+        text = "\n\n".join([f"# {name}", MOBILE if mobile else SALON, own, *body, f"Thanks for choosing {name}."])
+        pages.append((text, "MOBILE_GROOMER" if mobile else "SALON_ONLY"))
+    return pages
+
+
+def unique_pages(rng: random.Random, count: int) -> list[tuple[str, str]]:
+    pages = []
+    for i in range(count):
+        mobile = rng.random() < 0.5
+        text = "\n\n".join([f"# Groomer {i}", MOBILE if mobile else SALON, *(paragraph(rng) for _ in range(8))])
+        pages.append((text, "MOBILE_GROOMER" if mobile else "SALON_ONLY"))
+    return pages
+
+
+def keyword_reply(prompt: str) -> str:
+    """Deterministic stand-in for Claude: label by the mobile / salon wording."""
+    if "come to you" in prompt or "grooming van" in prompt:
+        return "MOBILE_GROOMER|90|mobile wording"
+    if "salon" in prompt or "storefront" in prompt:
+        return "SALON_ONLY|85|salon wording"
+    return "UNCLEAR|30|no signal"
+
+
+async def run(pages: dict[str, tuple[str, str]], near_dedup: bool) -> tuple[dict, object]:
+    async def fetch(urls: list[str], concurrency: int, timeout: int):
+        for url in urls:
+            yield url, FetchResult(url, pages[url][0], "http")
+
+    labels: dict = {}
+    result = await stream.acrawl_and_classify(
+        {url: url for url in pages},
+        lambda key, text: {"content": select_content(text, "verify")},
+        PROMPT,
+        lambda key, response: labels.__setitem__(key, response.split("|")[0]),
+        fetch=fetch,
+        near_dedup=near_dedup,
+    )
+    return labels, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--brands", type=int, default=20, help="Franchise brands")
+    parser.add_argument("--cities", type=int, default=8, help="Listings per brand")
+    parser.add_argument("--templates", type=int, default=10, help="Website-builder templates")
+    parser.add_argument("--template-sites", type=int, default=8, help="Businesses per template")
+    parser.add_argument("--unique", type=int, default=200, help="Independent sites")
+    parser.add_argument("--thresholds", default=f"0.8,0.85,{THRESHOLD},0.95", help="Similarity thresholds to try")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    sample = [page for b in range(args.brands) for page in franchise_pages(rng, b, args.cities)]
+    sample += [page for t in range(args.templates) for page in template_pages(rng, t, args.template_sites)]
+    sample += unique_pages(rng, args.unique)
+    pages = {f"https://site-{i}.example/": page for i, page in enumerate(sample)}
+    print(f"{len(pages)} labelled pages: {args.brands * args.cities} franchise, "
+          f"{args.templates * args.template_sites} template, {args.unique} unique")
+
+    runs = [("per page", False, None)]
+    runs += [(f"grouped at {t:.2f}", True, float(t)) for t in sorted({float(t) for t in args.thresholds.split(",")})]
+    for label, near_dedup, threshold in runs:
+        stream.NearDupIndex = partial(NearDupIndex, threshold=threshold)
+        with mock_anthropic(latency=0.01, reply=keyword_reply) as (base_url, stats):
+            os.environ["ANTHROPIC_BASE_URL"] = base_url
+            started = time.perf_counter()
+            labels, result = asyncio.run(run(pages, near_dedup))
+            seconds = time.perf_counter() - started
+        wrong = [url for url, (_, truth) in pages.items() if labels.get(url) != truth]
+        wrong_shared = sum(url in result.near_duplicates for url in wrong)
+        print(f"  {label:<18} {stats.requests:4d} LLM calls  accuracy {1 - len(wrong) / len(pages):.2%} "
+              f"({len(wrong)} wrong, {wrong_shared} of them from a shared answer)  {seconds:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
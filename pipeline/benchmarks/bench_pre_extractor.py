@@ -0,0 +1,76 @@
+"""Benchmark: pre-extractor throughput (MB/s) over a synthetic corpus.
+
+    python pipeline/benchmarks/bench_pre_extractor.py --pages 2000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.extract import format_coverage, match_features, match_services
+
+SENTENCES = [
+    "Full groom packages start at ${price} and include bath, haircut, nail trim and ear cleaning.",
+    "Bath and brush for small dogs ${price}, large dogs ${price}.",
+    "We are fully licensed and insured, and Fear Free certified.",
+    "Our groomer has {years} years of experience with all breeds.",
+    "We only use all-natural, hypoallergenic shampoo.",
+    "Cage-free, one-on-one attention in our fully equipped van.",
+    "Book online in seconds or call us to schedule.",
+    "De-shedding treatment and teeth brushing available as add-ons.",
+    "Flea and tick bath for ${price}.",
+    "Puppy intro groom for pups under 6 months.",
+    "Gentle care for senior dogs and anxious pets.",
+    "Dematting is charged at ${price} per 15 minutes.",
+    "Breed-specific cuts, hand stripping and teddy bear cuts.",
+    "We love cats too! Feline grooming by appointment.",
+    "Serving the greater metro area and surrounding counties since 2012.",
+    "Follow us on Instagram for before and after photos of our happy clients.",
+    "Our mission is to make every visit calm, clean and comfortable.",
+    "Gift certificates are available for the holidays.",
+    "Read what our customers are saying about us on Google and Yelp.",
+    "[Home](/) | [About](/about) | [Services](/services) | [Contact](/contact)",
+    "© 2024 Happy Paws Mobile Grooming. All rights reserved. Privacy Policy.",
+]
+
+
+def make_page(rng: random.Random) -> str:
+    """One synthetic page: 15-60 sentences in short paragraphs."""
+    lines = []
+    for _ in range(rng.randint(15, 60)):
+        sentence = rng.choice(SENTENCES)
+        sentence = sentence.replace("{years}", str(rng.randint(2, 30)))
+        while "{price}" in sentence:
+            sentence = sentence.replace("{price}", str(rng.randint(15, 180)), 1)
+        lines.append(sentence)
+        if rng.random() < 0.3:
+            lines.append("")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pages = [make_page(rng) for _ in range(args.pages)]
+    size_mb = sum(len(page.encode("utf-8")) for page in pages) / 1_000_000
+    print(f"{args.pages} pages, {size_mb:.1f} MB")
+
+    for name, matcher in (("services", match_services), ("features", match_features)):
+        started = time.perf_counter()
+        for page in pages:
+            matcher(page)
+        elapsed = time.perf_counter() - started
+        print(f"  {name:9s} {elapsed:6.2f}s  {size_mb / elapsed:6.1f} MB/s  {args.pages / elapsed:8.0f} pages/s")
+        print(f"    {format_coverage(name)}")
+
+
+if __name__ == "__main__":
+    main()
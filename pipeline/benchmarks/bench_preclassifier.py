@@ -0,0 +1,155 @@
+"""Benchmark: step 3's local pre-classifier (utils/preclassifier.py) over successive runs.
+
+Runs cold, warm, drift (the mock's labels change) and retrained, with one
+PreClassifier persisting between runs.
+
+    python pipeline/benchmarks/bench_preclassifier.py --pages 800
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "mock-key")
+
+import step3_verify
+from benchmarks.bench_near_dedup import paragraph
+from benchmarks.mock_anthropic import mock_anthropic
+from utils import stream
+from utils.fetch_policy import FetchResult
+from utils.preclassifier import PreClassifier
+
+MOBILE = [
+    "We come to you in our fully equipped grooming van.",
+    "Mobile pet grooming right in your driveway.",
+    "Our mobile spa parks at your door, no crate, no stress.",
+    "House calls for dogs and cats across the metro area.",
+    "In-home grooming: we bring everything to your home.",
+]
+SALON = [
+    "Visit our salon on Main Street, open six days a week.",
+    "Drop off your pet at our storefront grooming shop.",
+    "Walk-ins welcome at our grooming salon in the plaza.",
+    "Our shop has climate-controlled kennels for drop-off pets.",
+]
+OTHER = [
+    "Overnight boarding and doggy daycare with play yards.",
+    "Full-service veterinary clinic: vaccines, dental and surgery.",
+    "Pet supply store with food, toys and aquarium fish.",
+    "Obedience training classes for puppies and adult dogs.",
+]
+PICKUP = "Pickup and delivery: we collect your pet from home and bring them back fresh."
+KINDS = {"mobile": 0.45, "salon": 0.3, "other": 0.1, "mixed": 0.07, "thin": 0.08}
+
+
+def make_pages(rng: random.Random, count: int, start: int, pickup: float) -> dict[str, str]:
+    """Return {url: page text}; a `pickup` share of salon pages offers pickup and delivery."""
+    pages = {}
+    for i in range(start, start + count):
+        kind = rng.choices(list(KINDS), weights=list(KINDS.values()))[0]
+        lines = [f"# Business {i}", "Pet grooming, baths and nail trims." if kind != "other" else "Pets welcome."]
+        if kind in ("mobile", "mixed"):
+            lines += rng.sample(MOBILE, 2)
+        if kind in ("salon", "mixed"):
+            lines += rng.sample(SALON, 2)
+            if kind == "salon" and rng.random() < pickup:
+                lines.append(PICKUP)
+        if kind == "other":
+            lines += rng.sample(OTHER, 2)
+        lines += [paragraph(rng) for _ in range(2 if kind == "thin" else 6)]
+        rng.shuffle(lines[2:])
+        pages[f"https://business-{i}.example/"] = "\n\n".join(lines)
+    return pages
+
+
+def rule_label(text: str, pickup_is_salon: bool) -> tuple[str, int]:
+    """The mock's answer for a page."""
+    if PICKUP in text:
+        return ("SALON_ONLY", 85) if pickup_is_salon else ("MOBILE_GROOMER", 80)
+    if any(line in text for line in MOBILE):
+        return "MOBILE_GROOMER", 90
+    if any(line in text for line in SALON):
+        return "SALON_ONLY", 88
+    if any(line in text for line in OTHER):
+        return "NOT_GROOMER", 92
+    return "UNCLEAR", 30
+
+
+def run(pages: dict[str, str], pre: PreClassifier, pickup_is_salon: bool) -> tuple[dict, int, float]:
+    """Classify pages like step 3; return ({url: label}, LLM calls, seconds)."""
+
+    async def fetch(urls: list[str], concurrency: int, timeout: int):
+        for url in urls:
+            yield url, FetchResult(url, pages[url], "http")
+
+    labels: dict[str, str] = {}
+
+    def prepare(url: str, text: str) -> dict | None:
+        content = step3_verify.select_content(text, "verify")
+        local = pre.route(url, content)
+        if local is not None:
+            labels[url] = local[0]
+            return None
+        return {"content": content}
+
+    def save_result(url: str, response: str) -> None:
+        label, confidence, evidence = step3_verify.parse_classification(response)
+        labels[url] = label
+        pre.learn(url, label, confidence, evidence)
+
+    def reply(prompt: str) -> str:
+        label, confidence = rule_label(prompt.rsplit("Website content:", 1)[-1], pickup_is_salon)
+        return f"{label}|{confidence}|rule"
+
+    with mock_anthropic(latency=0.05, reply=reply) as (base_url, stats):
+        os.environ["ANTHROPIC_BASE_URL"] = base_url
+        started = time.perf_counter()
+        stream.crawl_and_classify(
+            {url: url for url in pages},
+            prepare,
+            step3_verify.CLASSIFICATION_PROMPT,
+            save_result,
+            profile="verify",
+            fetch=fetch,
+            near_dedup=False,
+        )
+        seconds = time.perf_counter() - started
+    return labels, stats.requests, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=800, help="Fresh pages per run")
+    parser.add_argument("--pickup", type=float, default=0.3, help="Share of salon pages offering pickup")
+    parser.add_argument("--audit", type=float, default=0.1, help="PRECLASSIFIER_AUDIT")
+    parser.add_argument("--min-examples", type=int, default=300, help="PRECLASSIFIER_MIN_EXAMPLES")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for n, (name, pickup_is_salon) in enumerate(
+            [("cold", False), ("warm", False), ("drift", True), ("retrained", True)]
+        ):
+            print(f"\n{name}: {args.pages} fresh pages")
+            pages = make_pages(rng, args.pages, n * args.pages, args.pickup)
+            pre = PreClassifier("step3", step3_verify.PRECLASSIFIER_LABELS, audit_rate=args.audit,
+                                min_examples=args.min_examples, cache_dir=cache_dir, seed=n)
+            labels, calls, seconds = run(pages, pre, pickup_is_salon)
+            agree = sum(labels.get(url) == rule_label(text, pickup_is_salon)[0] for url, text in pages.items())
+            print(f"  {calls} LLM calls for {len(pages)} pages; final labels agree with the rule on "
+                  f"{agree}/{len(pages)} ({agree / len(pages):.1%}); {seconds:.1f}s")
+            print(f"  {pre.report.summary()}")
+            pre.finish()
+            print(f"  {pre.describe()}")
+            pre.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Benchmark: pre-flight liveness probe vs sending every listing to the crawler.
+
+Everything is local: a stub resolver and probe_server() play live, dead,
+parked and social sites.
+
+    python pipeline/benchmarks/bench_preflight.py --sites 300
+"""
+
+import argparse
+import asyncio
+import ipaddress
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["CRAWL_CACHE_PATH"] = str(Path(tempfile.mkdtemp()) / "crawl.sqlite")
+
+from benchmarks.fixtures import probe_server
+from utils.fetch_policy import DEAD, PARKED, SOCIAL
+from utils.preflight import LIVE, preflight
+from utils.scheduler import sliding_window
+
+# label -> expected verdict
+KINDS = {
+    "live": LIVE,
+    "redirect": LIVE,
+    "no dns": DEAD,
+    "refused": DEAD,
+    "parked": PARKED,
+    "marketplace": PARKED,
+    "facebook": SOCIAL,
+    "to facebook": SOCIAL,
+}
+SHARES = {
+    "live": 0.55, "redirect": 0.1, "no dns": 0.1, "refused": 0.03, "parked": 0.07, "marketplace": 0.03,
+    "facebook": 0.08, "to facebook": 0.04,
+}
+
+
+async def stub_resolver(host: str) -> list[str]:
+    """Resolve IP literals only; every name is unknown (an expired domain)."""
+    await asyncio.sleep(0.01)
+    try:
+        return [str(ipaddress.ip_address(host))]
+    except ValueError:
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known") from None
+
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_sites(base_url: str, count: int) -> dict[str, str]:
+    """Return {url: label}."""
+    rng = random.Random(5)
+    refused = f"http://127.0.0.1:{closed_port()}"
+    labels = rng.choices(list(SHARES), weights=list(SHARES.values()), k=count)
+    urls = {
+        "live": lambda i: f"{base_url}/live-{i}",
+        "redirect": lambda i: f"{base_url}/hop-{i}",
+        "no dns": lambda i: f"http://pawsonwheels-{i}.invalid/",
+        "refused": lambda i: f"{refused}/site-{i}",
+        "parked": lambda i: f"{base_url}/parked-{i}",
+        "marketplace": lambda i: f"{base_url}/to-market-groomer{i}",
+        "facebook": lambda i: f"https://www.facebook.com/groomer{i}",
+        "to facebook": lambda i: f"{base_url}/to-social-groomer{i}",
+    }
+    return {urls[label](i): label for i, label in enumerate(labels)}
+
+
+async def model_crawl(urls: list[str], sites: dict[str, str], args) -> tuple[float, int]:
+    """Crawl urls on the modelled browser; return (seconds, pages produced)."""
+
+    async def render(url: str) -> bool:
+        answers = KINDS[sites[url]] != DEAD
+        await asyncio.sleep(args.render if answers else args.dead_cost)
+        return answers
+
+    started = time.perf_counter()
+    pages = sum([ok async for ok in sliding_window(urls, render, args.concurrency)])
+    return time.perf_counter() - started, pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sites", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10, help="Browser pages in flight")
+    parser.add_argument("--render", type=float, default=0.5, help="Modelled seconds per rendered page")
+    parser.add_argument("--dead-cost", type=float, default=3.0, help="Modelled seconds a dead site holds a slot")
+    args = parser.parse_args()
+
+    with probe_server() as base_url:
+        sites = make_sites(base_url, args.sites)
+        urls = list(sites)
+
+        started = time.perf_counter()
+        probes = asyncio.run(preflight(urls, resolver=stub_resolver))
+        first = time.perf_counter() - started
+        started = time.perf_counter()
+        again = asyncio.run(preflight(urls, resolver=stub_resolver))
+        second = time.perf_counter() - started
+
+        table = Counter((sites[url], probe.verdict) for url, probe in probes.items())
+        verdicts = (LIVE, DEAD, PARKED, SOCIAL)
+        print(f"{len(urls)} listings; probe {first:.2f}s, again {second:.2f}s "
+              f"({sum(p.cached for p in again.values())} from the negative cache)")
+        print(f"  {'label':<12}" + "".join(f"{v:>8}" for v in verdicts))
+        for label in KINDS:
+            print(f"  {label:<12}" + "".join(f"{table[label, v]:>8}" for v in verdicts))
+        correct = sum(probe.verdict == KINDS[sites[url]] for url, probe in probes.items())
+        print(f"  correct {correct}/{len(urls)}")
+
+        crawl_all, pages_all = asyncio.run(model_crawl(urls, sites, args))
+        live = [url for url in urls if probes[url].live]
+        crawl_live, pages_live = asyncio.run(model_crawl(live, sites, args))
+        print(f"  crawl everything         {crawl_all:6.2f}s  {len(urls)} fetches, {pages_all} pages to the LLM")
+        print(f"  probe, then crawl live   {first + crawl_live:6.2f}s  {len(live)} fetches, "
+              f"{pages_live} pages to the LLM")
+        print(f"  speedup {crawl_all / (first + crawl_live):.2f}x (later steps: "
+              f"{crawl_all / (second + crawl_live):.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark: prompt-prefix caching of the step prompts (PromptTemplate in utils/llm.py).
+
+Compares uncached, Haiku 4.5, Sonnet 4.5 and a prefix padded to Haiku's
+minimum; the mock enforces each model's minimum cacheable prefix.
+
+    python pipeline/benchmarks/bench_prompt_cache.py --items 200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "mock-key")
+
+from benchmarks.bench_near_dedup import CITIES, unique_pages
+from benchmarks.mock_anthropic import mock_anthropic
+from step3_verify import CLASSIFICATION_PROMPT
+from step4_services import SERVICE_PROMPT
+from step6_features import FEATURES_PROMPT
+from step7_service_areas import SERVICE_AREA_PROMPT
+from utils import llm
+from utils.content import select_content
+
+STEPS = {
+    "step3": (CLASSIFICATION_PROMPT, "verify"),
+    "step4": (SERVICE_PROMPT, "services"),
+    "step6": (FEATURES_PROMPT, "features"),
+    "step7": (SERVICE_AREA_PROMPT, "service_areas"),
+}
+HAIKU = "claude-haiku-4-5-20251001"
+SONNET = "claude-sonnet-4-5-20250929"
+RUNS = {"uncached": (False, HAIKU, False), "haiku-4-5": (True, HAIKU, False),
+        "sonnet-4-5": (True, SONNET, False), "padded": (True, HAIKU, True)}
+
+
+def padded(template: llm.PromptTemplate, model: str) -> llm.PromptTemplate:
+    """template with its prefix padded with filler lines up to model's minimum cacheable prefix."""
+    filler = "Reference note: answer in the exact format given above.\n"
+    missing = llm.min_cacheable_tokens(model) * 4 - len(template.prefix)
+    return llm.PromptTemplate(template.prefix + filler * (missing // len(filler) + 2), template.item)
+
+
+async def run(template: llm.PromptTemplate, items: list[dict], namespace: str, model: str) -> None:
+    async with llm.AsyncClassifier(template, model=model, cache_namespace=namespace, pack=1) as classifier:
+        await asyncio.gather(*(classifier.classify(item) for item in items))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.2, help="Mock seconds per request")
+    parser.add_argument("--prefill", type=float, default=0.1, help="Mock seconds per 1k uncached input tokens")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    pages = [text for text, _ in unique_pages(rng, args.items)]
+    print(f"{args.items} pages per step; mock {args.latency:.2f}s + {args.prefill:.2f}s per 1k uncached input tokens")
+    print(f"  {'step':<6} {'run':<10} {'prefix':>7} {'uncached':>9} {'read':>9} {'written':>8}  input cost  response")
+    for namespace, (template, profile) in STEPS.items():
+        items = [
+            {"content": select_content(text, profile), "city": rng.choice(CITIES), "state": "TX"} for text in pages
+        ]
+        baseline = 0
+        for label, (marker, model, pad) in RUNS.items():
+            llm.PROMPT_CACHE = marker
+            llm._governor = None
+            llm._prompt_usage.clear()
+            sent = padded(template, model) if pad else template
+            with mock_anthropic(latency=args.latency, prefill_per_1k=args.prefill) as (base_url, _):
+                os.environ["ANTHROPIC_BASE_URL"] = base_url
+                asyncio.run(run(sent, items, namespace, model))
+            usage = llm.prompt_cache_usage(namespace)
+            cost = (usage.input_tokens + llm.CACHE_WRITE_PRICE * usage.cache_write_tokens
+                    + llm.CACHE_READ_PRICE * usage.cache_read_tokens)
+            baseline = baseline or cost
+            seconds = (usage.seconds_cached + usage.seconds_uncached) / usage.requests
+            print(f"  {namespace:<6} {label:<10} {len(sent.prefix) // 4:>7,} {usage.input_tokens:>9,} "
+                  f"{usage.cache_read_tokens:>9,} {usage.cache_write_tokens:>8,}  {cost / baseline - 1:>+9.0%}  "
+                  f"{seconds:7.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Benchmark: step 2 cleaning, row-wise vs vectorized, at increasing scale.
+
+    python pipeline/benchmarks/bench_step2_clean.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+import step2_clean
+from utils.raw_filter import CHAIN_NAMES, chain_mask, compile_chain_pattern
+
+WORDS = ["happy", "paws", "mobile", "grooming", "spa", "tails", "pet", "dog", "wash", "van", "fluffy", "bark", "mutt"]
+CITIES = ["Austin", "Dallas", "St. Louis", "San Jose", "Boise", "Tampa", "Reno", "Fort Worth"]
+STATES = ["TX", "MO", "CA", "ID", "FL", "NV"]
+
+
+def make_chain_names(extra: int, rng: random.Random) -> list[str]:
+    """The real chain list padded with synthetic regional brands."""
+    names = list(CHAIN_NAMES)
+    while len(names) < len(CHAIN_NAMES) + extra:
+        names.append(f"{rng.choice(WORDS)}{rng.choice(WORDS)} {rng.choice(['pets', 'pet center', 'feed', 'supply'])}")
+    return names
+
+
+def make_rows(count: int, chains: list[str], rng: random.Random) -> pd.DataFrame:
+    names = []
+    for _ in range(count):
+        if rng.random() < 0.05:
+            names.append(f"{rng.choice(chains).title()} #{rng.randint(1, 999)}")
+        else:
+            names.append(" ".join(rng.choice(WORDS).title() for _ in range(rng.randint(2, 4))))
+    return pd.DataFrame(
+        {
+            "name": names,
+            "city": [rng.choice(CITIES) for _ in range(count)],
+            "state": [rng.choice(STATES) for _ in range(count)],
+        },
+        dtype="string",
+    )
+
+
+def rowwise(df: pd.DataFrame, chains: list[str]) -> pd.DataFrame:
+    """The pre-vectorization step 2 logic."""
+    df = df[~df["name"].apply(lambda name: any(chain in name.lower().strip() for chain in chains))].copy()
+    df["_dedup_key"] = (
+        df["name"].str.lower().str.strip() + "|" + df["city"].str.lower().str.strip() + "|"
+        + df["state"].str.lower().str.strip()
+    )
+    df = df.drop_duplicates(subset="_dedup_key", keep="first").drop(columns=["_dedup_key"])
+    df["slug"] = df.apply(
+        lambda row: re.sub(r"[^a-z0-9]+", "-", f"{row['name']} {row['city']} {row['state']}".lower()).strip("-"),
+        axis=1,
+    )
+    return df
+
+
+def vectorized(df: pd.DataFrame, pattern: str) -> pd.DataFrame:
+    """Current step 2 logic (chain_mask, dedup_keys, make_slugs)."""
+    df = df[~chain_mask(df["name"], pattern)]
+    df = df[~step2_clean.dedup_keys(df).duplicated(keep="first")].copy()
+    df["slug"] = step2_clean.make_slugs(df)
+    return df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--chains", type=int, default=400, help="Synthetic chain names added to chains.txt")
+    parser.add_argument("--baseline-max", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    chains = make_chain_names(args.chains, rng)
+    pattern = compile_chain_pattern(chains)
+    print(f"{len(chains)} chain names")
+    for size in args.sizes:
+        df = make_rows(size, chains, rng)
+        started = time.perf_counter()
+        kept = vectorized(df, pattern)
+        fast = time.perf_counter() - started
+        line = f"  {size:>9,} rows  vectorized {fast:6.2f}s {size / fast:>11,.0f} rows/s"
+        if size <= args.baseline_max:
+            started = time.perf_counter()
+            rowwise(df, chains)
+            slow = time.perf_counter() - started
+            line += f"  |  row-wise {slow:6.2f}s {size / slow:>9,.0f} rows/s  ({slow / fast:.0f}x)"
+        print(f"{line}  kept {len(kept):,}")
+
+
+if __name__ == "__main__":
+    main()
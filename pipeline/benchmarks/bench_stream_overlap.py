@@ -0,0 +1,110 @@
+"""Benchmark: crawl-then-classify vs streamed crawl -> LLM (utils/stream.py).
+
+    python pipeline/benchmarks/bench_stream_overlap.py --pages 300
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ["LLM_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "mock-key")
+os.environ["LLM_NEAR_DEDUP"] = "0"  # every fixture page is the same; classify each one
+
+import httpx
+
+from benchmarks.fixtures import slow_server
+from benchmarks.mock_anthropic import mock_anthropic
+from utils.content import select_content
+from utils.fetch_policy import FetchResult, failure_for_status
+from utils.llm import aclassify_batch
+from utils.scheduler import sliding_window
+from utils.stream import acrawl_and_classify
+
+TEMPLATE = "Classify this business.\n\nWebsite content:\n{content}"
+
+
+async def http_fetch(urls: list[str], concurrency: int, timeout: int):
+    """Stand-in for utils.crawler.iter_fetch: plain HTTP against the fixture server."""
+    async with httpx.AsyncClient(timeout=timeout) as client:
+
+        async def get(url: str) -> tuple[str, FetchResult]:
+            response = await client.get(url)
+            if response.status_code != 200:
+                return url, FetchResult(url, failure=failure_for_status(response.status_code))
+            return url, FetchResult(url, response.text, "http")
+
+        async for pair in sliding_window(urls, get, concurrency):
+            yield pair
+
+
+def prepare(key, text: str) -> dict:
+    return {"content": select_content(text, "verify")}
+
+
+async def two_phase(urls: dict, concurrency: int, max_concurrent: int) -> dict:
+    """Old shape: crawl everything, hold it, then classify."""
+    started = time.perf_counter()
+    crawled = {url: page.text async for url, page in http_fetch(list(urls.values()), concurrency, 30)}
+    crawl_done = time.perf_counter()
+    keys = [key for key, url in urls.items() if crawled.get(url)]
+    items = [prepare(key, crawled[urls[key]]) for key in keys]
+    await aclassify_batch(items, TEMPLATE, max_concurrent=max_concurrent)
+    return {"crawl": crawl_done - started, "wall": time.perf_counter() - started}
+
+
+async def streamed(urls: dict, concurrency: int, max_concurrent: int, queue_size: int) -> dict:
+    started = time.perf_counter()
+    result = await acrawl_and_classify(
+        urls, prepare, TEMPLATE, on_result=lambda key, response: None, concurrency=concurrency,
+        max_concurrent=max_concurrent, queue_size=queue_size, fetch=http_fetch,
+    )
+    return {"crawl": result.crawl_seconds, "wall": time.perf_counter() - started, "peak_queue": result.peak_queue}
+
+
+def measure(run) -> tuple[dict, float]:
+    """Run run() twice: once timed, once traced; return (timings, peak memory in MB)."""
+    timings = asyncio.run(run())
+    tracemalloc.start()
+    asyncio.run(run())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return timings, peak / 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--page-kb", type=float, default=20, help="Raw page size")
+    parser.add_argument("--crawl-delay", type=float, default=0.1, help="Seconds per page fetch")
+    parser.add_argument("--crawl-concurrency", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.4)
+    parser.add_argument("--llm-concurrency", type=int, default=16)
+    parser.add_argument("--queue", type=int, default=32)
+    args = parser.parse_args()
+
+    with slow_server() as site, mock_anthropic(latency=args.llm_latency) as (base_url, stats):
+        os.environ["ANTHROPIC_BASE_URL"] = base_url
+        urls = {i: f"{site}/site-{i}?delay={args.crawl_delay}&kb={args.page_kb}" for i in range(args.pages)}
+        crawl_only = args.pages * args.crawl_delay / args.crawl_concurrency
+        llm_only = args.pages * args.llm_latency / args.llm_concurrency
+        print(f"{args.pages} pages of {args.page_kb:.0f} KB; ideal crawl ~{crawl_only:.1f}s, ideal LLM ~{llm_only:.1f}s")
+
+        base, base_mem = measure(lambda: two_phase(urls, args.crawl_concurrency, args.llm_concurrency))
+        print(f"  two-phase  wall {base['wall']:6.2f}s  (crawl {base['crawl']:.2f}s)  peak memory {base_mem:6.1f} MB")
+        stream, stream_mem = measure(lambda: streamed(urls, args.crawl_concurrency, args.llm_concurrency, args.queue))
+        print(
+            f"  streamed   wall {stream['wall']:6.2f}s  (crawl {stream['crawl']:.2f}s)  peak memory {stream_mem:6.1f} MB"
+            f"  peak queue {stream['peak_queue']}/{args.queue}"
+        )
+        print(f"  speedup {base['wall'] / stream['wall']:.2f}x, memory {base_mem / stream_mem:.1f}x lower")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Local HTTP fixture servers used by the benchmarks.
+
+Nothing here talks to the internet. Servers run on 127.0.0.1 in a
+background thread and are shut down by the context managers.
+"""
+
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SAMPLE_PAGE = """<html><head><title>Paws on Wheels Mobile Grooming</title></head>
+<body>
+<nav><a href="/">Home</a> <a href="/services">Services</a> <a href="/contact">Contact</a></nav>
+<h1>Paws on Wheels</h1>
+<p>We bring our fully equipped mobile grooming van to your door. Full groom,
+bath, nail trim and deshedding for dogs and cats of every size.</p>
+<p>Licensed and insured, Fear Free certified, 12 years of experience.</p>
+<p>Prices start at $65 for small dogs and go up to $140 for giant breeds.</p>
+<footer>&copy; Paws on Wheels. All rights reserved.</footer>
+</body></html>
+"""
+
+
+FILLER = "<p>Serving happy pets and their people across the metro area since 2012.</p>\n"
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    """Serve SAMPLE_PAGE after the delay given by ?delay=<seconds>, padded to ?kb=<size>."""
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlsplit(self.path).query)
+        delay = float(query.get("delay", ["0"])[0])
+        time.sleep(delay)
+        page = SAMPLE_PAGE
+        padding = int(float(query.get("kb", ["0"])[0]) * 1024) - len(page)
+        if padding > 0:
+            page = page.replace("<footer>", FILLER * (padding // len(FILLER) + 1) + "<footer>")
+        body = page.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+# Pages that look the way a browser-only site looks to a plain HTTP fetch
+SPA_SHELL_PAGE = """<html><head><title>Groom Squad</title>
+<script src="/static/js/main.3f9a.js"></script></head>
+<body><noscript>You need to enable JavaScript to run this app.</noscript><div id="root"></div></body></html>
+"""
+NOSCRIPT_PAGE = """<html><head><title>Bubbles Mobile Spa</title></head>
+<body><noscript><p>Please enable JavaScript to view this website.</p></noscript>
+<div class="loader">Loading Bubbles Mobile Spa, the mobile dog grooming van that comes to your door...</div>
+<p>Book your next full groom online.</p></body></html>
+"""
+THIN_PAGE = "<html><head><title>Welcome</title></head><body><p>Coming soon.</p></body></html>\n"
+
+VARIANT_PAGES = {"spa": SPA_SHELL_PAGE, "noscript": NOSCRIPT_PAGE, "thin": THIN_PAGE}
+
+
+class _VariantHandler(_SlowHandler):
+    """Like _SlowHandler, but /spa..., /noscript... and /thin... serve VARIANT_PAGES."""
+
+    def do_GET(self) -> None:
+        variant = urlsplit(self.path).path.strip("/").split("-")[0]
+        if variant not in VARIANT_PAGES:
+            return super().do_GET()
+        time.sleep(float(parse_qs(urlsplit(self.path).query).get("delay", ["0"])[0]))
+        body = VARIANT_PAGES[variant].encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _FlakyHandler(_SlowHandler):
+    """Like _SlowHandler, but misbehaves on a URL's first requests.
+
+    ?fail=N answers the first N requests for the path with 503; ?stall=S
+    holds the first request for S extra seconds (a straggler that a second
+    attempt would beat).
+    """
+
+    seen: dict[str, int] = {}
+    lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlsplit(self.path).query)
+        with self.lock:
+            count = self.seen[self.path] = self.seen.get(self.path, 0) + 1
+        if count <= int(query.get("fail", ["0"])[0]):
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if count == 1:
+            time.sleep(float(query.get("stall", ["0"])[0]))
+        super().do_GET()
+
+
+# What an expired domain shows once a registrar or parking service takes it over
+PARKED_PAGE = """<html><head><title>pawsonwheels-grooming.com</title>
+<script src="//www.parkingcrew.net/public/js/parking.2.100.0.js"></script></head>
+<body><h1>pawsonwheels-grooming.com</h1><p>This domain may be for sale!</p>
+<p>Related searches: Dog Grooming, Pet Supplies, Mobile Dog Wash</p></body></html>
+"""
+
+
+class _ProbeHandler(_SlowHandler):
+    """Like _SlowHandler, plus the shapes dead listings take for the pre-flight probe.
+
+    /parked... serves PARKED_PAGE; /to-social... redirects to a Facebook
+    page, /to-market... to a domain marketplace, /hop... to a live page on
+    the same server. Redirect targets off this server are never fetched by
+    the probe.
+    """
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        location = None
+        if path.startswith("/to-social"):
+            location = f"https://www.facebook.com/{path.rsplit('-', 1)[-1]}"
+        elif path.startswith("/to-market"):
+            location = f"https://www.hugedomains.com/domain_profile.cfm?d={path.rsplit('-', 1)[-1]}"
+        elif path.startswith("/hop"):
+            location = f"/live{path[len('/hop'):]}"
+        if location:
+            self.send_response(301)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if not path.startswith("/parked"):
+            return super().do_GET()
+        body = PARKED_PAGE.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _FixtureServer(ThreadingHTTPServer):
+    # The default backlog of 5 resets connections under benchmark concurrency
+    request_queue_size = 256
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients hang up on purpose (timeouts, cancelled hedges); that is not an error here
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+@contextmanager
+def serve(handler: type[BaseHTTPRequestHandler] = _SlowHandler, host: str = "127.0.0.1"):
+    """Run handler on an ephemeral localhost port, yield its base URL."""
+    server = _FixtureServer((host, 0), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def slow_server():
+    """Serve SAMPLE_PAGE with a per-request delay taken from ?delay= (and size from ?kb=)."""
+    return serve(_SlowHandler)
+
+
+@contextmanager
+def site_farm(sites: int):
+    """Run `sites` slow servers, each on its own loopback address (127.0.0.2, ...).
+
+    Every server is a distinct registrable domain to the crawler, so the
+    per-domain throttle and domain sharding treat them as separate sites.
+    Yields their base URLs. Linux routes all of 127.0.0.0/8 to loopback.
+    """
+    with ExitStack() as stack:
+        yield [stack.enter_context(serve(_SlowHandler, f"127.0.0.{i + 2}")) for i in range(sites)]
+
+
+def variant_server():
+    """Serve SAMPLE_PAGE (padded by ?kb=) plus the /spa, /noscript and /thin variants."""
+    return serve(_VariantHandler)
+
+
+def flaky_server():
+    """Serve SAMPLE_PAGE with first-request failures (?fail=) and stragglers (?stall=)."""
+    _FlakyHandler.seen.clear()
+    return serve(_FlakyHandler)
+
+
+def probe_server():
+    """Serve SAMPLE_PAGE plus parked pages and social / marketplace / same-site redirects."""
+    return serve(_ProbeHandler)
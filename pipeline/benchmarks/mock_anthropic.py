@@ -0,0 +1,237 @@
+"""Local stand-in for the Anthropic Messages API.
+
+Point the SDK at it with ANTHROPIC_BASE_URL=<base_url>. It can inject
+latency and 429s, and caches cache_control blocks like the real API.
+"""
+
+import inspect
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler
+
+from benchmarks.fixtures import serve
+from utils.llm import min_cacheable_tokens
+
+
+def default_reply(prompt: str) -> str:
+    """Answer every prompt like a confident step 3 classification."""
+    return "MOBILE_GROOMER|90|mock response"
+
+
+@dataclass
+class MockStats:
+    """Counters collected by the mock server."""
+
+    requests: int = 0
+    rate_limited: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    input_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    batches_created: int = 0
+    batch_polls: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+def _message(model: str, text: str, input_tokens: int, cache_read: int = 0, cache_write: int = 0) -> dict:
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": model,
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": input_tokens,
+            "output_tokens": max(1, len(text) // 4),
+            "cache_read_input_tokens": cache_read,
+            "cache_creation_input_tokens": cache_write,
+        },
+    }
+
+
+def _batch_object(batch: dict, base_url: str) -> dict:
+    ended = batch["ended"]
+    total = len(batch["requests"])
+    return {
+        "id": batch["id"],
+        "type": "message_batch",
+        "processing_status": "ended" if ended else "in_progress",
+        "request_counts": {
+            "processing": 0 if ended else total,
+            "succeeded": total if ended else 0,
+            "errored": 0,
+            "canceled": 0,
+            "expired": 0,
+        },
+        "created_at": batch["created_at"],
+        "expires_at": batch["expires_at"],
+        "ended_at": batch["expires_at"] if ended else None,
+        "archived_at": None,
+        "cancel_initiated_at": None,
+        "results_url": f"{base_url}/v1/messages/batches/{batch['id']}/results" if ended else None,
+    }
+
+
+def _prompt_text(body: dict) -> str:
+    """Flatten the user message content of a Messages request."""
+    content = body["messages"][0]["content"]
+    if isinstance(content, str):
+        return content
+    return "".join(block.get("text", "") for block in content)
+
+
+def _cached_prefix(body: dict) -> str:
+    """Text up to and including the last content block marked cache_control ("" if none)."""
+    content = body["messages"][0]["content"]
+    if isinstance(content, str):
+        return ""
+    marked = [i for i, block in enumerate(content) if "cache_control" in block]
+    return "".join(block.get("text", "") for block in content[: marked[-1] + 1]) if marked else ""
+
+
+@contextmanager
+def mock_anthropic(
+    latency: float = 0.2,
+    rate_limit_every: int = 0,
+    reply=default_reply,
+    limits: dict[str, int] | None = None,
+    batch_duration: float = 0.5,
+    min_cache_tokens: int | None = None,
+    prefill_per_1k: float = 0.0,
+):
+    """Serve the mock API, yield (base_url, stats).
+
+    cache_control prefixes of at least `min_cache_tokens` (default: the model's
+    minimum) are cached; Message Batches end `batch_duration` seconds after
+    creation; `limits` is advertised in anthropic-ratelimit-* headers.
+    """
+    limit_headers = {f"anthropic-ratelimit-{name}-limit": str(value) for name, value in (limits or {}).items()}
+    stats = MockStats()
+    batches: dict[str, dict] = {}
+    answer = reply if len(inspect.signature(reply).parameters) > 1 else lambda prompt, model: reply(prompt)
+    prompt_cache: set[str] = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send_json(self, status: int, payload: dict, headers: dict | None = None) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _not_found(self) -> None:
+            self._send_json(404, {"type": "error", "error": {"type": "not_found_error", "message": self.path}})
+
+        def _base_url(self) -> str:
+            return f"http://{self.headers.get('Host')}"
+
+        def do_GET(self) -> None:
+            parts = self.path.split("?")[0].strip("/").split("/")
+            if parts[:3] != ["v1", "messages", "batches"] or len(parts) < 4 or parts[3] not in batches:
+                self._not_found()
+                return
+            batch = batches[parts[3]]
+            batch["ended"] = batch["ended"] or time.time() - batch["started"] >= batch_duration
+            if len(parts) == 4:
+                with stats.lock:
+                    stats.batch_polls += 1
+                self._send_json(200, _batch_object(batch, self._base_url()))
+                return
+            if len(parts) == 5 and parts[4] == "results" and batch["ended"]:
+                lines = []
+                for request in batch["requests"]:
+                    params = request["params"]
+                    prompt = _prompt_text(params)
+                    model = params.get("model", "mock")
+                    message = _message(model, answer(prompt, model), max(1, len(prompt) // 4))
+                    lines.append(json.dumps({"custom_id": request["custom_id"],
+                                             "result": {"type": "succeeded", "message": message}}))
+                body = ("\n".join(lines) + "\n").encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/binary")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            self._not_found()
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length", "0"))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if self.path.rstrip("/") == "/v1/messages/batches":
+                batch_id = f"msgbatch_{uuid.uuid4().hex[:24]}"
+                now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+                batches[batch_id] = {
+                    "id": batch_id,
+                    "requests": body["requests"],
+                    "started": time.time(),
+                    "created_at": now,
+                    "expires_at": now,
+                    "ended": False,
+                }
+                with stats.lock:
+                    stats.batches_created += 1
+                self._send_json(200, _batch_object(batches[batch_id], self._base_url()))
+                return
+            if self.path.rstrip("/") != "/v1/messages":
+                self._not_found()
+                return
+
+            with stats.lock:
+                stats.requests += 1
+                count = stats.requests
+                stats.in_flight += 1
+                stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            try:
+                prompt = _prompt_text(body)
+                input_tokens = max(1, len(prompt) // 4)
+                model = body.get("model", "mock")
+                minimum = min_cacheable_tokens(model) if min_cache_tokens is None else min_cache_tokens
+                prefix = _cached_prefix(body)
+                cache_read = cache_write = 0
+                if prefix and len(prefix) // 4 >= minimum:
+                    with stats.lock:
+                        hit = prefix in prompt_cache
+                        prompt_cache.add(prefix)
+                    if hit:
+                        cache_read = len(prefix) // 4
+                    else:
+                        cache_write = len(prefix) // 4
+                    input_tokens -= cache_read + cache_write
+                time.sleep(latency + prefill_per_1k * (input_tokens + cache_write) / 1000)
+                if rate_limit_every and count % rate_limit_every == 0:
+                    with stats.lock:
+                        stats.rate_limited += 1
+                    self._send_json(
+                        429,
+                        {"type": "error", "error": {"type": "rate_limit_error", "message": "mock 429"}},
+                        {"retry-after": "0.5"},
+                    )
+                    return
+                with stats.lock:
+                    stats.input_tokens += input_tokens
+                    stats.cache_read_tokens += cache_read
+                    stats.cache_write_tokens += cache_write
+                message = _message(model, answer(prompt, model), input_tokens, cache_read, cache_write)
+                self._send_json(200, message, limit_headers)
+            finally:
+                with stats.lock:
+                    stats.in_flight -= 1
+
+        def log_message(self, format: str, *args) -> None:
+            pass
+
+    with serve(Handler) as base_url:
+        yield base_url, stats
@@ -0,0 +1,33 @@
+"""Crawl daemon: one warm browser pool shared by every pipeline process.
+
+    python pipeline/crawl_daemon.py --port 8765
+    CRAWL_DAEMON=127.0.0.1:8765 python pipeline/step3_verify.py
+
+Steps started with CRAWL_DAEMON set send their URLs here instead of
+launching browsers of their own (see utils/crawler.py).
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from utils.crawler import POOL_SIZE, BrowserPool, PageFetcher, serve
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a warm Crawl4AI browser pool on localhost")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--browsers", type=int, default=POOL_SIZE, help="Warm browsers to keep")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, PageFetcher(BrowserPool(size=args.browsers))))
+    except KeyboardInterrupt:
+        print("  [pool] Crawl daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
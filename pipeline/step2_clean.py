@@ -1,27 +1,42 @@
 """Step 2: Clean and deduplicate raw Outscraper data."""
 
+import argparse
 import re
 import sys
 from pathlib import Path
 
+import pandas as pd
+
 # Allow imports from pipeline root
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from utils.csv_utils import read_all_csvs, write_csv
+from utils.csv_utils import write_csv, write_table
+from utils.dedup import fuzzy_dedup
+from utils.ingest import ingest_raw
+from utils.raw_filter import CHAIN_PATTERN, REQUIRED_COLUMNS, filter_chunk
 
 PIPELINE_DIR = Path(__file__).resolve().parent
 RAW_DIR = PIPELINE_DIR / "step1_outscraper" / "raw"
 OUTPUT_PATH = PIPELINE_DIR / "data" / "step2_cleaned.csv"
-
-CHAIN_NAMES = [
-    "petsmart",
-    "petco",
-    "walmart",
-    "target",
-    "petvalu",
-    "pet valu",
-    "pet supplies plus",
-]
+DUPLICATES_PATH = PIPELINE_DIR / "data" / "step2_duplicates.csv"
+
+# Types of the raw-export columns step 2 uses (other columns are kept as text)
+RAW_DTYPES = {
+    "name": "string",
+    "full_address": "string",
+    "city": "string",
+    "state": "string",
+    "zip": "string",
+    "phone": "string",
+    "website": "string",
+    "rating": "Float64",
+    "reviews_count": "Float64",
+    "google_maps_url": "string",
+    "place_id": "string",
+    "latitude": "Float64",
+    "longitude": "Float64",
+    "business_status": "string",
+}
 
 
 def make_slug(name: str, city: str, state: str) -> str:
@@ -31,71 +46,66 @@ def make_slug(name: str, city: str, state: str) -> str:
     return slug.strip("-")
 
 
-def is_chain(name: str) -> bool:
-    """Check if a business name matches a known chain."""
-    name_lower = name.lower().strip()
-    return any(chain in name_lower for chain in CHAIN_NAMES)
+def make_slugs(df: pd.DataFrame) -> pd.Series:
+    """Vectorized make_slug over the name, city and state columns."""
+    raw = (df["name"].astype("string") + " " + df["city"].astype("string") + " " + df["state"].astype("string"))
+    return raw.str.lower().str.replace(r"[^a-z0-9]+", "-", regex=True).str.strip("-")
+
 
+def dedup_keys(df: pd.DataFrame) -> pd.Series:
+    """name|city|state, lowercased and trimmed, for exact-duplicate removal."""
+    parts = [df[col].astype("string").str.lower().str.strip() for col in ("name", "city", "state")]
+    return parts[0] + "|" + parts[1] + "|" + parts[2]
 
-def clean() -> None:
+
+def clean(full: bool = False, fuzzy: bool = True) -> None:
     """Run the cleaning pipeline."""
     print("=" * 60)
     print("STEP 2: Clean & Deduplicate")
     print("=" * 60)
 
-    # Read all raw CSVs
+    # Read raw CSVs; missing-field, closed and chain filters run per chunk
     print(f"\nReading CSVs from {RAW_DIR} ...")
-    df = read_all_csvs(str(RAW_DIR))
-    total_raw = len(df)
+    df, counts = ingest_raw(RAW_DIR, RAW_DTYPES, filter_chunk, version=CHAIN_PATTERN, full=full)
+    total_raw = counts["rows"]
     print(f"  Total raw rows: {total_raw}")
 
-    # Remove rows missing required fields
-    required_cols = ["name", "full_address", "city", "state"]
-    for col in required_cols:
+    for col in REQUIRED_COLUMNS:
         if col not in df.columns:
-            # Try common Outscraper column name variants
             print(f"  WARNING: Column '{col}' not found. Available: {list(df.columns)}")
-    before = len(df)
-    df = df.dropna(subset=[c for c in required_cols if c in df.columns])
-    removed_missing = before - len(df)
+    removed_missing = counts["missing"]
     print(f"  Removed {removed_missing} rows with missing required fields")
-
-    # Remove permanently closed businesses
-    before = len(df)
-    if "business_status" in df.columns:
-        df = df[~df["business_status"].str.upper().isin(["CLOSED_PERMANENTLY", "PERMANENTLY_CLOSED"])]
-    removed_closed = before - len(df)
+    removed_closed = counts["closed"]
     print(f"  Removed {removed_closed} permanently closed businesses")
-
-    # Remove known chains
-    before = len(df)
-    df = df[~df["name"].apply(is_chain)]
-    removed_chains = before - len(df)
+    removed_chains = counts["chains"]
     print(f"  Removed {removed_chains} known chain stores")
 
     # Deduplicate by name + city + state
     before = len(df)
-    df["_dedup_key"] = (
-        df["name"].str.lower().str.strip()
-        + "|"
-        + df["city"].str.lower().str.strip()
-        + "|"
-        + df["state"].str.lower().str.strip()
-    )
-    df = df.drop_duplicates(subset="_dedup_key", keep="first")
-    df = df.drop(columns=["_dedup_key"])
+    df = df[~dedup_keys(df).duplicated(keep="first")]
     removed_dupes = before - len(df)
     print(f"  Removed {removed_dupes} duplicate rows")
 
+    # Fuzzy dedup: same phone / site / place / location / near-identical name
+    removed_fuzzy = 0
+    if fuzzy:
+        result = fuzzy_dedup(df)
+        df = result.df
+        removed_fuzzy = result.stats["removed"]
+        print(f"  Merged {removed_fuzzy} near-duplicate rows: {result.summary()}")
+        if len(result.clusters):
+            write_csv(result.clusters, str(DUPLICATES_PATH))
+            print(f"  Clusters for review: {DUPLICATES_PATH}")
+
     # Generate slugs
-    df["slug"] = df.apply(lambda row: make_slug(str(row["name"]), str(row["city"]), str(row["state"])), axis=1)
+    df["slug"] = make_slugs(df)
 
     # Sort by state, city, name
     df = df.sort_values(["state", "city", "name"]).reset_index(drop=True)
 
     # Write output
-    write_csv(df, str(OUTPUT_PATH))
-    print(f"\n  Output: {OUTPUT_PATH}")
+    output = write_table(df, OUTPUT_PATH, schema="step2")
+    print(f"\n  Output: {output}")
     print(f"  Final count: {len(df)} rows")
 
     # Summary
@@ -105,9 +115,14 @@ def clean() -> None:
     print(f"  Closed:            -{removed_closed}")
     print(f"  Chains:            -{removed_chains}")
     print(f"  Duplicates:        -{removed_dupes}")
+    print(f"  Near-duplicates:   -{removed_fuzzy}")
     print(f"  Final:              {len(df)}")
     print("=" * 60)
 
 
 if __name__ == "__main__":
-    clean()
+    parser = argparse.ArgumentParser(description="Step 2: clean and deduplicate raw exports")
+    parser.add_argument("--full", action="store_true", help="Re-parse every raw export, ignoring the ingest manifest")
+    parser.add_argument("--exact-only", action="store_true", help="Skip fuzzy dedup (exact name|city|state only)")
+    args = parser.parse_args()
+    clean(full=args.full, fuzzy=not args.exact_only)
@@ -3,8 +3,11 @@
 This is the MOST CRITICAL step in the pipeline. It crawls each business
 website and uses Claude Haiku to classify whether the business is a
 mobile pet groomer, a salon-only groomer, or not a groomer at all.
+Unsure answers are re-checked by a stronger model (utils.cascade), and
+clear-cut pages can be settled by a local model (utils.preclassifier).
 """
 
+import os
 import sys
 from pathlib import Path
 
@@ -12,17 +15,35 @@ import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from utils.crawler import crawl_urls
-from utils.csv_utils import read_csv, write_csv
-from utils.llm import classify_batch
+from utils.cascade import CASCADE, CASCADE_MODEL, CONTENT_FACTOR, Cascade, parse_thresholds
+from utils.cli import parse_step_args
+from utils.content import PROFILES, format_savings, select_content
+from utils.csv_utils import read_table, write_table
+from utils.fetch_policy import SOCIAL, TRANSIENT
+from utils.journal import StepJournal
+from utils.llm import PromptTemplate, classify_batch, prompt_cache_status
+from utils.preclassifier import (
+    AUDIT_RATE,
+    EVIDENCE,
+    MARGIN,
+    MIN_AGREEMENT,
+    MIN_COVERAGE,
+    MIN_EXAMPLES,
+    PRECLASSIFIER,
+    PreClassifier,
+)
+from utils.stream import crawl_and_classify
 
 PIPELINE_DIR = Path(__file__).resolve().parent
 INPUT_PATH = PIPELINE_DIR / "data" / "step2_cleaned.csv"
 OUTPUT_PATH = PIPELINE_DIR / "data" / "step3_verified.csv"
 
+SOCIAL_EVIDENCE = "Website is a social media page"
+
 CLASSIFICATION_SYSTEM = "You are classifying businesses for a mobile pet grooming directory."
 
-CLASSIFICATION_PROMPT = """You are classifying businesses for a mobile pet grooming directory.
+CLASSIFICATION_PROMPT = PromptTemplate(
+    prefix="""You are classifying businesses for a mobile pet grooming directory.
 
 Based on the website content below, classify this business as one of:
 - MOBILE_GROOMER: The business offers mobile/in-home pet grooming (they come to the customer)
@@ -34,11 +55,23 @@ Look for keywords: "mobile", "we come to you", "at your door", "in-home", "house
 
 A business that offers BOTH mobile AND salon services should be classified as MOBILE_GROOMER.
 
-Website content:
-{content}
-
 Respond with ONLY the classification (MOBILE_GROOMER, SALON_ONLY, NOT_GROOMER, or UNCLEAR) followed by a pipe | and a confidence score 0-100, followed by a pipe | and brief evidence.
-Example: MOBILE_GROOMER|85|Website says "we bring our fully equipped van to your door\""""
+Example: MOBILE_GROOMER|85|Website says "we bring our fully equipped van to your door"
+
+""",
+    item="""Website content:
+{content}""",
+)
+
+
+# First-pass answers below these confidences go to the cascade's second pass (UNCLEAR always).
+# SALON_ONLY and NOT_GROOMER drop the row, so a doubtful one can cost a real listing.
+CASCADE_THRESHOLDS = parse_thresholds(
+    os.getenv("STEP3_CASCADE_THRESHOLDS", "MOBILE_GROOMER=70,SALON_ONLY=80,NOT_GROOMER=80,UNCLEAR=101")
+)
+
+# Labels the local pre-classifier learns and may settle (never UNCLEAR)
+PRECLASSIFIER_LABELS = ("MOBILE_GROOMER", "SALON_ONLY", "NOT_GROOMER")
 
 
 def parse_classification(response: str) -> tuple[str, int, str]:
@@ -63,6 +96,57 @@ def parse_classification(response: str) -> tuple[str, int, str]:
     return label, confidence, evidence
 
 
+def escalate(escalated: list, urls: dict, fetch_pages=None) -> dict:
+    """Second cascade pass: classify rows again with CASCADE_MODEL on a wider window of each page.
+
+    Returns {idx: response}; rows whose page could not be re-read are
+    missing, and a failed request gives None.
+    """
+    if fetch_pages is None:
+        from utils.crawler import crawl_urls as fetch_pages  # served from the crawl cache
+    pages = fetch_pages(sorted({urls[idx] for idx in escalated}), concurrency=5, timeout=15)
+    budget = int(PROFILES["verify"]["budget"] * CONTENT_FACTOR)
+    keys = [idx for idx in escalated if pages.get(urls[idx])]
+    items = [{"content": select_content(pages[urls[idx]], "verify", budget)} for idx in keys]
+    responses = classify_batch(
+        items, CLASSIFICATION_PROMPT, model=CASCADE_MODEL, cache_namespace="step3", profile="verify"
+    )
+    return dict(zip(keys, responses))
+
+
+def history_examples(df: pd.DataFrame, indices) -> list[tuple[str, str, int, str]]:
+    """Restored rows' Claude answers with their cached page content, to seed the pre-classifier.
+
+    step3_verified.csv keeps only the rows that pass the filter, so the
+    journal (every classified row) is the history to learn from.
+    """
+    from utils.crawl_cache import get_cache
+
+    cache = get_cache()
+    if cache is None:
+        return []
+    examples = []
+    for idx in indices:
+        label = df.at[idx, "classification"]
+        evidence = str(df.at[idx, "evidence"] or "")
+        if label not in PRECLASSIFIER_LABELS or evidence.startswith(EVIDENCE):
+            continue
+        entry = cache.get(df.at[idx, "website"], allow_stale=True)
+        if entry is not None and entry.text:
+            confidence = int(df.at[idx, "verification_confidence"])
+            examples.append((select_content(entry.text, "verify"), label, confidence, evidence))
+    return examples
+
+
+def journal_version() -> str:
+    """The prompt plus the cascade and pre-classifier settings: changing any of them redoes journaled rows."""
+    cascade = f"cascade={CASCADE}" + (f",{CASCADE_MODEL},{CONTENT_FACTOR},{CASCADE_THRESHOLDS}" if CASCADE else "")
+    pre = f"preclassifier={PRECLASSIFIER}"
+    if PRECLASSIFIER:
+        pre += f",{MARGIN},{AUDIT_RATE},{MIN_EXAMPLES},{MIN_AGREEMENT},{MIN_COVERAGE}"
+    return "\n".join([str(CLASSIFICATION_PROMPT), cascade, pre])
+
+
 def verify() -> None:
     """Run the verification pipeline."""
     print("=" * 60)
@@ -71,7 +155,7 @@ def verify() -> None:
 
     # Read cleaned data
     print(f"\nReading {INPUT_PATH} ...")
-    df = read_csv(str(INPUT_PATH))
+    df = read_table(INPUT_PATH)
     total = len(df)
     print(f"  Total rows: {total}")
 
@@ -87,44 +171,110 @@ def verify() -> None:
     print(f"  With website: {len(df_with_site)}")
     print(f"  Without website: {len(df_no_site)}")
 
-    if len(df_with_site) > 0:
-        # Crawl all websites
-        urls = df_with_site["website"].tolist()
-        print(f"\nCrawling {len(urls)} websites ...")
-        crawled = crawl_urls(urls, batch_size=5, timeout=15)
-
-        crawl_success = sum(1 for v in crawled.values() if v is not None)
-        print(f"  Crawled successfully: {crawl_success}/{len(urls)}")
-
-        # Prepare items for classification
-        items_to_classify = []
-        classify_indices = []
-        for idx, row in df_with_site.iterrows():
-            url = row["website"]
-            text = crawled.get(url)
-            if text:
-                # Truncate to ~4000 chars to stay within token limits
-                content = text[:4000]
-                items_to_classify.append({"content": content})
-                classify_indices.append(idx)
+    # Rows finished by an earlier (possibly interrupted) run are restored as-is
+    journal = StepJournal("step3", version=journal_version(), inputs=["website"])
+    pending = journal.restore(df, df_with_site.index)
+    print(f"  {journal.summary()}")
+    print("  " + prompt_cache_status(CLASSIFICATION_PROMPT, namespace="step3"))
+    cascade = Cascade(CASCADE_THRESHOLDS) if CASCADE else None
+    pre = PreClassifier("step3", PRECLASSIFIER_LABELS) if PRECLASSIFIER else None
+    if pre is not None and pre.store.count() < pre.min_examples:
+        restored = set(df_with_site.index) - set(pending)
+        pre.seed(history_examples(df, sorted(restored)))
+
+    if pending:
+        # Crawl the remaining websites; each page is classified as soon as it arrives
+        urls = df.loc[pending, "website"].to_dict()
+        print(f"\nCrawling and classifying {len(urls)} websites via Claude Haiku ...")
+
+        escalated: dict = {}  # idx -> first-pass label, for rows the second pass will redo
+
+        def prepare(idx, text: str) -> dict | None:
+            """Keep only the paragraphs relevant to verification; settle clear-cut pages locally."""
+            content = select_content(text, "verify")
+            local = pre.route(idx, content) if pre is not None else None
+            if local is None:
+                return {"content": content}
+            label, probability = local
+            values = {
+                "classification": label,
+                "verification_confidence": round(probability * 100),
+                "evidence": f"{EVIDENCE} (p={probability:.2f})",
+            }
+            for key, value in values.items():
+                df.at[idx, key] = value
+            journal.record(idx, values)
+            return None
+
+        def save_result(idx, response: str) -> None:
+            """Apply one classification and checkpoint the row (after the second pass, if escalated)."""
+            label, confidence, evidence = parse_classification(response)
+            values = {"classification": label, "verification_confidence": confidence, "evidence": evidence}
+            for key, value in values.items():
+                df.at[idx, key] = value
+            if cascade is not None and cascade.escalate(label, confidence):
+                escalated[idx] = label
+                return
+            if pre is not None:
+                pre.learn(idx, label, confidence, evidence)
+            journal.record(idx, values)
+
+        result = crawl_and_classify(
+            urls,
+            prepare,
+            prompt_template=CLASSIFICATION_PROMPT,
+            on_result=save_result,
+            cache_namespace="step3",
+            profile="verify",
+            concurrency=5,
+            timeout=15,
+        )
+        print(f"  Crawled successfully: {len(urls) - len(result.uncrawled)}/{len(urls)}")
+        print(f"  {format_savings('verify')}")
+        transient = 0
+        for idx, failure in result.uncrawled.items():
+            if failure == SOCIAL:
+                # No site of their own to verify; dropped like other uncrawled sites
+                values = {"classification": "UNCLEAR", "evidence": SOCIAL_EVIDENCE}
             else:
-                df.at[idx, "classification"] = "UNCLEAR"
-                df.at[idx, "evidence"] = "Could not crawl website"
-
-        # Classify via Claude
-        if items_to_classify:
-            print(f"\nClassifying {len(items_to_classify)} businesses via Claude Haiku ...")
-            responses = classify_batch(
-                items=items_to_classify,
-                prompt_template=CLASSIFICATION_PROMPT,
-                max_concurrent=10,
-            )
-
-            for idx, response in zip(classify_indices, responses):
+                values = {"classification": "UNCLEAR", "evidence": f"Could not crawl website ({failure})"}
+            for key, value in values.items():
+                df.at[idx, key] = value
+            if failure in TRANSIENT:
+                # Not journaled, so a re-run retries exactly these rows
+                transient += 1
+            else:
+                # Permanent (dns, 4xx, parked, social ...): retrying would fail the same way
+                journal.record(idx, values)
+        if transient:
+            print(f"  {transient} sites failed transiently (timeouts, 5xx); re-run step 3 to retry them")
+        for idx in result.failed:
+            df.at[idx, "evidence"] = "Classification request failed"
+            if pre is not None:
+                pre.forget(idx)
+
+        if escalated:
+            print(f"\nEscalating {len(escalated)} uncertain classifications to {CASCADE_MODEL} ...")
+            responses = escalate(list(escalated), urls)
+            for idx, first in escalated.items():
+                response = responses.get(idx)
+                if response is None:
+                    # First answer stays in df but is not journaled, so a re-run escalates it again
+                    cascade.settle(first, None)
+                    if pre is not None:
+                        pre.forget(idx)
+                    continue
                 label, confidence, evidence = parse_classification(response)
-                df.at[idx, "classification"] = label
-                df.at[idx, "verification_confidence"] = confidence
-                df.at[idx, "evidence"] = evidence
+                values = {"classification": label, "verification_confidence": confidence, "evidence": evidence}
+                for key, value in values.items():
+                    df.at[idx, key] = value
+                cascade.settle(first, label)
+                if pre is not None:
+                    pre.learn(idx, label, confidence, evidence)
+                journal.record(idx, values)
+
+    if pre is not None:
+        pre.finish()
 
     # Mark no-website rows as UNCLEAR (keep them — they have Maps data)
     df.loc[~has_website, "classification"] = "UNCLEAR"
@@ -137,8 +287,9 @@ def verify() -> None:
     df_filtered = df[keep_mask].copy().reset_index(drop=True)
 
     # Write output
-    write_csv(df_filtered, str(OUTPUT_PATH))
-    print(f"\n  Output: {OUTPUT_PATH}")
+    output = write_table(df_filtered, OUTPUT_PATH, schema="step3")
+    journal.compact()
+    print(f"\n  Output: {output}")
 
     # Stats
     counts = df["classification"].value_counts()
@@ -149,8 +300,18 @@ def verify() -> None:
     print(f"  MOBILE_GROOMER kept: {(df_filtered['classification'] == 'MOBILE_GROOMER').sum()}")
     print(f"  UNCLEAR (no website) kept: {(df_filtered['classification'] == 'UNCLEAR').sum()}")
     print(f"  Total output rows: {len(df_filtered)}")
+    if cascade is not None and cascade.report.answers:
+        print(f"\n--- Cascade ---")
+        print(f"  {cascade.report.summary()}")
+    if pre is not None:
+        print(f"\n--- Pre-classifier ---")
+        if pending:
+            print(f"  {pre.report.summary()}")
+        print(f"  {pre.describe()}")
+        pre.close()
     print("=" * 60)
 
 
 if __name__ == "__main__":
+    parse_step_args("Step 3: verify mobile groomers")
     verify()
@@ -7,15 +7,20 @@ import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from utils.crawler import crawl_urls
-from utils.csv_utils import read_csv, write_csv
-from utils.llm import classify_batch
+from utils.cli import parse_step_args
+from utils.content import format_savings, select_content
+from utils.csv_utils import read_table, write_table
+from utils.extract import format_coverage, match_services, matcher_version
+from utils.journal import StepJournal
+from utils.llm import PromptTemplate, prompt_cache_status
+from utils.stream import crawl_and_classify
 
 PIPELINE_DIR = Path(__file__).resolve().parent
 INPUT_PATH = PIPELINE_DIR / "data" / "step3_verified.csv"
 OUTPUT_PATH = PIPELINE_DIR / "data" / "step4_services.csv"
 
-SERVICE_PROMPT = """You are extracting service information from a mobile pet grooming business website.
+SERVICE_PROMPT = PromptTemplate(
+    prefix="""You are extracting service information from a mobile pet grooming business website.
 
 From the website content below, extract which services this business offers.
 For each service, respond YES or NO. If unclear, respond NO.
@@ -39,9 +44,6 @@ Also extract:
 - price_range_low: Lowest price mentioned (number only, or empty)
 - price_range_high: Highest price mentioned (number only, or empty)
 
-Website content:
-{content}
-
 Respond in this exact format (one per line):
 full_groom|YES or NO
 bath_only|YES or NO
@@ -57,7 +59,12 @@ breed_cuts|YES or NO
 pet_types|dogs,cats
 breed_sizes|small,medium,large,xl
 price_range_low|30
-price_range_high|120"""
+price_range_high|120
+
+""",
+    item="""Website content:
+{content}""",
+)
 
 BOOLEAN_SERVICES = [
     "full_groom",
@@ -113,14 +120,14 @@ def parse_services(response: str) -> dict:
     return result
 
 
-def extract_services() -> None:
+def extract_services(llm_mode: str = "interactive") -> None:
     """Run the service extraction pipeline."""
     print("=" * 60)
     print("STEP 4: Extract Services")
     print("=" * 60)
 
     print(f"\nReading {INPUT_PATH} ...")
-    df = read_csv(str(INPUT_PATH))
+    df = read_table(INPUT_PATH)
     total = len(df)
     print(f"  Total rows: {total}")
 
@@ -132,41 +139,60 @@ def extract_services() -> None:
     df["price_range_low"] = None
     df["price_range_high"] = None
 
-    # Filter to rows with websites
+    # Filter to rows with websites; rows finished by an earlier run are restored as-is
     has_website = df["website"].notna() & (df["website"].str.strip() != "")
-    urls = df.loc[has_website, "website"].tolist()
+    journal = StepJournal("step4", version=str(SERVICE_PROMPT) + matcher_version(), inputs=["website"])
+    pending = journal.restore(df, df.index[has_website])
+    print(f"  {journal.summary()}")
+    print("  " + prompt_cache_status(SERVICE_PROMPT, namespace="step4"))
+    urls = df.loc[pending, "website"].to_dict()
 
     if urls:
-        print(f"\nCrawling {len(urls)} websites ...")
-        crawled = crawl_urls(urls, batch_size=5, timeout=15)
-        crawl_success = sum(1 for v in crawled.values() if v is not None)
-        print(f"  Crawled successfully: {crawl_success}/{len(urls)}")
-
-        # Prepare items for LLM
-        items_to_classify = []
-        classify_indices = []
-        for idx, row in df[has_website].iterrows():
-            text = crawled.get(row["website"])
-            if text:
-                items_to_classify.append({"content": text[:4000]})
-                classify_indices.append(idx)
-
-        if items_to_classify:
-            print(f"\nExtracting services for {len(items_to_classify)} businesses ...")
-            responses = classify_batch(
-                items=items_to_classify,
-                prompt_template=SERVICE_PROMPT,
-                max_concurrent=10,
-            )
-
-            for idx, response in zip(classify_indices, responses):
-                parsed = parse_services(response)
-                for key, value in parsed.items():
+        # Pre-extract from the full page as it arrives; only unsettled pages go to the LLM
+        print(f"\nCrawling {len(urls)} websites and extracting services ...")
+        matched = {}
+
+        def prepare(idx, text: str) -> dict | None:
+            """Apply the matcher; return the LLM item only if some field is unsettled."""
+            matched[idx] = match_services(text)
+            if matched[idx].is_complete():
+                for key, value in matched[idx].values.items():
                     df.at[idx, key] = value
+                journal.record(idx, matched[idx].values)
+                return None
+            return {"content": select_content(text, "services")}
+
+        def save_result(idx, response: str) -> None:
+            """Merge one LLM response with the matcher's settled fields and checkpoint the row."""
+            values = matched[idx].merge(parse_services(response))
+            for key, value in values.items():
+                df.at[idx, key] = value
+            journal.record(idx, values)
+
+        result = crawl_and_classify(
+            urls,
+            prepare,
+            prompt_template=SERVICE_PROMPT,
+            on_result=save_result,
+            cache_namespace="step4",
+            profile="services",
+            mode=llm_mode,
+            concurrency=5,
+            timeout=15,
+        )
+        print(f"  Crawled successfully: {len(urls) - len(result.uncrawled)}/{len(urls)}")
+        print(f"  {format_coverage('services')}")
+        print(f"  {format_savings('services')}")
+
+        # Failed requests: keep what the matcher settled, retry the row next run
+        for idx in result.failed:
+            for key, value in matched[idx].merge(None).items():
+                df.at[idx, key] = value
 
     # Write output
-    write_csv(df, str(OUTPUT_PATH))
-    print(f"\n  Output: {OUTPUT_PATH}")
+    output = write_table(df, OUTPUT_PATH, schema="step4")
+    journal.compact()
+    print(f"\n  Output: {output}")
 
     # Stats
     print(f"\n--- Service Extraction Stats ---")
@@ -181,4 +207,5 @@ def extract_services() -> None:
 
 
 if __name__ == "__main__":
-    extract_services()
+    args = parse_step_args("Step 4: extract services", batch_mode=True)
+    extract_services(llm_mode="batch" if args.batch else "interactive")
@@ -13,7 +13,8 @@ import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from utils.csv_utils import read_csv, write_csv
+from utils.cli import parse_step_args
+from utils.csv_utils import read_table, write_table
 
 SKIP_BY_DEFAULT = True
 
@@ -41,6 +42,20 @@ SKIP_PATTERNS = [
 ]
 SKIP_RE = re.compile("|".join(SKIP_PATTERNS), re.IGNORECASE)
 
+IMAGE_SELECT_PROMPT = """Select the best image for a mobile pet grooming business listing.
+
+Business name: {business_name}
+
+Candidate image URLs:
+{image_urls}
+
+Pick the URL most likely to be a good representative photo of the business
+(grooming van, groomer at work, happy pet, etc.). Avoid logos, icons, stock photos.
+
+Respond in this format:
+URL|the_best_url_here
+DESC|Brief description of what the image likely shows"""
+
 
 def extract_image_urls_from_markdown(text: str) -> list[str]:
     """Extract image URLs from markdown content, filtering out logos/icons."""
@@ -66,42 +81,48 @@ def extract_images() -> None:
     if SKIP_BY_DEFAULT:
         print("\n  SKIPPED — SKIP_BY_DEFAULT is True")
         print("  Copying input to output as-is.")
-        df = read_csv(str(INPUT_PATH))
+        df = read_table(INPUT_PATH)
         df["image_url"] = ""
         df["image_description"] = ""
-        write_csv(df, str(OUTPUT_PATH))
-        print(f"  Output: {OUTPUT_PATH} ({len(df)} rows)")
+        output = write_table(df, OUTPUT_PATH, schema="step5")
+        print(f"  Output: {output} ({len(df)} rows)")
         print("=" * 60)
         return
 
     # Full implementation when enabled
     from utils.crawler import crawl_urls
+    from utils.journal import StepJournal
     from utils.llm import classify_batch
 
     print(f"\nReading {INPUT_PATH} ...")
-    df = read_csv(str(INPUT_PATH))
+    df = read_table(INPUT_PATH)
     total = len(df)
     print(f"  Total rows: {total}")
 
     df["image_url"] = ""
     df["image_description"] = ""
 
-    # Crawl websites to find images
+    # Crawl websites to find images; rows finished by an earlier run are restored as-is
     has_website = df["website"].notna() & (df["website"].str.strip() != "")
-    urls = df.loc[has_website, "website"].tolist()
+    journal = StepJournal("step5", version=IMAGE_SELECT_PROMPT, inputs=["website", "name"])
+    pending = journal.restore(df, df.index[has_website])
+    print(f"  {journal.summary()}")
+    urls = df.loc[pending, "website"].tolist()
 
     if urls:
         print(f"\nCrawling {len(urls)} websites for images ...")
-        crawled = crawl_urls(urls, batch_size=5, timeout=15)
+        crawled = crawl_urls(urls, concurrency=5, timeout=15)
 
         # Phase 1: Extract candidate image URLs
         candidates = {}
-        for idx, row in df[has_website].iterrows():
-            text = crawled.get(row["website"])
+        for idx in pending:
+            text = crawled.get(df.at[idx, "website"])
             if text:
                 imgs = extract_image_urls_from_markdown(text)
                 if imgs:
                     candidates[idx] = imgs
+                else:
+                    journal.record(idx, {})  # nothing to pick from; done
 
         print(f"  Found image candidates for {len(candidates)}/{len(urls)} businesses")
 
@@ -118,40 +139,36 @@ def extract_images() -> None:
                 })
                 classify_indices.append(idx)
 
-            image_select_prompt = """Select the best image for a mobile pet grooming business listing.
-
-Business name: {business_name}
-
-Candidate image URLs:
-{image_urls}
-
-Pick the URL most likely to be a good representative photo of the business
-(grooming van, groomer at work, happy pet, etc.). Avoid logos, icons, stock photos.
-
-Respond in this format:
-URL|the_best_url_here
-DESC|Brief description of what the image likely shows"""
+            def save_result(i: int, response: str) -> None:
+                """Apply one image selection and checkpoint the row."""
+                idx = classify_indices[i]
+                values = {}
+                for line in response.strip().splitlines():
+                    if line.startswith("URL|"):
+                        values["image_url"] = line.split("|", 1)[1].strip()
+                    elif line.startswith("DESC|"):
+                        values["image_description"] = line.split("|", 1)[1].strip()
+                for key, value in values.items():
+                    df.at[idx, key] = value
+                journal.record(idx, values)
 
             print(f"\nSelecting best images for {len(items)} businesses ...")
-            responses = classify_batch(
+            classify_batch(
                 items=items,
-                prompt_template=image_select_prompt,
-                max_concurrent=10,
+                prompt_template=IMAGE_SELECT_PROMPT,
+                cache_namespace="step5",
+                profile="images",
+                on_result=save_result,
             )
 
-            for idx, response in zip(classify_indices, responses):
-                for line in response.strip().splitlines():
-                    if line.startswith("URL|"):
-                        df.at[idx, "image_url"] = line.split("|", 1)[1].strip()
-                    elif line.startswith("DESC|"):
-                        df.at[idx, "image_description"] = line.split("|", 1)[1].strip()
-
-    write_csv(df, str(OUTPUT_PATH))
+    output = write_table(df, OUTPUT_PATH, schema="step5")
+    journal.compact()
     has_images = (df["image_url"] != "").sum()
-    print(f"\n  Output: {OUTPUT_PATH}")
+    print(f"\n  Output: {output}")
     print(f"  Businesses with images: {has_images}/{total}")
     print("=" * 60)
 
 
 if __name__ == "__main__":
+    parse_step_args("Step 5: extract images")
     extract_images()
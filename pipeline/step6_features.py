@@ -7,15 +7,20 @@ import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from utils.crawler import crawl_urls
-from utils.csv_utils import read_csv, write_csv
-from utils.llm import classify_batch
+from utils.cli import parse_step_args
+from utils.content import format_savings, select_content
+from utils.csv_utils import read_table, write_table
+from utils.extract import format_coverage, match_features, matcher_version
+from utils.journal import StepJournal
+from utils.llm import PromptTemplate, prompt_cache_status
+from utils.stream import crawl_and_classify
 
 PIPELINE_DIR = Path(__file__).resolve().parent
 INPUT_PATH = PIPELINE_DIR / "data" / "step4_services.csv"  # Skip step5 by default
 OUTPUT_PATH = PIPELINE_DIR / "data" / "step6_features.csv"
 
-FEATURES_PROMPT = """You are extracting features from a mobile pet grooming business website.
+FEATURES_PROMPT = PromptTemplate(
+    prefix="""You are extracting features from a mobile pet grooming business website.
 ONLY extract features that are EXPLICITLY stated on the website. Do NOT guess.
 
 From the content below, determine:
@@ -28,9 +33,6 @@ From the content below, determine:
 - one_on_one_attention: Do they mention one-on-one attention? (YES/NO)
 - online_booking: Do they offer online booking? (YES/NO)
 
-Website content:
-{content}
-
 Respond in this exact format (one per line):
 is_licensed|YES or NO
 is_insured|YES or NO
@@ -39,7 +41,12 @@ years_experience|number or EMPTY
 uses_natural_products|YES or NO
 cage_free|YES or NO
 one_on_one_attention|YES or NO
-online_booking|YES or NO"""
+online_booking|YES or NO
+
+""",
+    item="""Website content:
+{content}""",
+)
 
 BOOLEAN_FEATURES = [
     "is_licensed",
@@ -78,14 +85,14 @@ def parse_features(response: str) -> dict:
     return result
 
 
-def extract_features() -> None:
+def extract_features(llm_mode: str = "interactive") -> None:
     """Run the feature extraction pipeline."""
     print("=" * 60)
     print("STEP 6: Extract Features")
     print("=" * 60)
 
     print(f"\nReading {INPUT_PATH} ...")
-    df = read_csv(str(INPUT_PATH))
+    df = read_table(INPUT_PATH)
     total = len(df)
     print(f"  Total rows: {total}")
 
@@ -94,41 +101,60 @@ def extract_features() -> None:
         df[feat] = False
     df["years_experience"] = None
 
-    # Filter to rows with websites
+    # Filter to rows with websites; rows finished by an earlier run are restored as-is
     has_website = df["website"].notna() & (df["website"].str.strip() != "")
-    urls = df.loc[has_website, "website"].tolist()
+    journal = StepJournal("step6", version=str(FEATURES_PROMPT) + matcher_version(), inputs=["website"])
+    pending = journal.restore(df, df.index[has_website])
+    print(f"  {journal.summary()}")
+    print("  " + prompt_cache_status(FEATURES_PROMPT, namespace="step6"))
+    urls = df.loc[pending, "website"].to_dict()
 
     if urls:
-        print(f"\nCrawling {len(urls)} websites ...")
-        crawled = crawl_urls(urls, batch_size=5, timeout=15)
-        crawl_success = sum(1 for v in crawled.values() if v is not None)
-        print(f"  Crawled successfully: {crawl_success}/{len(urls)}")
-
-        # Prepare items for LLM
-        items_to_classify = []
-        classify_indices = []
-        for idx, row in df[has_website].iterrows():
-            text = crawled.get(row["website"])
-            if text:
-                items_to_classify.append({"content": text[:4000]})
-                classify_indices.append(idx)
-
-        if items_to_classify:
-            print(f"\nExtracting features for {len(items_to_classify)} businesses ...")
-            responses = classify_batch(
-                items=items_to_classify,
-                prompt_template=FEATURES_PROMPT,
-                max_concurrent=10,
-            )
-
-            for idx, response in zip(classify_indices, responses):
-                parsed = parse_features(response)
-                for key, value in parsed.items():
+        # Pre-extract from the full page as it arrives; only unsettled pages go to the LLM
+        print(f"\nCrawling {len(urls)} websites and extracting features ...")
+        matched = {}
+
+        def prepare(idx, text: str) -> dict | None:
+            """Apply the matcher; return the LLM item only if some field is unsettled."""
+            matched[idx] = match_features(text)
+            if matched[idx].is_complete():
+                for key, value in matched[idx].values.items():
                     df.at[idx, key] = value
+                journal.record(idx, matched[idx].values)
+                return None
+            return {"content": select_content(text, "features")}
+
+        def save_result(idx, response: str) -> None:
+            """Merge one LLM response with the matcher's settled fields and checkpoint the row."""
+            values = matched[idx].merge(parse_features(response))
+            for key, value in values.items():
+                df.at[idx, key] = value
+            journal.record(idx, values)
+
+        result = crawl_and_classify(
+            urls,
+            prepare,
+            prompt_template=FEATURES_PROMPT,
+            on_result=save_result,
+            cache_namespace="step6",
+            profile="features",
+            mode=llm_mode,
+            concurrency=5,
+            timeout=15,
+        )
+        print(f"  Crawled successfully: {len(urls) - len(result.uncrawled)}/{len(urls)}")
+        print(f"  {format_coverage('features')}")
+        print(f"  {format_savings('features')}")
+
+        # Failed requests: keep what the matcher settled, retry the row next run
+        for idx in result.failed:
+            for key, value in matched[idx].merge(None).items():
+                df.at[idx, key] = value
 
     # Write output
-    write_csv(df, str(OUTPUT_PATH))
-    print(f"\n  Output: {OUTPUT_PATH}")
+    output = write_table(df, OUTPUT_PATH, schema="step6")
+    journal.compact()
+    print(f"\n  Output: {output}")
 
     # Stats
     print(f"\n--- Feature Extraction Stats ---")
@@ -143,4 +169,5 @@ def extract_features() -> None:
 
 
 if __name__ == "__main__":
-    extract_features()
+    args = parse_step_args("Step 6: extract features", batch_mode=True)
+    extract_features(llm_mode="batch" if args.batch else "interactive")
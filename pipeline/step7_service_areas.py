@@ -7,15 +7,19 @@ import pandas as pd
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from utils.crawler import crawl_urls
-from utils.csv_utils import read_csv, write_csv
-from utils.llm import classify_batch
+from utils.cli import parse_step_args
+from utils.content import format_savings, select_content
+from utils.csv_utils import read_table, write_table
+from utils.journal import StepJournal
+from utils.llm import PromptTemplate, prompt_cache_status
+from utils.stream import crawl_and_classify
 
 PIPELINE_DIR = Path(__file__).resolve().parent
 INPUT_PATH = PIPELINE_DIR / "data" / "step6_features.csv"
 OUTPUT_PATH = PIPELINE_DIR / "data" / "step7_areas.csv"
 
-SERVICE_AREA_PROMPT = """You are extracting service area information from a mobile pet grooming business website.
+SERVICE_AREA_PROMPT = PromptTemplate(
+    prefix="""You are extracting service area information from a mobile pet grooming business website.
 
 IMPORTANT: Distinguish between the PRIMARY service area (where the business is based) and EXTENDED areas they travel to. A business in Dallas that mentions "serving the entire DFW metroplex" has primary_city=Dallas.
 
@@ -26,15 +30,17 @@ From the content below, extract:
 
 If service area is not stated on the website, use the business address.
 
-Website content:
-{content}
-
-Business address from our records: {city}, {state}
-
 Respond in this exact format:
 primary_city|CityName
 service_cities|City1,City2,City3
-service_radius_miles|25"""
+service_radius_miles|25
+
+""",
+    item="""Business address from our records: {city}, {state}
+
+Website content:
+{content}""",
+)
 
 
 def parse_service_area(response: str, fallback_city: str) -> dict:
@@ -66,62 +72,68 @@ def parse_service_area(response: str, fallback_city: str) -> dict:
     return result
 
 
-def extract_service_areas() -> None:
+def extract_service_areas(llm_mode: str = "interactive") -> None:
     """Run the service area extraction pipeline."""
     print("=" * 60)
     print("STEP 7: Extract Service Areas")
     print("=" * 60)
 
     print(f"\nReading {INPUT_PATH} ...")
-    df = read_csv(str(INPUT_PATH))
+    df = read_table(INPUT_PATH)
     total = len(df)
     print(f"  Total rows: {total}")
 
     # Initialize service area columns
-    df["primary_city"] = df["city"]
+    df["primary_city"] = df["city"].astype("string")
     df["service_cities"] = ""
     df["service_radius_miles"] = None
 
-    # Filter to rows with websites
+    # Filter to rows with websites; rows finished by an earlier run are restored as-is
     has_website = df["website"].notna() & (df["website"].str.strip() != "")
-    urls = df.loc[has_website, "website"].tolist()
+    journal = StepJournal("step7", version=str(SERVICE_AREA_PROMPT), inputs=["website", "city", "state"])
+    pending = journal.restore(df, df.index[has_website])
+    print(f"  {journal.summary()}")
+    print("  " + prompt_cache_status(SERVICE_AREA_PROMPT, namespace="step7"))
+    urls = df.loc[pending, "website"].to_dict()
 
     if urls:
-        print(f"\nCrawling {len(urls)} websites ...")
-        crawled = crawl_urls(urls, batch_size=5, timeout=15)
-        crawl_success = sum(1 for v in crawled.values() if v is not None)
-        print(f"  Crawled successfully: {crawl_success}/{len(urls)}")
-
-        # Prepare items for LLM
-        items_to_classify = []
-        classify_indices = []
-        for idx, row in df[has_website].iterrows():
-            text = crawled.get(row["website"])
-            if text:
-                items_to_classify.append({
-                    "content": text[:4000],
-                    "city": str(row.get("city", "")),
-                    "state": str(row.get("state", "")),
-                })
-                classify_indices.append(idx)
-
-        if items_to_classify:
-            print(f"\nExtracting service areas for {len(items_to_classify)} businesses ...")
-            responses = classify_batch(
-                items=items_to_classify,
-                prompt_template=SERVICE_AREA_PROMPT,
-                max_concurrent=10,
-            )
-
-            for i, (idx, response) in enumerate(zip(classify_indices, responses)):
-                fallback_city = str(df.at[idx, "city"])
-                parsed = parse_service_area(response, fallback_city)
-                for key, value in parsed.items():
-                    df.at[idx, key] = value
+        print(f"\nCrawling {len(urls)} websites and extracting service areas ...")
+
+        def prepare(idx, text: str) -> dict:
+            """Build the prompt item: trimmed page plus the address we have on record."""
+            return {
+                "content": select_content(text, "service_areas"),
+                "city": str(df.at[idx, "city"]),
+                "state": str(df.at[idx, "state"]),
+            }
+
+        def save_result(idx, response: str) -> None:
+            """Apply one service-area response and checkpoint the row."""
+            values = parse_service_area(response, str(df.at[idx, "city"]))
+            for key, value in values.items():
+                df.at[idx, key] = value
+            journal.record(idx, values)
+
+        result = crawl_and_classify(
+            urls,
+            prepare,
+            prompt_template=SERVICE_AREA_PROMPT,
+            on_result=save_result,
+            cache_namespace="step7",
+            profile="service_areas",
+            mode=llm_mode,
+            concurrency=5,
+            timeout=15,
+            # Franchise pages that differ only by city are exactly what this step must tell apart
+            near_dedup=False,
+        )
+        print(f"  Crawled successfully: {len(urls) - len(result.uncrawled)}/{len(urls)}")
+        print(f"  {format_savings('service_areas')}")
 
     # Write output
-    write_csv(df, str(OUTPUT_PATH))
-    print(f"\n  Output: {OUTPUT_PATH}")
+    output = write_table(df, OUTPUT_PATH, schema="step7")
+    journal.compact()
+    print(f"\n  Output: {output}")
 
     # Stats
     has_service_cities = (df["service_cities"] != "").sum()
@@ -134,4 +146,5 @@ def extract_service_areas() -> None:
 
 
 if __name__ == "__main__":
-    extract_service_areas()
+    args = parse_step_args("Step 7: extract service areas", batch_mode=True)
+    extract_service_areas(llm_mode="batch" if args.batch else "interactive")
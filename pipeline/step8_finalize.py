@@ -9,7 +9,7 @@ from dotenv import load_dotenv
 
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
-from utils.csv_utils import read_csv, write_csv
+from utils.csv_utils import read_table, table_path, write_csv
 
 load_dotenv()
 
@@ -100,8 +100,9 @@ BOOLEAN_COLUMNS = [
 def find_latest_data() -> Path:
     """Find the latest available data file in the pipeline chain."""
     for path in DATA_CHAIN:
-        if path.exists():
-            print(f"  Using latest data file: {path.name}")
+        source = table_path(path)
+        if source is not None:
+            print(f"  Using latest data file: {source.name}")
             return path
     raise FileNotFoundError("No pipeline data files found. Run earlier steps first.")
 
@@ -161,7 +162,7 @@ def upsert_to_supabase(df: pd.DataFrame) -> None:
         client = create_client(url, key)
 
         # Convert DataFrame to list of dicts, handling NaN
-        records = df.where(pd.notna(df), None).to_dict(orient="records")
+        records = df.astype(object).where(pd.notna(df), None).to_dict(orient="records")
 
         # Upsert in batches of 100
         batch_size = 100
@@ -189,7 +190,8 @@ def finalize() -> None:
     input_path = find_latest_data()
 
     print(f"Reading {input_path} ...")
-    df = read_csv(str(input_path))
+    # Typed read of just the production columns; booleans arrive as booleans
+    df = read_table(input_path, columns=list(PRODUCTION_COLUMNS))
     total = len(df)
     print(f"  Total rows: {total}")
 
@@ -198,10 +200,10 @@ def finalize() -> None:
     df = df[list(available_cols.keys())].rename(columns=available_cols)
     print(f"  Selected {len(available_cols)} production columns")
 
-    # Ensure boolean columns are actual booleans
+    # Unknown booleans are published as False
     for col in BOOLEAN_COLUMNS:
         if col in df.columns:
-            df[col] = df[col].map(lambda x: str(x).upper() in ("TRUE", "YES", "1"))
+            df[col] = df[col].fillna(False).astype(bool)
 
     # Validate
     print("\nValidating ...")
@@ -0,0 +1,13 @@
+"""Shared pytest setup: import from the pipeline root, keep runs off the network and disk caches."""
+
+import os
+import sys
+from pathlib import Path
+
+# Allow imports from pipeline root (as the steps do)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Module-level settings are read at import time, so set them before any test imports utils
+os.environ["LLM_CACHE"] = "0"
+os.environ["CRAWL_CACHE"] = "0"
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
@@ -0,0 +1,26 @@
+"""utils/content.py: paragraph scoring and selection under a token budget."""
+
+from utils.content import _score, select_content
+
+
+def test_keywords_match_whole_words_only():
+    # "ear" in year/near, "cat" in location, "mat" in information, "van" in relevant, "shop" in workshop
+    text = "Relevant information about our location near you, every year at the workshop."
+    assert _score(text, "services", 0) == _score(text, "verify", 0) == 0.5  # position bonus only
+    assert _score("Ear cleaning and nail trims for dogs and cats.", "services", 1) > 4 / 2
+
+
+def test_dollar_signs_count_for_services_only():
+    assert _score("Full groom $65, bath $40", "services", 0) > _score("Full groom, bath", "services", 0)
+    assert _score("Fees: $65", "verify", 0) == _score("Fees: 65", "verify", 0)
+
+
+def test_relevant_paragraphs_are_kept_in_page_order():
+    page = "\n\n".join([
+        "Welcome to our website. Read our latest news and information.",
+        "We come to you: mobile grooming in a fully equipped van at your door.",
+        "Our team enjoys hiking and volunteering at the local shelter on weekends.",
+        "Book an appointment for a bath and groom in our self-contained trailer.",
+    ])
+    selected = select_content(page, "verify", budget_tokens=40)
+    assert selected.startswith("We come to you") and selected.endswith("self-contained trailer.")
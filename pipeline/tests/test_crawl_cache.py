@@ -0,0 +1,68 @@
+"""utils/crawl_cache.py: stored pages and failures, expiry and eviction."""
+
+import threading
+
+import pytest
+
+from utils.crawl_cache import STATUS_OK, CrawlCache, _env_mode
+
+
+def test_pages_round_trip_under_any_spelling_of_the_url(tmp_path):
+    cache = CrawlCache(tmp_path / "crawl.sqlite")
+    cache.put("https://www.example.com/?utm_source=x", "# Mobile grooming", elapsed=1.5, via="http")
+    entry = cache.get("http://example.com")
+    assert entry.text == "# Mobile grooming" and entry.status == STATUS_OK and entry.via == "http"
+    cache.close()
+
+
+def test_failures_expire_sooner_than_pages(tmp_path):
+    cache = CrawlCache(tmp_path / "crawl.sqlite", failure_ttl_seconds=0)
+    cache.put("https://dead.example", None, failure="dns")
+    assert cache.get("https://dead.example") is None
+    assert cache.get("https://dead.example", allow_stale=True).status == "dns"
+    cache.close()
+
+
+def test_eviction_keeps_the_cache_under_its_size(tmp_path):
+    cache = CrawlCache(tmp_path / "crawl.sqlite", max_bytes=2000)
+    for n in range(50):
+        cache.put(f"https://site{n}.example", f"page {n} " * 50)
+    cache.evict()
+    assert cache.total_bytes() <= 2000
+    assert cache.get("https://site49.example") is not None
+    cache.close()
+
+
+def test_shared_across_threads(tmp_path):
+    cache = CrawlCache(tmp_path / "crawl.sqlite", max_bytes=5000)
+    errors = []
+
+    def work(thread: int) -> None:
+        try:
+            for n in range(100):
+                url = f"https://t{thread}-{n}.example"
+                cache.put(url, f"page {thread} {n} " * 10 if n % 3 else None)
+                cache.get(url)
+                cache.put_probe(url, "parked")
+                cache.get_probe(url)
+        except Exception as e:  # sqlite3.ProgrammingError when used from a thread it was not created on
+            errors.append(e)
+
+    threads = [threading.Thread(target=work, args=(t,)) for t in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert cache.stats()["probes"] == {"parked": 400}
+    cache.close()
+
+
+def test_unknown_mode_in_the_environment_is_rejected(monkeypatch):
+    monkeypatch.setenv("CRAWL_CACHE_MODE", "ofline")
+    with pytest.raises(ValueError, match="CRAWL_CACHE_MODE"):
+        _env_mode()
+    monkeypatch.setenv("CRAWL_CACHE_MODE", "offline")
+    assert _env_mode() == "offline"
+    monkeypatch.delenv("CRAWL_CACHE_MODE")
+    assert _env_mode() == "default"
@@ -0,0 +1,20 @@
+"""utils/crawler.py: shard frames carry every FetchResult field (needs crawl4ai installed)."""
+
+import pytest
+
+pytest.importorskip("crawl4ai")
+
+from utils.crawler import _decode_page, _encode_page
+from utils.fetch_policy import FetchResult
+
+
+@pytest.mark.parametrize("result", [
+    FetchResult("https://van.example/ü", "# Mobile grooming ✂", "http", status=200, attempts=2, seconds=1.5,
+                hedged=True),
+    FetchResult("https://slow.example", None, "browser", "timeout", detail="Timeout 15000ms exceeded", attempts=3),
+])
+def test_frames_round_trip(result):
+    decoded = _decode_page(_encode_page(result))
+    assert decoded.seconds == pytest.approx(result.seconds)
+    decoded.seconds = result.seconds
+    assert decoded == result
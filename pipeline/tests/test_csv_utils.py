@@ -0,0 +1,66 @@
+"""utils/csv_utils.py: typed step hand-offs survive a write/read round trip."""
+
+import pandas as pd
+import pytest
+
+from utils import csv_utils
+from utils.csv_utils import read_table, table_path, write_table
+
+
+def step4_rows() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "name": ["Paws on Wheels", "Suds & Scissors"],
+            "city": ["Boston", "Austin"],
+            "state": ["MA", "TX"],
+            "zip": ["02101", "78701"],
+            "reviews_count": [12, None],
+            "rating": [4.8, None],
+            "slug": ["paws-on-wheels-boston-ma", "suds-scissors-austin-tx"],
+            "classification": ["MOBILE_GROOMER", "UNCLEAR"],
+            "verification_confidence": [90, 0],
+            "svc_nail_trim": ["TRUE", None],
+            "price_range_low": [65, None],
+            "extra_outscraper_field": ["x", 3],
+        }
+    )
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "csv"])
+def test_round_trip_keeps_types(tmp_path, monkeypatch, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    monkeypatch.setattr(csv_utils, "FORMAT", fmt)
+    written = write_table(step4_rows(), tmp_path / "step4_services.csv", schema="step4")
+    assert written.suffix == f".{fmt}"
+
+    df = read_table(tmp_path / "step4_services.csv")
+    assert df["zip"].tolist() == ["02101", "78701"]  # never 2101
+    assert str(df["reviews_count"].dtype) == "Int64" and pd.isna(df.loc[1, "reviews_count"])
+    assert str(df["rating"].dtype) == "Float64"
+    assert str(df["svc_nail_trim"].dtype) == "boolean"
+    assert df.loc[0, "svc_nail_trim"] and pd.isna(df.loc[1, "svc_nail_trim"])
+    assert str(df["classification"].dtype) == "category"
+    assert df["extra_outscraper_field"].astype(str).tolist() == ["x", "3"]
+
+
+def test_read_table_loads_only_requested_columns(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(csv_utils, "FORMAT", "parquet")
+    write_table(step4_rows(), tmp_path / "step4_services.csv", schema="step4")
+    df = read_table(tmp_path / "step4_services.csv", columns=["slug", "zip", "not_a_column"])
+    assert list(df.columns) == ["slug", "zip"]
+
+
+def test_table_path_prefers_the_newest_file(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setattr(csv_utils, "FORMAT", "parquet")
+    monkeypatch.setattr(csv_utils, "CSV_EXPORT", True)
+    write_table(step4_rows(), tmp_path / "step4_services.csv", schema="step4")
+    assert (tmp_path / "step4_services.csv").exists()
+    assert table_path(tmp_path / "step4_services.csv").suffix == ".parquet"
+
+
+def test_missing_table_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_table(tmp_path / "nothing.csv")
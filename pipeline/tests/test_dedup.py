@@ -0,0 +1,73 @@
+"""utils/dedup.py: step 2's fuzzy duplicate merging."""
+
+import pandas as pd
+
+from utils.dedup import fuzzy_dedup, normalize_city, normalize_phones, site_key
+
+
+def listings(rows: list[dict]) -> pd.DataFrame:
+    columns = ["name", "city", "state", "phone", "website", "reviews_count", "latitude", "longitude"]
+    return pd.DataFrame([{col: row.get(col) for col in columns} for row in rows])
+
+
+def test_keys():
+    assert normalize_city("St. Louis") == normalize_city("Saint Louis")
+    assert normalize_phones(pd.Series(["(314) 555-0101", "+1 314 555 0101", "555-0101"])).tolist()[:2] == [
+        "3145550101",
+        "3145550101",
+    ]
+    assert normalize_phones(pd.Series(["555-0101"])).isna().all()
+    assert site_key("https://www.pawsonwheels.com/services") == "pawsonwheels.com"
+    assert site_key("https://facebook.com/pawsonwheels") != site_key("https://facebook.com/otherbiz")
+
+
+def test_same_phone_merges_and_fills_the_survivor():
+    result = fuzzy_dedup(listings([
+        {"name": "Paws on Wheels LLC", "city": "St. Louis", "state": "MO", "phone": "(314) 555-0101",
+         "reviews_count": 3},
+        {"name": "Paws On Wheels Mobile Grooming", "city": "Saint Louis", "state": "MO", "phone": "314-555-0101",
+         "website": "https://pawsonwheels.com", "reviews_count": 40},
+        {"name": "Happy Tails Spa", "city": "Austin", "state": "TX", "phone": "512 555 0199"},
+    ]))
+    assert len(result.df) == 2
+    survivor = result.df.iloc[0]
+    assert survivor["name"] == "Paws On Wheels Mobile Grooming"  # most reviews
+    assert result.stats["match_phone"] == 1
+    assert result.clusters["survivor"].sum() == 1 and len(result.clusters) == 2
+
+
+def test_survivor_takes_missing_fields_from_the_cluster():
+    result = fuzzy_dedup(listings([
+        {"name": "Suds and Scissors Mobile Grooming", "city": "Austin", "state": "TX", "phone": "512-555-0100",
+         "reviews_count": 80},
+        {"name": "Suds & Scissors", "city": "Austin", "state": "TX", "phone": "5125550100",
+         "website": "https://suds.com"},
+    ]))
+    assert len(result.df) == 1
+    assert result.df.iloc[0]["website"] == "https://suds.com"
+
+
+def test_same_generic_name_in_one_city_is_not_merged():
+    result = fuzzy_dedup(listings([
+        {"name": "Bella's Grooming", "city": "Austin", "state": "TX"},
+        {"name": "Bella's Grooming", "city": "Austin", "state": "TX"},
+    ]))
+    assert len(result.df) == 2
+
+
+def test_same_name_with_different_phones_is_not_merged():
+    result = fuzzy_dedup(listings([
+        {"name": "Fluffy Friends Mobile Spa", "city": "Tampa", "state": "FL", "phone": "813-555-0001"},
+        {"name": "Fluffy Friends Mobile Spa", "city": "Tampa", "state": "FL", "phone": "813-555-0002"},
+    ]))
+    assert len(result.df) == 2
+
+
+def test_nearby_pins_with_similar_names_merge():
+    result = fuzzy_dedup(listings([
+        {"name": "Wag N Wash Mobile", "city": "Reno", "state": "NV", "latitude": 39.5296, "longitude": -119.8138},
+        {"name": "Wag-N-Wash Mobile Grooming", "city": "Sparks", "state": "NV", "latitude": 39.5297,
+         "longitude": -119.8139},
+    ]))
+    assert len(result.df) == 1
+    assert result.stats["match_geo"] == 1
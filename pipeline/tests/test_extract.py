@@ -0,0 +1,91 @@
+"""utils/extract.py: what the pre-extractor settles, and what it leaves to the LLM."""
+
+from utils.extract import CONFIDENT, match_features, match_services
+
+
+def settled(extraction, name):
+    return extraction.confidence[name] >= CONFIDENT
+
+
+def test_strong_service_match_is_settled_yes():
+    page = match_services("Every visit includes a nail trim and ear cleaning.")
+    assert page.values["svc_nail_trim"] is True and settled(page, "svc_nail_trim")
+    assert page.values["svc_ear_cleaning"] is True and settled(page, "svc_ear_cleaning")
+
+
+def test_topic_never_mentioned_is_settled_no():
+    page = match_services("Full grooming for dogs of every size.")
+    assert page.values["svc_flea_treatment"] is False and settled(page, "svc_flea_treatment")
+
+
+def test_hint_only_is_left_to_the_llm():
+    page = match_services("Ask us about nails when you book your dog's groom.")
+    assert not settled(page, "svc_nail_trim")
+
+
+def test_negated_match_is_left_to_the_llm():
+    page = match_services("Sorry, we do not offer teeth brushing for dogs.")
+    assert not settled(page, "svc_teeth_brushing")
+
+
+def test_negation_stops_at_the_sentence_end():
+    page = match_services("We do not offer teeth brushing. Nail trim included with every groom.")
+    assert not settled(page, "svc_teeth_brushing")
+    assert page.values["svc_nail_trim"] is True and settled(page, "svc_nail_trim")
+
+
+def test_prices_next_to_service_words():
+    page = match_services("Full groom for small dogs starts at $65; large dogs $95.")
+    assert (page.values["price_range_low"], page.values["price_range_high"]) == (65.0, 95.0)
+    assert settled(page, "price_range_low")
+
+
+def test_promo_amounts_are_not_prices():
+    page = match_services("Get $50 off your first visit with this coupon! Dog grooming by appointment.")
+    assert page.values["price_range_low"] is None
+    assert not settled(page, "price_range_low")
+
+
+def test_service_words_inside_other_words_are_not_price_context():
+    assert match_services("Serving the area for 20 years, $0 travel fee.").values["price_range_low"] is None
+    # "ear" in years, "cut" in cute, "cost" in costume: nothing says what these amounts are for
+    for text in ["Serving the area for 20 years. $35", "Cute costume contest, $25 entry"]:
+        page = match_services(text)
+        assert page.values["price_range_low"] is None
+        assert not settled(page, "price_range_low")
+
+
+def test_pets_mentioned_in_passing_are_left_to_the_llm():
+    page = match_services("Dog grooming in your driveway. Read our blog about cats.")
+    assert "cats" in page.values["pet_types"]
+    assert not settled(page, "pet_types")
+
+
+def test_pets_next_to_grooming_words_are_settled():
+    page = match_services("We groom dogs and give cats a bath at home.")
+    assert page.values["pet_types"] == "dogs,cats"
+    assert settled(page, "pet_types")
+
+
+def test_all_sizes():
+    page = match_services("We groom all sizes, from teacups to giants.")
+    assert page.values["breed_sizes"] == "small,medium,large,xl"
+
+
+def test_features_and_years():
+    page = match_features("Licensed and fully insured, with 12 years of experience. Book online anytime.")
+    assert page.values["is_licensed"] is True and page.values["is_insured"] is True
+    assert page.values["online_booking"] is True
+    assert page.values["years_experience"] == 12 and settled(page, "years_experience")
+
+
+def test_negated_feature_is_left_to_the_llm():
+    page = match_features("We are not fear free certified yet.")
+    assert not settled(page, "fear_free_certified")
+
+
+def test_merge_keeps_settled_fields():
+    page = match_features("Licensed groomer. Ask about insurance.")
+    merged = page.merge({"is_licensed": False, "is_insured": True})
+    assert merged == {"is_licensed": True, "is_insured": True}
+    assert page.merge(None) == {name: page.values[name] for name in page.settled()}
@@ -0,0 +1,47 @@
+"""utils/ingest.py: chunked, incremental ingestion of raw exports."""
+
+import pytest
+
+from utils import ingest
+from utils.raw_filter import filter_chunk
+
+pytest.importorskip("pyarrow")
+
+DTYPES = {"name": "string", "full_address": "string", "city": "string", "state": "string",
+          "rating": "Float64", "business_status": "string"}
+
+
+@pytest.fixture
+def raw(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(ingest, "MANIFEST_PATH", tmp_path / "cache" / "manifest.json")
+    monkeypatch.setattr(ingest, "WORKERS", 1)
+    directory = tmp_path / "raw"
+    directory.mkdir()
+    (directory / "a.csv").write_text(
+        "name,full_address,city,state,rating,owner_title\n"
+        "Van Groomers,1 Main St,Austin,TX,4.5,Owner\n"
+        "Petco,2 Main St,Austin,TX,3.9,\n"
+    )
+    return directory
+
+
+def test_undeclared_columns_are_kept_as_text(raw):
+    df, counts = ingest.ingest_raw(raw, DTYPES, filter_chunk)
+    assert df["name"].tolist() == ["Van Groomers"]
+    assert df["owner_title"].tolist() == ["Owner"]
+    assert str(df["owner_title"].dtype) == "string"
+    assert str(df["rating"].dtype) == "Float64"
+    assert counts["rows"] == 2 and counts["chains"] == 1
+
+
+def test_only_new_exports_are_parsed(raw, capsys):
+    ingest.ingest_raw(raw, DTYPES, filter_chunk)
+    (raw / "b.csv").write_text("name,full_address,city,state\nSuds Mobile,3 Main St,Dallas,TX\n")
+    df, counts = ingest.ingest_raw(raw, DTYPES, filter_chunk)
+    assert "1 unchanged, 1 to parse" in capsys.readouterr().out
+    assert sorted(df["name"]) == ["Suds Mobile", "Van Groomers"]
+    assert counts["rows"] == 3
+
+    ingest.ingest_raw(raw, DTYPES, filter_chunk, version="new chain list")
+    assert "0 unchanged, 2 to parse" in capsys.readouterr().out
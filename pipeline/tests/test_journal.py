@@ -0,0 +1,88 @@
+"""utils/journal.py: resume from the journal, invalidation, compaction."""
+
+import json
+
+import pandas as pd
+import pytest
+
+from utils import crawl_cache
+from utils.journal import StepJournal
+
+
+@pytest.fixture
+def rows() -> pd.DataFrame:
+    return pd.DataFrame({"slug": ["a", "b", "c"], "website": ["a.com", "b.com", "c.com"], "label": ""})
+
+
+def journal(tmp_path, version: str = "v1") -> StepJournal:
+    return StepJournal("test", version=version, inputs=["website"], path=tmp_path / "test.jsonl")
+
+
+def entries(tmp_path) -> list[dict]:
+    return [json.loads(line) for line in (tmp_path / "test.jsonl").read_text().splitlines()]
+
+
+def test_resume_restores_recorded_rows(tmp_path, rows):
+    first = journal(tmp_path)
+    assert first.restore(rows, rows.index) == [0, 1, 2]
+    first.record(0, {"label": "MOBILE_GROOMER"})
+    first.record(2, {"label": "SALON_ONLY"})
+    first.close()  # crash after two rows
+
+    again = rows.copy()
+    second = journal(tmp_path)
+    assert second.restore(again, again.index) == [1]
+    assert again["label"].tolist() == ["MOBILE_GROOMER", "", "SALON_ONLY"]
+    assert second.summary().endswith("2 rows restored, 1 to do")
+
+
+def test_torn_last_line_is_ignored(tmp_path, rows):
+    first = journal(tmp_path)
+    first.restore(rows, rows.index)
+    first.record(0, {"label": "MOBILE_GROOMER"})
+    first.close()
+    with open(tmp_path / "test.jsonl", "a") as f:
+        f.write('{"slug": "b", "key": ')
+    assert journal(tmp_path).restore(rows.copy(), rows.index) == [1, 2]
+
+
+def test_changed_input_or_version_redoes_the_row(tmp_path, rows):
+    first = journal(tmp_path)
+    first.restore(rows, rows.index)
+    for idx in rows.index:
+        first.record(idx, {"label": "MOBILE_GROOMER"})
+    first.close()
+
+    moved = rows.copy()
+    moved.loc[1, "website"] = "b-new.com"
+    assert journal(tmp_path).restore(moved, moved.index) == [1]
+    assert journal(tmp_path, version="v2").restore(rows.copy(), rows.index) == [0, 1, 2]
+
+
+def test_refresh_redoes_every_row(tmp_path, rows, monkeypatch):
+    first = journal(tmp_path)
+    first.restore(rows, rows.index)
+    first.record(0, {"label": "MOBILE_GROOMER"})
+    first.close()
+    monkeypatch.setattr(crawl_cache, "_mode", "refresh")
+    assert journal(tmp_path).restore(rows.copy(), rows.index) == [0, 1, 2]
+
+
+def test_compact_drops_superseded_entries_only(tmp_path, rows):
+    first = journal(tmp_path)
+    first.restore(rows, rows.index)
+    for idx in rows.index:
+        first.record(idx, {"label": "MOBILE_GROOMER"})
+    first.compact()
+
+    # A partial input (c missing) where b's website changed
+    partial = rows.iloc[:2].copy()
+    partial.loc[1, "website"] = "b-new.com"
+    second = journal(tmp_path)
+    assert second.restore(partial, partial.index) == [1]
+    second.record(1, {"label": "SALON_ONLY"})
+    second.compact()
+
+    kept = {entry["slug"]: entry["values"]["label"] for entry in entries(tmp_path)}
+    assert kept == {"a": "MOBILE_GROOMER", "b": "SALON_ONLY", "c": "MOBILE_GROOMER"}
+    assert len(entries(tmp_path)) == 3
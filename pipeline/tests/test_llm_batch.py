@@ -0,0 +1,52 @@
+"""utils/llm_batch.py: turning Message Batches results into answers and per-item errors."""
+
+import asyncio
+from types import SimpleNamespace
+
+from utils import llm_batch
+from utils.llm_batch import BatchItemError
+
+
+class FakeBatches:
+    """The slice of client.messages.batches that _run_chunk uses, with a finished batch."""
+
+    def __init__(self, entries: list) -> None:
+        self.entries = entries
+
+    async def retrieve(self, batch_id: str):
+        return SimpleNamespace(processing_status="ended")
+
+    async def results(self, batch_id: str):
+        async def stream():
+            for entry in self.entries:
+                yield entry
+
+        return stream()
+
+
+def entry(custom_id: str, result_type: str = "succeeded", content=None, stop_reason: str = "end_turn"):
+    message = SimpleNamespace(content=content or [], stop_reason=stop_reason)
+    return SimpleNamespace(custom_id=custom_id, result=SimpleNamespace(type=result_type, message=message))
+
+
+def test_results_become_answers_or_item_errors(monkeypatch):
+    async def submitted(client, requests, label):
+        return "batch-1"
+
+    monkeypatch.setattr(llm_batch, "_submit_or_resume", submitted)
+    monkeypatch.setattr(llm_batch, "_forget", lambda requests: None)
+    text = SimpleNamespace(type="text", text=" MOBILE_GROOMER|90|van \n")
+    client = SimpleNamespace(messages=SimpleNamespace(batches=FakeBatches([
+        entry("ok", content=[text]),
+        entry("empty", stop_reason="refusal"),
+        entry("expired", result_type="expired"),
+        entry("not-ours", content=[text]),
+    ])))
+
+    results = {}
+    asyncio.run(llm_batch._run_chunk(client, {"ok": {}, "empty": {}, "expired": {}}, "batch 1/1",
+                                     results.__setitem__))
+    assert results["ok"] == "MOBILE_GROOMER|90|van"
+    assert isinstance(results["empty"], BatchItemError) and "refusal" in str(results["empty"])
+    assert isinstance(results["expired"], BatchItemError)
+    assert "not-ours" not in results
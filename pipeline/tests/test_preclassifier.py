@@ -0,0 +1,126 @@
+"""utils/preclassifier.py: routing pages between the local model and Claude, and learning from Claude."""
+
+import random
+
+import pytest
+
+from utils import preclassifier
+from utils.preclassifier import EVIDENCE, PreClassifier
+
+LABELS = ("MOBILE_GROOMER", "SALON_ONLY", "NOT_GROOMER")
+PHRASES = {
+    "MOBILE_GROOMER": ["we come to you in our grooming van", "mobile grooming in your driveway",
+                       "house calls for dogs and cats", "our mobile spa parks at your door"],
+    "SALON_ONLY": ["visit our salon on main street", "drop off your pet at our grooming shop",
+                   "walk-ins welcome at our salon in the plaza", "our storefront has climate controlled kennels"],
+    "NOT_GROOMER": ["overnight boarding and doggy daycare", "full service veterinary clinic and surgery",
+                    "premium pet food and toys in store", "obedience training classes for puppies"],
+}
+FILLER = ["family owned", "call today", "serving the metro area", "open six days a week", "see our reviews",
+          "happy pets", "gift cards available", "follow us online"]
+
+
+def page(rng: random.Random, label: str) -> str:
+    words = rng.sample(PHRASES[label], 2) + rng.sample(FILLER, 3)
+    rng.shuffle(words)
+    return ". ".join(words) + f". ref {rng.randrange(10**6)}"
+
+
+def make_pre(tmp_path, **kwargs) -> PreClassifier:
+    options = {"min_examples": 100, "min_coverage": 0.25, "audit_rate": 0.0, "seed": 1, "cache_dir": tmp_path}
+    return PreClassifier("test", LABELS, **{**options, **kwargs})
+
+
+def teach(pre: PreClassifier, rng: random.Random, count: int) -> None:
+    """Route count fresh pages and answer each routed one the way Claude would."""
+    for n in range(count):
+        label = LABELS[n % 3]
+        if pre.route(n, page(rng, label)) is None:
+            pre.learn(n, label, 90, "Website says so")
+
+
+def test_untrained_model_sends_everything_to_claude(tmp_path):
+    pre = make_pre(tmp_path)
+    assert not pre.trusted
+    assert pre.route("a", "we come to you in our grooming van") is None
+    assert pre.report.unscored == 1
+
+
+def test_learns_and_then_settles_clear_pages(tmp_path):
+    rng = random.Random(0)
+    pre = make_pre(tmp_path)
+    teach(pre, rng, 240)
+    assert pre.report.learned == 240
+    pre.finish()
+    assert pre.trusted
+    assert pre.model.meta["covered"] >= preclassifier.HOLDOUT_MIN
+
+    # The saved model is picked up by the next run
+    again = make_pre(tmp_path)
+    assert again.trusted
+    settled = [again.route(f"new{n}", page(rng, "MOBILE_GROOMER")) for n in range(20)]
+    assert sum(result is not None and result[0] == "MOBILE_GROOMER" for result in settled) >= 15
+    assert again.report.settled >= 15
+
+
+def test_unlearnable_answers_are_skipped(tmp_path):
+    pre = make_pre(tmp_path)
+    pre.route("unclear", "nothing to see here")
+    pre.learn("unclear", "UNCLEAR", 95, "No grooming content")
+    pre.route("doubtful", "maybe a groomer")
+    pre.learn("doubtful", "SALON_ONLY", 40, "Hard to tell")
+    pre.route("local", "a page")
+    pre.learn("local", "SALON_ONLY", 99, f"{EVIDENCE} (p=0.99)")
+    assert pre.report.learned == 0 and pre.store.count() == 0
+
+
+def test_evidence_quotes_are_not_stored_as_examples(tmp_path):
+    pre = make_pre(tmp_path)
+    pre.route("a", "we come to you in our grooming van")
+    pre.learn("a", "MOBILE_GROOMER", 90, 'Website says "we bring our fully equipped van to your door"')
+    assert pre.store.count() == 1
+
+
+def test_agreement_on_too_few_pages_does_not_trust_the_model(tmp_path):
+    rng = random.Random(2)
+    pre = make_pre(tmp_path, min_examples=10)
+    teach(pre, rng, 30)  # a 6-page holdout: perfect agreement proves nothing
+    pre.finish()
+    assert pre.model is not None
+    assert pre.model.meta["covered"] < preclassifier.HOLDOUT_MIN
+    assert not pre.trusted
+
+
+def test_low_coverage_does_not_trust_the_model(tmp_path):
+    rng = random.Random(3)
+    pre = make_pre(tmp_path, min_coverage=1.01)
+    teach(pre, rng, 240)
+    pre.finish()
+    assert not pre.trusted
+
+
+def test_audits_catch_drift(tmp_path, monkeypatch):
+    rng = random.Random(4)
+    pre = make_pre(tmp_path)
+    teach(pre, rng, 240)
+    pre.finish()
+    assert pre.trusted
+
+    monkeypatch.setattr(preclassifier, "AUDIT_MIN", 5)
+    drifting = make_pre(tmp_path, audit_rate=1.0)
+    for n in range(10):
+        # Claude now calls these pages salons; every audit disagrees
+        if drifting.route(n, page(rng, "MOBILE_GROOMER")) is None:
+            drifting.learn(n, "SALON_ONLY", 90, "Pickup and delivery only")
+    assert drifting.drifted and not drifting.trusted
+    assert drifting.report.disagreements["MOBILE_GROOMER", "SALON_ONLY"] >= 5
+    assert drifting.route("after", page(rng, "MOBILE_GROOMER")) is None
+
+
+@pytest.mark.parametrize("label", LABELS)
+def test_features_are_stable(label):
+    text = PHRASES[label][0]
+    buckets, values = preclassifier.features(text)
+    again, _ = preclassifier.features(text.upper())
+    assert (buckets == again).all()
+    assert abs(float((values ** 2).sum()) - 1.0) < 1e-5
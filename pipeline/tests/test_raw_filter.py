@@ -0,0 +1,36 @@
+"""utils/raw_filter.py: step 2's chain, closed and incomplete listing filter."""
+
+import pandas as pd
+
+from utils.raw_filter import chain_mask, filter_chunk, is_chain
+
+
+def test_chain_names_match_whole_words_only():
+    assert is_chain("Unleashed by Petco")
+    assert is_chain("PetSmart Grooming #1234")
+    assert not is_chain("Petcovia Mobile Spa")
+    assert not is_chain("Pet People Mobile Grooming")  # generic phrases are not chains
+    assert chain_mask(pd.Series(["Petco", "Happy Tails", pd.NA], dtype="string")).tolist() == [True, False, False]
+
+
+def test_possessive_and_run_together_chain_names():
+    for name in ["Petco's Grooming Salon", "Petco’s", "PetSmartGrooming", "UnleashedByPetco", "Pet-Valu",
+                 "PetValu #88", "Krisers Natural Pet", "PETCO #1234", "PetSmart1234"]:
+        assert is_chain(name), name
+    for name in ["PETCOVIA MOBILE SPA", "Targeted Grooming", "petsmartgrooming"]:
+        assert not is_chain(name), name
+    names = pd.Series(["PetSmartGrooming", "PETCOVIA", "petco's", "Happy Tails"], dtype="string")
+    assert chain_mask(names).tolist() == [True, False, True, False]
+
+
+def test_filter_chunk_counts_what_it_removes():
+    chunk = pd.DataFrame({
+        "name": ["Petco", "Happy Tails", "Gone Grooming", "No Address"],
+        "full_address": ["1 St", "2 St", "3 St", None],
+        "city": ["Austin"] * 4,
+        "state": ["TX"] * 4,
+        "business_status": ["OPERATIONAL", "OPERATIONAL", "CLOSED_PERMANENTLY", "OPERATIONAL"],
+    }, dtype="string")
+    kept, removed = filter_chunk(chunk)
+    assert kept["name"].tolist() == ["Happy Tails"]
+    assert removed == {"missing": 1, "closed": 1, "chains": 1}
@@ -0,0 +1,108 @@
+"""step3_verify.py: how uncrawled sites interact with the journal across runs."""
+
+import pandas as pd
+import pytest
+
+import step3_verify
+from utils import journal
+from utils.csv_utils import read_table, write_table
+from utils.fetch_policy import DNS, SOCIAL, TIMEOUT
+from utils.preclassifier import PreClassifier
+from utils.stream import StreamResult
+
+# website -> failure kind when crawled (None: the page is fetched and classified)
+SITES = {
+    "https://van.example": None,
+    "https://slow.example": TIMEOUT,
+    "https://gone.example": DNS,
+    "https://facebook.com/suds": SOCIAL,
+}
+
+
+@pytest.fixture
+def step3(tmp_path, monkeypatch):
+    """Run step 3 on four listings with a stubbed crawl; return the websites each run crawled."""
+    names = ["Van Groomers", "Slow Site Grooming", "Gone Grooming", "Suds Mobile"]
+    rows = pd.DataFrame({
+        "name": names,
+        "full_address": [f"{n} Main St" for n in range(len(names))],
+        "city": "Austin",
+        "state": "TX",
+        "website": list(SITES),
+        "slug": [name.lower().replace(" ", "-") for name in names],
+    })
+    write_table(rows, tmp_path / "step2_cleaned.csv", schema="step2")
+    monkeypatch.setattr(step3_verify, "INPUT_PATH", tmp_path / "step2_cleaned.csv")
+    monkeypatch.setattr(step3_verify, "OUTPUT_PATH", tmp_path / "step3_verified.csv")
+    monkeypatch.setattr(step3_verify, "CASCADE", False)
+    monkeypatch.setattr(step3_verify, "PRECLASSIFIER", False)
+    monkeypatch.setattr(journal, "JOURNAL_DIR", tmp_path / "journal")
+
+    crawled: list[list[str]] = []
+
+    def crawl_and_classify(urls, prepare, prompt_template, on_result, **kwargs):
+        crawled.append(sorted(urls.values()))
+        result = StreamResult()
+        for idx, url in urls.items():
+            if SITES[url] is not None:
+                result.uncrawled[idx] = SITES[url]
+                continue
+            prepare(idx, "We come to you: mobile grooming in our fully equipped van.")
+            result.responses[idx] = "MOBILE_GROOMER|90|Website says we come to you"
+            on_result(idx, result.responses[idx])
+        return result
+
+    monkeypatch.setattr(step3_verify, "crawl_and_classify", crawl_and_classify)
+    return crawled
+
+
+def output(tmp_path) -> dict[str, str]:
+    df = read_table(tmp_path / "step3_verified.csv")
+    return dict(zip(df["website"], df["classification"].astype(str)))
+
+
+def test_only_transient_failures_are_crawled_again(tmp_path, step3):
+    step3_verify.verify()
+    assert step3[0] == sorted(SITES)
+    first = output(tmp_path)
+
+    step3_verify.verify()
+    assert step3[1] == ["https://slow.example"]
+    assert output(tmp_path) == first
+
+
+def test_uncrawled_rows_are_dropped(tmp_path, step3):
+    for _ in range(2):  # restored from the journal on the second run
+        step3_verify.verify()
+        assert output(tmp_path) == {"https://van.example": "MOBILE_GROOMER"}
+
+
+def test_journal_holds_permanent_failures(tmp_path, step3):
+    step3_verify.verify()
+    lines = (tmp_path / "journal" / "step3.jsonl").read_text()
+    assert "Could not crawl website (dns)" in lines
+    assert step3_verify.SOCIAL_EVIDENCE in lines
+    assert "timeout" not in lines
+
+
+def test_cascade_and_preclassifier_settings_redo_journaled_rows(tmp_path, step3, monkeypatch):
+    step3_verify.verify()
+    monkeypatch.setattr(step3_verify, "CASCADE", True)
+    step3_verify.verify()
+    assert step3[1] == sorted(SITES)
+
+
+def test_unanswered_escalations_are_forgotten(tmp_path, step3, monkeypatch):
+    made: list[PreClassifier] = []
+
+    def make(namespace, labels):
+        made.append(PreClassifier(namespace, labels, cache_dir=tmp_path / "cache"))
+        return made[-1]
+
+    monkeypatch.setattr(step3_verify, "PRECLASSIFIER", True)
+    monkeypatch.setattr(step3_verify, "PreClassifier", make)
+    monkeypatch.setattr(step3_verify, "CASCADE", True)
+    monkeypatch.setattr(step3_verify, "CASCADE_THRESHOLDS", {"MOBILE_GROOMER": 95})
+    monkeypatch.setattr(step3_verify, "escalate", lambda escalated, urls: {})  # the second pass fails
+    step3_verify.verify()
+    assert made[0]._sent == {} and made[0]._audits == {}
@@ -0,0 +1,75 @@
+"""Confidence cascade: send the answers a cheap first pass was unsure of to a stronger second pass.
+
+Step 3 answers below their label's threshold are classified again by
+LLM_CASCADE_MODEL on a wider window of the page.
+"""
+
+import os
+from collections import Counter
+from dataclasses import dataclass, field
+
+CASCADE = os.getenv("LLM_CASCADE", "1") != "0"
+CASCADE_MODEL = os.getenv("LLM_CASCADE_MODEL", "claude-sonnet-4-5-20250929")
+CONTENT_FACTOR = 3.0
+
+
+def parse_thresholds(text: str) -> dict[str, int]:
+    """Parse "LABEL=70,OTHER=80" into {label: minimum confidence to accept}."""
+    thresholds = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        label, _, value = part.partition("=")
+        thresholds[label.strip().upper()] = int(value)
+    return thresholds
+
+
+@dataclass
+class CascadeReport:
+    """What the cascade escalated and what the second pass changed."""
+
+    answers: int = 0
+    escalated: Counter = field(default_factory=Counter)  # first-pass label -> escalations
+    changed: Counter = field(default_factory=Counter)  # (first label, second label) -> rows
+    failed: int = 0  # escalations with no second answer (page gone, request failed); first answer kept
+
+    @property
+    def rate(self) -> float:
+        return sum(self.escalated.values()) / self.answers if self.answers else 0.0
+
+    def summary(self) -> str:
+        escalated = sum(self.escalated.values())
+        text = f"[cascade] {escalated}/{self.answers} answers escalated ({self.rate:.1%})"
+        if escalated:
+            text += ": " + ", ".join(f"{label} {count}" for label, count in self.escalated.most_common())
+            flips = sum(self.changed.values())
+            text += f"; {flips} changed label"
+            if flips:
+                text += " (" + ", ".join(f"{a} -> {b} {n}" for (a, b), n in self.changed.most_common()) + ")"
+        if self.failed:
+            text += f"; {self.failed} got no second answer (first answer kept)"
+        return text
+
+
+class Cascade:
+    """Per-label confidence thresholds below which a first-pass answer is escalated."""
+
+    def __init__(self, thresholds: dict[str, int], default: int = 0) -> None:
+        self.thresholds = thresholds
+        self.default = default
+        self.report = CascadeReport()
+
+    def escalate(self, label: str, confidence: int) -> bool:
+        """Count one first-pass answer; True if it should go to the second pass."""
+        self.report.answers += 1
+        if confidence < self.thresholds.get(label, self.default):
+            self.report.escalated[label] += 1
+            return True
+        return False
+
+    def settle(self, first: str, second: str | None) -> None:
+        """Record the second pass's label for an escalated row (None if its request failed)."""
+        if second is None:
+            self.report.failed += 1
+        elif second != first:
+            self.report.changed[first, second] += 1
@@ -0,0 +1,38 @@
+"""Shared command-line flags for pipeline steps."""
+
+import argparse
+
+from utils import crawl_cache
+
+
+def parse_step_args(description: str, batch_mode: bool = False) -> argparse.Namespace:
+    """Parse the flags shared by every crawling step and apply them.
+
+    Steps that are not latency sensitive pass batch_mode=True to offer
+    --batch (send LLM requests through the Message Batches API).
+    """
+    parser = argparse.ArgumentParser(description=description)
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Re-crawl every website and overwrite cached pages",
+    )
+    cache_mode.add_argument(
+        "--offline",
+        action="store_true",
+        help="Serve pages from the crawl cache only; never touch the network",
+    )
+    if batch_mode:
+        parser.add_argument(
+            "--batch",
+            action="store_true",
+            help="Send LLM requests as Message Batches jobs (half price, results within hours)",
+        )
+    args = parser.parse_args()
+
+    if args.refresh:
+        crawl_cache.set_mode("refresh")
+    elif args.offline:
+        crawl_cache.set_mode("offline")
+    return args
@@ -0,0 +1,171 @@
+"""Trim crawled markdown to the paragraphs that matter for each step.
+
+Steps used to send text[:4000] of every page, which is mostly navigation,
+cookie banners and hero copy. select_content() strips boilerplate, scores
+the remaining paragraphs against step-specific keywords and keeps the best
+ones (in page order) under a token budget.
+"""
+
+import re
+from collections import Counter
+
+CHARS_PER_TOKEN = 4
+BASELINE_CHARS = 4000  # what steps used to send: text[:4000]
+
+# Per-step keyword sets and token budgets. Keywords match whole words (plus a plural s/es),
+# so "ear" does not count "year" or "near"; "$" counts every dollar sign.
+PROFILES: dict[str, dict] = {
+    "verify": {
+        "budget": 800,
+        "keywords": [
+            "mobile", "we come to you", "come to you", "at your door", "your door", "in-home",
+            "in home", "house call", "van", "your driveway", "mobile pet spa", "come to your home",
+            "mobile unit", "salon", "shop", "storefront", "drop off", "drop-off", "groom", "grooming",
+            "groomer", "bath", "bathing", "appointment", "trailer", "self-contained", "fully equipped",
+        ],
+    },
+    "services": {
+        "budget": 1000,
+        "keywords": [
+            "full groom", "bath", "nail", "trim", "trimming", "deshed", "de-shed", "deshedding",
+            "de-shedding", "teeth", "dental", "ear", "flea", "tick", "puppy", "puppies", "senior",
+            "dematting", "de-matting", "mat", "matted", "matting", "breed", "cut", "haircut", "price",
+            "pricing", "$", "starting at", "dog", "cat", "small", "medium", "large", "xl", "giant",
+            "package", "service", "menu",
+        ],
+    },
+    "features": {
+        "budget": 800,
+        "keywords": [
+            "licensed", "license", "insured", "insurance", "fear free", "certified", "certification",
+            "year", "experience", "experienced", "natural", "organic", "cage-free", "cage free", "kennel",
+            "one-on-one", "one on one", "1-on-1", "individual attention", "book online",
+            "online booking", "schedule online", "book now",
+        ],
+    },
+    "service_areas": {
+        "budget": 700,
+        "keywords": [
+            "serving", "service area", "areas we serve", "we serve", "proudly serve", "travel", "traveling",
+            "miles", "radius", "county", "counties", "metro", "surrounding", "nearby", "cities",
+            "area", "zip", "located in", "based in",
+        ],
+    },
+}
+
+
+
+def _compile_keywords(keywords: list[str]) -> re.Pattern:
+    """One case-insensitive whole-word pattern for a profile's keywords ("$" is counted separately)."""
+    words = sorted((k for k in keywords if k != "$"), key=len, reverse=True)
+    return re.compile(r"\b(?:" + "|".join(map(re.escape, words)) + r")(?:e?s)?\b", re.IGNORECASE)
+
+
+_KEYWORDS = {name: _compile_keywords(config["keywords"]) for name, config in PROFILES.items()}
+
+_IMAGE_ONLY = re.compile(r"^\s*(?:\[?!\[[^\]]*\]\([^)]*\)\]?(?:\([^)]*\))?\s*)+$")
+_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_LIST_MARKER = re.compile(r"^\s*(?:[-*+]|\d+\.)\s+")
+_BOILERPLATE = re.compile(
+    r"cookie|privacy policy|terms of (?:use|service)|all rights reserved|©|&copy;|powered by|"
+    r"skip to (?:main )?content|toggle navigation|accept all|sign up for our newsletter",
+    re.IGNORECASE,
+)
+
+_stats: dict[str, Counter] = {}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (characters / 4)."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def _is_link_line(line: str) -> bool:
+    """True if a line is essentially nothing but markdown links."""
+    stripped = _LIST_MARKER.sub("", line).strip()
+    if not stripped:
+        return False
+    without_links = _LINK.sub("", stripped)
+    return len(re.sub(r"[\s|·•\-–—/]", "", without_links)) <= 3 and _LINK.search(stripped) is not None
+
+
+def strip_boilerplate(text: str) -> list[str]:
+    """Split markdown into paragraphs, dropping nav, footers, link lists and image-only lines."""
+    paragraphs: list[str] = []
+    seen: set[str] = set()
+    for block in re.split(r"\n\s*\n", text):
+        lines = []
+        for line in block.splitlines():
+            if not line.strip() or _IMAGE_ONLY.match(line) or _is_link_line(line):
+                continue
+            # Keep link text, drop URLs
+            lines.append(_LINK.sub(lambda m: m.group(1), line).rstrip())
+        paragraph = "\n".join(lines).strip()
+        if len(paragraph) < 20 or (_BOILERPLATE.search(paragraph) and len(paragraph) < 400):
+            continue
+        key = re.sub(r"\W+", " ", paragraph.lower()).strip()
+        if key in seen:
+            continue
+        seen.add(key)
+        paragraphs.append(paragraph)
+    return paragraphs
+
+
+def _score(paragraph: str, profile: str, position: int) -> float:
+    hits = len(_KEYWORDS[profile].findall(paragraph))
+    if "$" in PROFILES[profile]["keywords"]:
+        hits += paragraph.count("$")
+    # Keyword density, with a mild preference for content near the top
+    return hits / (1 + len(paragraph) / 500) + 0.5 / (1 + position)
+
+
+def select_content(text: str, profile: str, budget_tokens: int | None = None) -> str:
+    """Return the highest-scoring paragraphs of text for profile, in page order.
+
+    Records tokens sent vs the old text[:4000] baseline; see format_savings().
+    """
+    config = PROFILES[profile]
+    budget = budget_tokens or config["budget"]
+    paragraphs = strip_boilerplate(text)
+
+    ranked = sorted(
+        range(len(paragraphs)),
+        key=lambda i: _score(paragraphs[i], profile, i),
+        reverse=True,
+    )
+    chosen: list[int] = []
+    used = 0
+    for i in ranked:
+        cost = estimate_tokens(paragraphs[i]) + 1
+        if used + cost > budget:
+            if not chosen and cost > budget:
+                # One huge paragraph: keep its head rather than nothing
+                paragraphs[i] = paragraphs[i][: budget * CHARS_PER_TOKEN]
+                chosen.append(i)
+                used = budget
+            continue
+        chosen.append(i)
+        used += cost
+    selected = "\n\n".join(paragraphs[i] for i in sorted(chosen))
+    if not selected:
+        selected = text[: budget * CHARS_PER_TOKEN]
+
+    stats = _stats.setdefault(profile, Counter())
+    stats["pages"] += 1
+    stats["baseline_tokens"] += estimate_tokens(text[:BASELINE_CHARS])
+    stats["page_tokens"] += estimate_tokens(text)
+    stats["sent_tokens"] += estimate_tokens(selected)
+    return selected
+
+
+def format_savings(profile: str) -> str:
+    """Summarize tokens sent for profile vs the old text[:4000] truncation."""
+    stats = _stats.get(profile)
+    if not stats or not stats["pages"]:
+        return f"[content] {profile}: no pages"
+    saved = stats["baseline_tokens"] - stats["sent_tokens"]
+    pct = saved / stats["baseline_tokens"] * 100 if stats["baseline_tokens"] else 0
+    return (
+        f"[content] {profile}: {stats['pages']} pages, ~{stats['sent_tokens'] // stats['pages']} tokens/page sent "
+        f"(was ~{stats['baseline_tokens'] // stats['pages']}), ~{saved:,} tokens saved ({pct:.0f}%)"
+    )
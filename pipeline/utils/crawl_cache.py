@@ -0,0 +1,281 @@
+"""Persistent on-disk cache for crawled pages.
+
+Pages are stored in one SQLite file keyed on the canonical URL, with
+content-addressed compressed blobs, LRU eviction, and a probes table for the
+pre-flight probe's negative verdicts. Modes: default, refresh, offline.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from utils.urls import canonical_key
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = PIPELINE_DIR / "data" / "cache" / "crawl.sqlite"
+
+MODES = ("default", "refresh", "offline")
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"  # or the failure kind (see utils.fetch_policy)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url_key      TEXT PRIMARY KEY,
+    url          TEXT NOT NULL,
+    content_hash TEXT,
+    status       TEXT NOT NULL,
+    fetched_at   REAL NOT NULL,
+    elapsed      REAL NOT NULL DEFAULT 0,
+    byte_size    INTEGER NOT NULL DEFAULT 0,
+    last_access  REAL NOT NULL,
+    via          TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS pages_last_access ON pages (last_access);
+CREATE TABLE IF NOT EXISTS probes (
+    url_key    TEXT PRIMARY KEY,
+    url        TEXT NOT NULL,
+    verdict    TEXT NOT NULL,
+    detail     TEXT NOT NULL DEFAULT '',
+    probed_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    content_hash TEXT PRIMARY KEY,
+    data         BLOB NOT NULL,
+    stored_size  INTEGER NOT NULL
+);
+"""
+
+
+@dataclass
+class CacheEntry:
+    """A cached crawl result."""
+
+    url: str
+    text: str | None
+    status: str
+    fetched_at: float
+    elapsed: float
+    byte_size: int
+    via: str = ""
+
+
+@dataclass
+class ProbeEntry:
+    """A cached negative pre-flight verdict."""
+
+    url: str
+    verdict: str
+    detail: str
+    probed_at: float
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(canonical_key(url).encode("utf-8")).hexdigest()
+
+
+class CrawlCache:
+    """SQLite-backed crawl cache with TTL and size-based LRU eviction."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = 14 * 86400,
+        failure_ttl_seconds: float = 86400,
+        max_bytes: int = 500 * 1024 * 1024,
+        probe_ttl_seconds: float = 7 * 86400,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.failure_ttl_seconds = failure_ttl_seconds
+        self.probe_ttl_seconds = probe_ttl_seconds
+        self.max_bytes = max_bytes
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Used from the crawler's loop thread and the step's own thread; every use holds the lock
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(pages)")}
+        if "via" not in columns:
+            # Caches written before the fetch path was recorded
+            self._conn.execute("ALTER TABLE pages ADD COLUMN via TEXT NOT NULL DEFAULT ''")
+        self._writes_since_evict = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _is_fresh(self, status: str, fetched_at: float) -> bool:
+        ttl = self.ttl_seconds if status == STATUS_OK else self.failure_ttl_seconds
+        return time.time() - fetched_at < ttl
+
+    def get(self, url: str, allow_stale: bool = False) -> CacheEntry | None:
+        """Return the cached entry for url, or None on a miss or expired entry."""
+        key = _url_key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT p.status, p.fetched_at, p.elapsed, p.byte_size, p.via, b.data "
+                "FROM pages p LEFT JOIN blobs b ON p.content_hash = b.content_hash "
+                "WHERE p.url_key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            status, fetched_at, elapsed, byte_size, via, data = row
+            if not allow_stale and not self._is_fresh(status, fetched_at):
+                return None
+            if status == STATUS_OK and data is None:
+                # Blob was evicted out from under the row; treat as a miss
+                return None
+            self._conn.execute("UPDATE pages SET last_access = ? WHERE url_key = ?", (time.time(), key))
+            self._conn.commit()
+        text = zlib.decompress(data).decode("utf-8") if data is not None else None
+        return CacheEntry(url, text, status, fetched_at, elapsed, byte_size, via)
+
+    def put(
+        self, url: str, text: str | None, elapsed: float = 0.0, via: str = "", failure: str = STATUS_FAILED
+    ) -> None:
+        """Store a crawl result. A None text is recorded as a failed fetch, with status `failure`."""
+        key = _url_key(url)
+        now = time.time()
+        content_hash = None
+        byte_size = 0
+        status = failure
+        data = None
+        if text is not None:
+            raw = text.encode("utf-8")
+            byte_size = len(raw)
+            content_hash = hashlib.sha256(raw).hexdigest()
+            status = STATUS_OK
+            data = zlib.compress(raw, 6)
+        with self._lock:
+            if data is not None:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO blobs (content_hash, data, stored_size) VALUES (?, ?, ?)",
+                    (content_hash, data, len(data)),
+                )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages "
+                "(url_key, url, content_hash, status, fetched_at, elapsed, byte_size, last_access, via) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, content_hash, status, now, elapsed, byte_size, now, via),
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= 100:
+                self.evict()
+
+    def get_probe(self, url: str) -> ProbeEntry | None:
+        """Return the cached negative verdict for url, or None if there is none or it expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, verdict, detail, probed_at FROM probes WHERE url_key = ?", (_url_key(url),)
+            ).fetchone()
+            if row is None or time.time() - row[3] >= self.probe_ttl_seconds:
+                return None
+            return ProbeEntry(*row)
+
+    def put_probe(self, url: str, verdict: str, detail: str = "") -> None:
+        """Record a negative pre-flight verdict (dead, parked, social) for url."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO probes (url_key, url, verdict, detail, probed_at) VALUES (?, ?, ?, ?, ?)",
+                (_url_key(url), url, verdict, detail, time.time()),
+            )
+            self._conn.commit()
+
+    def total_bytes(self) -> int:
+        """Return the compressed size of all stored blobs."""
+        with self._lock:
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()
+            return total
+
+    def evict(self) -> int:
+        """Drop least-recently-used pages until under max_bytes. Return pages removed."""
+        with self._lock:
+            self._writes_since_evict = 0
+            excess = self.total_bytes() - self.max_bytes
+            if excess <= 0:
+                return 0
+
+            victims = []
+            rows = self._conn.execute(
+                "SELECT p.url_key, COALESCE(b.stored_size, 0) "
+                "FROM pages p LEFT JOIN blobs b ON p.content_hash = b.content_hash "
+                "ORDER BY p.last_access ASC"
+            )
+            for url_key, stored_size in rows:
+                if excess <= 0:
+                    break
+                victims.append((url_key,))
+                excess -= stored_size
+
+            self._conn.executemany("DELETE FROM pages WHERE url_key = ?", victims)
+            self._conn.execute(
+                "DELETE FROM blobs WHERE content_hash NOT IN "
+                "(SELECT content_hash FROM pages WHERE content_hash IS NOT NULL)"
+            )
+            self._conn.commit()
+            return len(victims)
+
+    def stats(self) -> dict:
+        """Return entry counts, stored size, and successful pages per fetch path."""
+        with self._lock:
+            pages, ok = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(status = 'ok'), 0) FROM pages"
+            ).fetchone()
+            via = dict(self._conn.execute("SELECT via, COUNT(*) FROM pages WHERE status = 'ok' GROUP BY via"))
+            probes = dict(self._conn.execute("SELECT verdict, COUNT(*) FROM probes GROUP BY verdict"))
+            return {
+                "pages": pages, "ok": ok, "failed": pages - ok, "stored_bytes": self.total_bytes(), "via": via,
+                "probes": probes,
+            }
+
+
+_cache: CrawlCache | None = None
+
+
+def _env_mode() -> str:
+    """CRAWL_CACHE_MODE from the environment; a typo fails loudly instead of silently caching."""
+    mode = (os.getenv("CRAWL_CACHE_MODE") or "default").strip()
+    if mode not in MODES:
+        raise ValueError(f"CRAWL_CACHE_MODE={mode!r} is not a crawl cache mode; expected one of {', '.join(MODES)}")
+    return mode
+
+
+_mode: str = _env_mode()
+
+
+def get_cache() -> CrawlCache | None:
+    """Lazy-init the process-wide crawl cache. Returns None if disabled."""
+    global _cache
+    if os.getenv("CRAWL_CACHE", "1") == "0":
+        return None
+    if _cache is None:
+        _cache = CrawlCache(
+            path=os.getenv("CRAWL_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+            ttl_seconds=float(os.getenv("CRAWL_CACHE_TTL_DAYS", "14")) * 86400,
+            failure_ttl_seconds=float(os.getenv("CRAWL_CACHE_FAILURE_TTL_HOURS", "24")) * 3600,
+            max_bytes=int(float(os.getenv("CRAWL_CACHE_MAX_MB", "500")) * 1024 * 1024),
+            probe_ttl_seconds=float(os.getenv("CRAWL_PREFLIGHT_TTL_DAYS", "7")) * 86400,
+        )
+    return _cache
+
+
+def get_mode() -> str:
+    """Return the active cache mode."""
+    return _mode
+
+
+def set_mode(mode: str) -> None:
+    """Set the cache mode: default, refresh or offline."""
+    global _mode
+    if mode not in MODES:
+        raise ValueError(f"Unknown crawl cache mode {mode!r}; expected one of {MODES}")
+    _mode = mode
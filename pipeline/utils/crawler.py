@@ -1,64 +1,977 @@
-"""Shared AsyncWebCrawler wrapper for Crawl4AI."""
+"""Shared Crawl4AI crawling: a warm browser pool, served in-process or by a daemon.
+
+Pages are fetched over HTTP first (PageFetcher) and rendered on the pool only
+when needed. Set CRAWL_DAEMON to share one pool across processes, and
+CRAWL_WORKERS to shard crawls across worker processes.
+"""
 
 import asyncio
+import atexit
+import importlib
+import json
+import multiprocessing
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable, Callable
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+
+import httpx
 from crawl4ai import AsyncWebCrawler, BrowserConfig, CrawlerRunConfig
 
+from utils.crawl_cache import STATUS_FAILED, STATUS_OK, get_cache, get_mode
+from utils.fetch_policy import (
+    DNS,
+    EMPTY,
+    ERROR,
+    FAILURES,
+    RETRIES,
+    TIMEOUT,
+    TIMEOUT_MAX,
+    USER_AGENT,
+    FetchResult,
+    LatencyTracker,
+    backoff,
+    classify_exception,
+    classify_message,
+    failure_for_status,
+)
+from utils.html_markdown import html_to_markdown, needs_browser
+from utils.preflight import PREFLIGHT, preflight
+from utils.scheduler import KeyedThrottle, hedged, sliding_window
+from utils.urls import group_urls, interleave_by_domain, registrable_domain
+
+# Politeness limits per registrable domain (shared hosts throttle aggressively)
+PER_DOMAIN_CONCURRENCY = int(os.getenv("CRAWL_PER_DOMAIN_CONCURRENCY", "2"))
+PER_DOMAIN_DELAY = float(os.getenv("CRAWL_PER_DOMAIN_DELAY", "1.0"))
+
+# Warm browser pool
+POOL_SIZE = int(os.getenv("CRAWL_POOL_SIZE", "2"))
+TABS_PER_BROWSER = int(os.getenv("CRAWL_TABS_PER_BROWSER", "8"))
+RECYCLE_PAGES = int(os.getenv("CRAWL_RECYCLE_PAGES", "500"))
+RECYCLE_MB = float(os.getenv("CRAWL_RECYCLE_MB", "2048"))
+HEALTH_INTERVAL = 60.0
+BROWSER_START_ATTEMPTS = 3
+DAEMON_ADDRESS = os.getenv("CRAWL_DAEMON", "")
+
+# HTTP fast path in front of the browsers
+FAST_PATH = os.getenv("CRAWL_FAST_PATH", "1") != "0"
+FAST_PATH_TIMEOUT = 8.0
+FAST_PATH_MAX_BYTES = 3 * 1024 * 1024
+
+# Which path served a page
+VIA_CACHE = "cache"
+VIA_HTTP = "http"
+VIA_BROWSER = "browser"
+VIA_RENDERER = "renderer"
+VIA_PREFLIGHT = "preflight"
+
+# Sharded crawling: worker processes, each with its own browser
+WORKERS = int(os.getenv("CRAWL_WORKERS", "1"))
+WORKER_RESTARTS = int(os.getenv("CRAWL_WORKER_RESTARTS", "2"))
+
+HEALTH_PAGE = "raw:<html><body><p>ok</p></body></html>"
+# Errors that mean the browser itself is gone, not just this page
+_BROWSER_ERRORS = ("target closed", "browser has been closed", "connection closed", "browser closed", "crashed")
+
+
+async def _render_result(crawler: AsyncWebCrawler, url: str, timeout: float) -> FetchResult:
+    """Render one URL into a FetchResult; browser-level errors propagate."""
+    config = CrawlerRunConfig(
+        wait_until="domcontentloaded",
+        page_timeout=int(timeout * 1000),
+    )
+    try:
+        # page_timeout covers navigation only; this bounds the whole render
+        result = await asyncio.wait_for(crawler.arun(url=url, config=config), timeout + 5)
+    except asyncio.TimeoutError:
+        return FetchResult(url, via=VIA_BROWSER, failure=TIMEOUT, detail=f"no result after {timeout + 5:.0f}s")
+    status = getattr(result, "status_code", None)
+    if status is not None and status >= 400:
+        return FetchResult(url, via=VIA_BROWSER, failure=failure_for_status(status), status=status, detail=f"HTTP {status}")
+    if result.success and result.markdown and result.markdown.raw_markdown.strip():
+        return FetchResult(url, result.markdown.raw_markdown, VIA_BROWSER, status=status)
+    if result.success:
+        return FetchResult(url, via=VIA_BROWSER, failure=EMPTY, status=status, detail="no text rendered")
+    message = getattr(result, "error_message", "") or ""
+    return FetchResult(url, via=VIA_BROWSER, failure=classify_message(message), status=status, detail=message[:200])
+
+
+async def _render(crawler: AsyncWebCrawler, url: str, timeout: int) -> str | None:
+    """Render one URL, return markdown text or None; browser-level errors propagate."""
+    return (await _render_result(crawler, url, timeout)).text
+
+
+def _browser_rss_mb() -> float | None:
+    """Resident memory of this process's descendants (the browsers), via /proc; None if unavailable."""
+    proc = Path("/proc")
+    if not proc.exists():
+        return None
+    parents: dict[int, int] = {}
+    for stat in proc.glob("[0-9]*/stat"):
+        try:
+            fields = stat.read_text().rsplit(")", 1)[1].split()
+            parents[int(stat.parent.name)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    descendants, frontier = set(), {os.getpid()}
+    while frontier:
+        frontier = {pid for pid, ppid in parents.items() if ppid in frontier} - descendants
+        descendants |= frontier
+    total_kb = 0
+    for pid in descendants:
+        try:
+            for line in (proc / str(pid) / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total_kb += int(line.split()[1])
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
+
+
+class _Browser:
+    """One warm AsyncWebCrawler plus its bookkeeping."""
+
+    def __init__(self, slot: int) -> None:
+        self.slot = slot
+        self.crawler: AsyncWebCrawler | None = None
+        self.active = 0
+        self.pages = 0
+        self.restarts = 0
+        self.last_used = 0.0
+        self.draining = ""  # why the browser should restart once idle
+        self.dead = ""  # why the browser was retired after failing to restart
+        self.ready = asyncio.Event()
+
+    async def start(self) -> None:
+        crawler = AsyncWebCrawler(config=BrowserConfig(headless=True, verbose=False))
+        await crawler.__aenter__()
+        self.crawler = crawler
+        self.pages = 0
+        self.draining = ""
+        self.last_used = time.monotonic()
+        self.ready.set()
+
+    async def close(self) -> None:
+        self.ready.clear()
+        crawler, self.crawler = self.crawler, None
+        if crawler is not None:
+            try:
+                await crawler.__aexit__(None, None, None)
+            except Exception as e:
+                print(f"  [pool] Browser {self.slot} did not close cleanly: {e}")
+
+    async def healthy(self) -> bool:
+        """Render a tiny raw: page to prove the browser still responds."""
+        try:
+            return await asyncio.wait_for(_render(self.crawler, HEALTH_PAGE, 10), 15) is not None
+        except Exception:
+            return False
+
+
+class BrowserPool:
+    """Warm AsyncWebCrawler instances with recycling and health checks.
+
+    Must be used from a single event loop (see CrawlerService).
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        tabs: int = TABS_PER_BROWSER,
+        recycle_pages: int = RECYCLE_PAGES,
+        recycle_mb: float = RECYCLE_MB,
+    ) -> None:
+        self.size = max(1, size)
+        self.tabs = max(1, tabs)
+        self.recycle_pages = recycle_pages
+        self.recycle_mb = recycle_mb
+        self.browsers = [_Browser(slot) for slot in range(self.size)]
+        self.served = 0
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self._changed = asyncio.Condition()
+
+    async def start(self) -> None:
+        """Launch every browser (once); later calls return immediately."""
+        async with self._start_lock:
+            if self._started:
+                return
+            started = time.monotonic()
+            await asyncio.gather(*(browser.start() for browser in self.browsers))
+            self._started = True
+            print(f"  [pool] {self.size} browsers warm in {time.monotonic() - started:.1f}s")
+
+    async def close(self) -> None:
+        await asyncio.gather(*(browser.close() for browser in self.browsers))
+        self._started = False
+
+    def _pick(self) -> _Browser | None:
+        usable = [b for b in self.browsers if b.ready.is_set() and not b.draining and b.active < self.tabs]
+        return min(usable, key=lambda b: (b.active, b.pages)) if usable else None
+
+    async def _acquire(self) -> _Browser | None:
+        """Wait for a browser with a free tab; None once every browser is retired."""
+        async with self._changed:
+            while (browser := self._pick()) is None:
+                if all(b.dead for b in self.browsers):
+                    return None
+                await self._changed.wait()
+            browser.active += 1
+            return browser
+
+    async def _release(self, browser: _Browser) -> None:
+        async with self._changed:
+            browser.active -= 1
+            browser.pages += 1
+            browser.last_used = time.monotonic()
+            self.served += 1
+            if browser.pages >= self.recycle_pages and not browser.draining:
+                browser.draining = f"after {browser.pages} pages"
+            elif self.served % 50 == 0 and self.recycle_mb > 0:
+                rss = _browser_rss_mb()
+                if rss is not None and rss > self.recycle_mb:
+                    # Recycle the browser that has served the most pages
+                    worst = max(self.browsers, key=lambda b: b.pages)
+                    worst.draining = f"{rss:.0f} MB in use"
+                    print(f"  [pool] Browsers at {rss:.0f} MB (> {self.recycle_mb:.0f}); recycling browser {worst.slot}")
+            self._changed.notify_all()
+        for idle in self.browsers:
+            if idle.draining and idle.active == 0 and idle.ready.is_set():
+                await self._restart(idle, idle.draining)
+
+    async def _restart(self, browser: _Browser, reason: str) -> None:
+        """Relaunch an idle browser, retrying with backoff; retire it if it never comes back."""
+        browser.ready.clear()
+        try:
+            await browser.close()
+            for attempt in range(1, BROWSER_START_ATTEMPTS + 1):
+                try:
+                    await browser.start()
+                except Exception as e:
+                    await browser.close()
+                    print(f"  [pool] Browser {browser.slot} failed to start (attempt {attempt}): {e}")
+                    if attempt < BROWSER_START_ATTEMPTS:
+                        await asyncio.sleep(backoff(attempt))
+                    continue
+                browser.restarts += 1
+                print(f"  [pool] Restarted browser {browser.slot} ({reason})")
+                return
+            browser.dead = f"no restart after {reason}"
+            print(f"  [pool] Retired browser {browser.slot} after {BROWSER_START_ATTEMPTS} failed starts")
+        finally:
+            # Wake waiters either way: a browser is back, or _acquire must notice the pool is dead
+            async with self._changed:
+                self._changed.notify_all()
+
+    async def fetch(self, url: str, timeout: float) -> FetchResult:
+        """Render url on a warm browser."""
+        await self.start()
+        browser = await self._acquire()
+        try:
+            stale = browser is not None and time.monotonic() - browser.last_used > HEALTH_INTERVAL
+            if stale and not await browser.healthy():
+                browser.draining = "failed health check"
+                browser = await self._swap(browser)
+            if browser is None:
+                return FetchResult(url, via=VIA_BROWSER, failure=ERROR, detail="no working browser left in the pool")
+            try:
+                return await _render_result(browser.crawler, url, timeout)
+            except Exception as e:
+                if any(marker in str(e).lower() for marker in _BROWSER_ERRORS):
+                    browser.draining = f"browser error: {e}"
+                return FetchResult(url, via=VIA_BROWSER, failure=classify_exception(e), detail=str(e)[:200])
+        finally:
+            if browser is not None:
+                await self._release(browser)
+
+    async def _swap(self, browser: _Browser) -> _Browser | None:
+        """Give up a bad browser (restarting it once idle) and acquire another."""
+        async with self._changed:
+            browser.active -= 1
+            self._changed.notify_all()
+        if browser.active == 0:
+            await self._restart(browser, browser.draining)
+        return await self._acquire()
+
+    def stats(self) -> dict:
+        return {
+            "browsers": self.size,
+            "served": self.served,
+            "active": sum(b.active for b in self.browsers),
+            "restarts": sum(b.restarts for b in self.browsers),
+            "retired": sum(bool(b.dead) for b in self.browsers),
+            "rss_mb": _browser_rss_mb(),
+        }
+
+
+class PageFetcher:
+    """HTTP fast path first; the BrowserPool renders whatever it cannot serve.
+
+    Each attempt's timeout comes from the LatencyTracker, slow attempts are
+    hedged, and transient failures are retried (CRAWL_RETRIES) with
+    backoff. Browsers are launched only when the first page needs one. Must
+    be used from a single event loop, like the pool.
+    """
+
+    def __init__(
+        self,
+        pool: BrowserPool | None = None,
+        fast_path: bool = FAST_PATH,
+        latency: LatencyTracker | None = None,
+        retries: int = RETRIES,
+    ) -> None:
+        self.pool = pool or BrowserPool()
+        self.fast_path = fast_path
+        self.latency = latency or LatencyTracker()
+        self.max_retries = retries
+        self.paths: Counter = Counter()
+        self.escalations: Counter = Counter()
+        self.failures: Counter = Counter()
+        self.retries = 0
+        self._client: httpx.AsyncClient | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+            )
+        return self._client
+
+    async def _get_html(self, url: str, timeout: float) -> FetchResult | tuple[str, str]:
+        """GET url; return (html, final url), or a FetchResult describing why not."""
+        async with self._http().stream("GET", url, timeout=timeout) as response:
+            status = response.status_code
+            if status != 200:
+                failure = failure_for_status(status) if status >= 400 else ERROR
+                return FetchResult(url, via=VIA_HTTP, failure=failure, status=status, detail=f"HTTP {status}")
+            if "html" not in response.headers.get("content-type", "html"):
+                return FetchResult(url, via=VIA_HTTP, failure=EMPTY, status=status, detail="not html")
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                body += chunk
+                if len(body) > FAST_PATH_MAX_BYTES:
+                    return FetchResult(url, via=VIA_HTTP, failure=EMPTY, status=status, detail="too large")
+            return body.decode(response.encoding or "utf-8", errors="replace"), str(response.url)
+
+    async def fast_fetch(self, url: str, timeout: float) -> FetchResult:
+        """Plain GET + conversion; a failed result's detail says why a browser is needed."""
+        started = time.monotonic()
+        try:
+            page = await asyncio.wait_for(self._get_html(url, timeout), timeout)
+        except (httpx.HTTPError, asyncio.TimeoutError, UnicodeError, LookupError, OSError) as e:
+            return FetchResult(url, via=VIA_HTTP, failure=classify_exception(e), detail=str(e)[:200] or type(e).__name__)
+        if isinstance(page, FetchResult):
+            return page
+        html, final_url = page
+        markdown = html_to_markdown(html, final_url)
+        reason = needs_browser(html, markdown)
+        if reason:
+            return FetchResult(url, via=VIA_HTTP, failure=EMPTY, status=200, detail=reason)
+        self.latency.record(VIA_HTTP, time.monotonic() - started)
+        return FetchResult(url, markdown, VIA_HTTP, status=200)
+
+    async def _render(self, url: str, timeout: float) -> FetchResult:
+        started = time.monotonic()
+        result = await self.pool.fetch(url, timeout)
+        if result.ok:
+            self.latency.record(VIA_BROWSER, time.monotonic() - started)
+        return result
+
+    async def _hedged(self, path: str, call) -> FetchResult:
+        result, was_hedged = await hedged(call, self.latency.hedge_after(path), accept=lambda r: r.ok)
+        if was_hedged:
+            self.latency.hedges += 1
+            result.hedged = True
+        return result
+
+    def _timeout(self, path: str, default: float, attempt: int) -> float:
+        """Adaptive timeout for path, widened by half on each retry."""
+        return min(max(TIMEOUT_MAX, default), self.latency.timeout(path, default) * 1.5 ** (attempt - 1))
+
+    async def _attempt(self, url: str, timeout: float, attempt: int) -> FetchResult:
+        if self.fast_path:
+            fast_timeout = self._timeout(VIA_HTTP, min(timeout, FAST_PATH_TIMEOUT), attempt)
+            fast = await self._hedged(VIA_HTTP, lambda: self.fast_fetch(url, fast_timeout))
+            # A browser cannot resolve a dead domain or find a deleted page either
+            if fast.ok or fast.failure == DNS or fast.status in (404, 410):
+                return fast
+            self.escalations[fast.detail if fast.failure == EMPTY else fast.failure] += 1
+        browser_timeout = self._timeout(VIA_BROWSER, timeout, attempt)
+        return await self._hedged(VIA_BROWSER, lambda: self._render(url, browser_timeout))
+
+    async def fetch(self, url: str, timeout: float) -> FetchResult:
+        """Fetch url, retrying transient failures; return the final FetchResult."""
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            result = await self._attempt(url, timeout, attempt)
+            if result.ok or not result.transient or attempt > self.max_retries:
+                break
+            self.retries += 1
+            await asyncio.sleep(backoff(attempt))
+            attempt += 1
+        result.attempts = attempt
+        result.seconds = time.monotonic() - started
+        if result.ok:
+            self.paths[result.via] += 1
+        else:
+            self.failures[result.failure] += 1
+        return result
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        await self.pool.close()
+
+    def stats(self) -> dict:
+        return {
+            **self.pool.stats(),
+            "paths": dict(self.paths),
+            "escalations": dict(self.escalations),
+            "failures": dict(self.failures),
+            "retries": self.retries,
+            "latency": self.latency.stats(),
+        }
+
+
+class CrawlerService:
+    """The process-wide PageFetcher and BrowserPool, running on its own event-loop thread.
+
+    fetch() may be awaited from any event loop (each step's asyncio.run);
+    the browsers stay warm between calls and are closed at exit.
+    """
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._fetcher: PageFetcher | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="crawler-pool", daemon=True).start()
+                self._fetcher = asyncio.run_coroutine_threadsafe(self._make_fetcher(), loop).result()
+                self._loop = loop
+                atexit.register(self.close)
+            return self._loop
+
+    async def _make_fetcher(self) -> PageFetcher:
+        return PageFetcher()
+
+    async def _call(self, coro):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()))
+
+    async def fetch(self, url: str, timeout: float) -> FetchResult:
+        self._ensure_loop()
+        return await self._call(self._fetcher.fetch(url, timeout))
+
+    async def stats(self) -> dict:
+        self._ensure_loop()
+        return await self._call(self._fetcher_stats())
+
+    async def _fetcher_stats(self) -> dict:
+        return self._fetcher.stats()
+
+    def close(self) -> None:
+        """Close the browsers and stop the pool thread."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._fetcher.close(), loop).result(timeout=30)
+        except Exception as e:
+            print(f"  [pool] Shutdown error: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+
+
+# Daemon protocol: length-prefixed JSON frames over a localhost TCP socket
+
+
+async def _send(writer: asyncio.StreamWriter, message: dict) -> None:
+    data = json.dumps(message).encode("utf-8")
+    writer.write(len(data).to_bytes(4, "big") + data)
+    await writer.drain()
+
+
+async def _receive(reader: asyncio.StreamReader) -> dict:
+    size = int.from_bytes(await reader.readexactly(4), "big")
+    return json.loads(await reader.readexactly(size))
+
+
+class DaemonClient:
+    """Crawls through a crawl daemon (see serve()) shared by several processes."""
 
-async def _crawl_single(crawler: AsyncWebCrawler, url: str, timeout: int) -> tuple[str, str | None]:
-    """Crawl a single URL, return (url, markdown_text | None)."""
+    def __init__(self, address: str) -> None:
+        host, _, port = address.rpartition(":")
+        self.host = host or "127.0.0.1"
+        self.port = int(port)
+
+    async def _request(self, message: dict) -> dict:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            await _send(writer, message)
+            return await _receive(reader)
+        finally:
+            writer.close()
+
+    async def fetch(self, url: str, timeout: float) -> FetchResult:
+        reply = await self._request({"op": "fetch", "url": url, "timeout": timeout})
+        return FetchResult(**reply)
+
+    async def stats(self) -> dict:
+        return await self._request({"op": "stats"})
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, fetcher: PageFetcher | None = None) -> None:
+    """Run the crawl daemon until cancelled: one warm pool shared by every client."""
+    fetcher = fetcher or PageFetcher()
+    await fetcher.pool.start()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    message = await _receive(reader)
+                except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+                    return  # client hung up, or the daemon is shutting down
+                if message.get("op") == "stats":
+                    await _send(writer, fetcher.stats())
+                else:
+                    result = await fetcher.fetch(message["url"], float(message.get("timeout", 15)))
+                    await _send(writer, result.to_dict())
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"  [pool] Crawl daemon listening on {host}:{port} ({fetcher.pool.size} browsers)")
     try:
-        config = CrawlerRunConfig(
-            wait_until="domcontentloaded",
-            page_timeout=timeout * 1000,
+        async with server:
+            await server.serve_forever()
+    finally:
+        await fetcher.close()
+
+
+_service: CrawlerService | DaemonClient | None = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> CrawlerService | DaemonClient:
+    """Return the crawl daemon client (CRAWL_DAEMON) or the in-process pool."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = DaemonClient(DAEMON_ADDRESS) if DAEMON_ADDRESS else CrawlerService()
+        return _service
+
+
+async def _fetch(url: str, timeout: float) -> FetchResult:
+    """Fetch url through the shared service, falling back from an unreachable daemon."""
+    global _service
+    service = get_service()
+    if isinstance(service, DaemonClient):
+        try:
+            return await service.fetch(url, timeout)
+        except OSError as e:
+            print(f"  [pool] Crawl daemon {DAEMON_ADDRESS} unreachable ({e}); using an in-process pool")
+            with _service_lock:
+                if _service is service:
+                    _service = CrawlerService()
+            service = get_service()
+    return await service.fetch(url, timeout)
+
+
+def _store(result: FetchResult) -> None:
+    """Record a result in the crawl cache; transient failures are left to the next crawl."""
+    cache = get_cache()
+    if cache is not None and (result.ok or not result.transient):
+        cache.put(result.url, result.text, elapsed=result.seconds, via=result.via, failure=result.failure or STATUS_FAILED)
+
+
+async def _crawl_and_store(url: str, timeout: float) -> FetchResult:
+    """Crawl a single URL on the shared service and record the result in the crawl cache."""
+    started = time.monotonic()
+    result = await _fetch(url, timeout)
+    result.url = url
+    result.seconds = time.monotonic() - started
+    _store(result)
+    return result
+
+
+async def _iter_sharded_and_store(
+    urls: list[str], workers: int, concurrency: int, timeout: float
+) -> AsyncIterator[FetchResult]:
+    """Sharded crawl; the parent alone writes the crawl cache."""
+    async for result in _iter_sharded(urls, workers, concurrency, timeout):
+        _store(result)
+        yield result
+
+
+def _lookup_cached(urls: list[str]) -> tuple[dict[str, FetchResult], list[str]]:
+    """Split urls into cached results and URLs that still need crawling."""
+    cache = get_cache()
+    mode = get_mode()
+    if cache is None or mode == "refresh":
+        return {}, list(urls)
+
+    cached: dict[str, FetchResult] = {}
+    misses: list[str] = []
+    for url in urls:
+        entry = cache.get(url, allow_stale=(mode == "offline"))
+        if entry is not None:
+            failure = None if entry.status == STATUS_OK else entry.status if entry.status in FAILURES else ERROR
+            cached[url] = FetchResult(url, entry.text, VIA_CACHE, failure=failure, detail=entry.via)
+        elif mode == "offline":
+            cached[url] = FetchResult(url, via=VIA_CACHE, failure=ERROR, detail="not cached (offline)")
+        else:
+            misses.append(url)
+    return cached, misses
+
+
+async def _preflight(urls: list[str]) -> tuple[dict[str, FetchResult], list[str]]:
+    """Split urls into sites the pre-flight probe ruled out and sites worth crawling."""
+    if not PREFLIGHT or not urls or get_mode() == "offline":
+        return {}, urls
+    started = time.monotonic()
+    probes = await preflight(urls)
+    ruled_out = {
+        url: FetchResult(url, via=VIA_PREFLIGHT, failure=probe.verdict, detail=probe.detail)
+        for url, probe in probes.items()
+        if not probe.live
+    }
+    if ruled_out:
+        verdicts = Counter(result.failure for result in ruled_out.values())
+        known = sum(probes[url].cached for url in ruled_out)
+        print(
+            f"  [crawl] Pre-flight: {len(urls)} sites in {time.monotonic() - started:.1f}s, skipping "
+            + ", ".join(f"{verdict} {count}" for verdict, count in verdicts.most_common())
+            + (f" ({known} known from earlier runs)" if known else "")
         )
-        result = await crawler.arun(url=url, config=config)
-        if result.success and result.markdown:
-            return url, result.markdown.raw_markdown
-        return url, None
-    except Exception as e:
-        print(f"  [crawl] Error crawling {url}: {e}")
-        return url, None
+    return ruled_out, [url for url in urls if url not in ruled_out]
 
 
-async def _crawl_url(url: str, timeout: int) -> str | None:
+async def _crawl_url(url: str, timeout: float) -> str | None:
     """Crawl a single URL and return markdown text or None on failure."""
-    browser_config = BrowserConfig(headless=True, verbose=False)
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        _, text = await _crawl_single(crawler, url, timeout)
-        return text
+    ruled_out, _ = await _preflight([url])
+    if ruled_out:
+        return None
+    return (await _crawl_and_store(url, timeout)).text
+
+
+# Sharded crawling across worker processes.
+#
+# Each worker gets whole registrable domains (so the per-domain throttle still
+# holds across workers), renders its shard on its own browser and sends every
+# page back as one binary frame over a pipe:
+#
+#     header (url bytes, text bytes or NO_TEXT, seconds, path, failure, status, attempts, hedged, detail bytes)
+#     | url utf-8 | detail utf-8 | zlib(text utf-8)
+#
+# Pages are encoded and compressed once in the worker and decoded once in the
+# parent; nothing is pickled. An empty frame marks a clean finish. A worker
+# that dies is replaced (up to CRAWL_WORKER_RESTARTS times) with the URLs it
+# had not reported yet; the other workers carry on untouched.
+
+_FRAME = struct.Struct("!IIfBBHHBH")
+_NO_TEXT = 0xFFFFFFFF
+_VIAS = (VIA_BROWSER, VIA_HTTP, VIA_RENDERER)
+
+# render(url, timeout) -> markdown | None, run inside a worker
+Renderer = Callable[[str, int], Awaitable[str | None]]
+
+
+def _encode_page(result: FetchResult) -> bytes:
+    url_bytes = result.url.encode("utf-8")
+    detail = result.detail.encode("utf-8")[:0xFFFF].decode("utf-8", "ignore").encode("utf-8")
+    body = b"" if result.text is None else zlib.compress(result.text.encode("utf-8"), 1)
+    header = _FRAME.pack(
+        len(url_bytes),
+        _NO_TEXT if result.text is None else len(body),
+        result.seconds,
+        _VIAS.index(result.via),
+        FAILURES.index(result.failure) + 1 if result.failure else 0,
+        result.status or 0,
+        min(result.attempts, 0xFFFF),
+        result.hedged,
+        len(detail),
+    )
+    return header + url_bytes + detail + body
+
+
+def _decode_page(frame: bytes) -> FetchResult:
+    url_size, body_size, seconds, via, failure, status, attempts, hedged, detail_size = _FRAME.unpack_from(frame)
+    start = _FRAME.size
+    detail_start = start + url_size
+    body_start = detail_start + detail_size
+    result = FetchResult(
+        frame[start:detail_start].decode("utf-8"),
+        via=_VIAS[via],
+        failure=FAILURES[failure - 1] if failure else None,
+        status=status or None,
+        detail=frame[detail_start:body_start].decode("utf-8"),
+        attempts=attempts,
+        seconds=seconds,
+        hedged=bool(hedged),
+    )
+    if body_size != _NO_TEXT:
+        result.text = zlib.decompress(frame[body_start : body_start + body_size]).decode("utf-8")
+    return result
+
+
+def shard_by_domain(urls: list[str], shards: int) -> list[list[str]]:
+    """Split urls into up to `shards` lists, keeping each registrable domain whole.
 
+    Largest domains are placed first, each on the currently smallest shard.
+    """
+    by_domain: dict[str, list[str]] = {}
+    for url in urls:
+        by_domain.setdefault(registrable_domain(url), []).append(url)
+    result: list[list[str]] = [[] for _ in range(max(1, min(shards, len(by_domain))))]
+    for members in sorted(by_domain.values(), key=len, reverse=True):
+        min(result, key=len).extend(members)
+    return [interleave_by_domain(shard) for shard in result if shard]
 
-async def _crawl_urls(urls: list[str], batch_size: int, timeout: int) -> dict[str, str | None]:
-    """Crawl multiple URLs concurrently in batches, return {url: text}."""
-    results: dict[str, str | None] = {}
-    browser_config = BrowserConfig(headless=True, verbose=False)
 
-    async with AsyncWebCrawler(config=browser_config) as crawler:
-        for i in range(0, len(urls), batch_size):
-            batch = urls[i : i + batch_size]
-            batch_num = i // batch_size + 1
-            total_batches = (len(urls) + batch_size - 1) // batch_size
-            print(f"  [crawl] Batch {batch_num}/{total_batches} ({len(batch)} URLs)")
+def _load_renderer(spec: str) -> Renderer:
+    """Resolve a "module:function" renderer spec."""
+    module, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module), name)
 
-            tasks = [_crawl_single(crawler, url, timeout) for url in batch]
-            batch_results = await asyncio.gather(*tasks)
 
-            for url, text in batch_results:
-                results[url] = text
+async def _run_shard(conn: Connection, urls: list[str], concurrency: int, timeout: int, renderer: str | None) -> None:
+    fetcher = None
+    if renderer:
+        custom = _load_renderer(renderer)
 
-            success_count = sum(1 for _, t in batch_results if t is not None)
-            print(f"  [crawl] Batch {batch_num} complete: {success_count}/{len(batch)} succeeded")
+        async def render(url: str, timeout: float) -> FetchResult:
+            text = await custom(url, timeout)
+            return FetchResult(url, text, VIA_RENDERER, failure=None if text else ERROR)
 
-    return results
+    else:
+        fetcher = PageFetcher(BrowserPool(size=1, tabs=concurrency))
+        render = fetcher.fetch
+    throttle = KeyedThrottle(PER_DOMAIN_CONCURRENCY, PER_DOMAIN_DELAY)
+
+    async def crawl(url: str) -> bytes:
+        async with throttle.slot(registrable_domain(url)):
+            started = time.monotonic()
+            result = await render(url, timeout)
+            result.seconds = time.monotonic() - started
+            return _encode_page(result)
+
+    try:
+        async for frame in sliding_window(urls, crawl, concurrency):
+            conn.send_bytes(frame)
+    finally:
+        if fetcher is not None:
+            await fetcher.close()
+
+
+def _shard_worker(conn: Connection, urls: list[str], concurrency: int, timeout: int, renderer: str | None) -> None:
+    """Worker process entry point: crawl one shard, stream frames, then an empty frame."""
+    asyncio.run(_run_shard(conn, urls, concurrency, timeout, renderer))
+    conn.send_bytes(b"")
+    conn.close()
+
+
+class _Shard:
+    """Parent-side view of one worker: its process, pipe and unreported URLs."""
+
+    def __init__(self, slot: int, urls: list[str]) -> None:
+        self.slot = slot
+        self.remaining = dict.fromkeys(urls)
+        self.restarts = 0
+        self.process: multiprocessing.process.BaseProcess | None = None
+        self.conn: Connection | None = None
+
+    def start(self, concurrency: int, timeout: int, renderer: str | None) -> None:
+        context = multiprocessing.get_context("spawn")  # a forked Playwright is not safe
+        receiver, sender = context.Pipe(duplex=False)
+        self.process = context.Process(
+            target=_shard_worker,
+            args=(sender, list(self.remaining), concurrency, timeout, renderer),
+            name=f"crawl-shard-{self.slot}",
+            daemon=True,
+        )
+        self.process.start()
+        sender.close()
+        self.conn = receiver
+
+    def stop(self) -> None:
+        if self.conn is not None:
+            self.conn.close()
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+        if self.process is not None:
+            self.process.join(5)
+
+
+async def _iter_sharded(
+    urls: list[str], workers: int, concurrency: int, timeout: int, renderer: str | None = None
+) -> AsyncIterator[FetchResult]:
+    """Crawl urls on `workers` processes, yield a FetchResult as each page arrives.
+
+    concurrency is per worker. renderer ("module:function") replaces the
+    worker's browser, e.g. for benchmarks.
+    """
+    shards = [_Shard(slot, shard) for slot, shard in enumerate(shard_by_domain(urls, workers))]
+    print(f"  [crawl] Sharding {len(urls)} URLs across {len(shards)} worker processes")
+    for shard in shards:
+        shard.start(concurrency, timeout, renderer)
+    live = {shard.conn: shard for shard in shards}
+    try:
+        while live:
+            ready = await asyncio.to_thread(wait, list(live), 1.0)
+            for conn in ready:
+                shard = live[conn]
+                try:
+                    frame = conn.recv_bytes()
+                except (EOFError, OSError):
+                    frame = None
+                if frame:
+                    result = _decode_page(frame)
+                    shard.remaining.pop(result.url, None)
+                    yield result
+                    continue
+                del live[conn]
+                shard.stop()
+                if frame is None and shard.remaining:
+                    # The worker died mid-shard: isolate the crash to its unreported URLs
+                    code = shard.process.exitcode
+                    if shard.restarts < WORKER_RESTARTS:
+                        shard.restarts += 1
+                        print(
+                            f"  [crawl] Worker {shard.slot} exited ({code}); restarting with "
+                            f"{len(shard.remaining)} URLs left"
+                        )
+                        shard.start(concurrency, timeout, renderer)
+                        live[shard.conn] = shard
+                        continue
+                    print(f"  [crawl] Worker {shard.slot} exited ({code}); giving up on {len(shard.remaining)} URLs")
+                    for url in list(shard.remaining):
+                        yield FetchResult(url, via=VIA_BROWSER, failure=ERROR, detail=f"worker exited ({code})")
+    finally:
+        for shard in shards:
+            shard.stop()
+
+
+def _log_progress(done: int, total: int, succeeded: int) -> None:
+    """Print crawl progress every 10% (and at the end)."""
+    step = max(1, total // 10)
+    if done % step == 0 or done == total:
+        print(f"  [crawl] {done}/{total} done ({succeeded} succeeded)")
+
+
+async def iter_fetch(
+    urls: list[str], concurrency: int = 10, timeout: float = 10
+) -> AsyncIterator[tuple[str, FetchResult]]:
+    """Yield (url, FetchResult) pairs as each crawl completes.
+
+    Each distinct site is fetched once and yielded for every original spelling;
+    cache hits come first. Misses run with `concurrency` pages in flight, limited
+    per domain, after the pre-flight probe and the HTTP fast path. `timeout` is
+    used until observed latencies give a better one.
+    """
+    groups = group_urls(urls)
+    saved = len(urls) - len(groups)
+    if saved:
+        print(f"  [crawl] Dedup: {len(urls)} URLs -> {len(groups)} unique sites ({saved} fetches saved)")
+
+    cached, misses = _lookup_cached(list(groups))
+    if cached:
+        print(f"  [crawl] Cache: {len(cached)} served from cache, {len(misses)} to crawl ({get_mode()} mode)")
+    for fetch_url, result in cached.items():
+        for url in groups[fetch_url]:
+            yield url, result
+    ruled_out, misses = await _preflight(misses)
+    for fetch_url, result in ruled_out.items():
+        for url in groups[fetch_url]:
+            yield url, result
+    if not misses:
+        return
+
+    if WORKERS > 1 and len(misses) > 1:
+        pages = _iter_sharded_and_store(misses, WORKERS, concurrency, timeout)
+    else:
+        throttle = KeyedThrottle(PER_DOMAIN_CONCURRENCY, PER_DOMAIN_DELAY)
+
+        async def crawl(url: str) -> FetchResult:
+            async with throttle.slot(registrable_domain(url)):
+                return await _crawl_and_store(url, timeout)
+
+        pages = sliding_window(interleave_by_domain(misses), crawl, concurrency)
+
+    done = 0
+    outcomes: Counter = Counter()
+    async for result in pages:
+        done += 1
+        outcomes[result.via if result.ok else result.failure] += 1
+        outcomes["retried"] += result.attempts > 1
+        outcomes["hedged"] += result.hedged
+        _log_progress(done, len(misses), done - sum(outcomes[kind] for kind in FAILURES))
+        for url in groups[result.url]:
+            yield url, result
+    print(f"  [crawl] {format_paths(outcomes)}")
+
+
+async def iter_crawl(
+    urls: list[str], concurrency: int = 10, timeout: float = 10
+) -> AsyncIterator[tuple[str, str | None]]:
+    """Yield (url, text) pairs as each crawl completes; see iter_fetch."""
+    async for url, result in iter_fetch(urls, concurrency, timeout):
+        yield url, result.text
+
+
+def format_paths(outcomes: Counter) -> str:
+    """One-line summary of which path served the crawled pages, and why others failed."""
+    fetched = outcomes[VIA_HTTP] + outcomes[VIA_BROWSER]
+    ratio = f", fast-path hit ratio {outcomes[VIA_HTTP] / fetched:.0%}" if fetched else ""
+    served = ", ".join(f"{via} {outcomes[via]}" for via in (VIA_HTTP, VIA_BROWSER, VIA_RENDERER) if outcomes[via])
+    line = f"Served by: {served or 'nothing'}{ratio}"
+    failed = ", ".join(f"{kind} {outcomes[kind]}" for kind in FAILURES if outcomes[kind])
+    if failed:
+        line += f"; failed: {failed}"
+    if outcomes["retried"] or outcomes["hedged"]:
+        line += f"; {outcomes['retried']} retried, {outcomes['hedged']} hedged"
+    return line
+
+
+async def _crawl_urls(urls: list[str], concurrency: int, timeout: int) -> dict[str, str | None]:
+    """Crawl multiple URLs with a sliding window, return {url: text}."""
+    return {url: text async for url, text in iter_crawl(urls, concurrency, timeout)}
 
 
 def crawl_url(url: str, timeout: int = 10) -> str | None:
-    """Crawl a single URL, return markdown text or None on failure."""
+    """Crawl a single URL, return markdown text or None on failure.
+
+    Served from the crawl cache when possible (see utils.crawl_cache).
+    """
+    cached, misses = _lookup_cached([url])
+    if not misses:
+        return cached[url].text
     return asyncio.run(_crawl_url(url, timeout))
 
 
-def crawl_urls(urls: list[str], batch_size: int = 10, timeout: int = 10) -> dict[str, str | None]:
-    """Crawl multiple URLs concurrently in batches, return {url: text}."""
+def crawl_urls(
+    urls: list[str], concurrency: int = 10, timeout: int = 10, batch_size: int | None = None
+) -> dict[str, str | None]:
+    """Crawl multiple URLs concurrently, return {url: text}.
+
+    `concurrency` pages are kept in flight at all times; `batch_size` is the
+    old name for the same setting. URLs already in the crawl cache are served
+    without touching a browser; the rest share the process's warm pool.
+    """
     if not urls:
         return {}
-    return asyncio.run(_crawl_urls(urls, batch_size, timeout))
+    if batch_size is not None:
+        concurrency = batch_size
+    return asyncio.run(_crawl_urls(urls, concurrency, timeout))
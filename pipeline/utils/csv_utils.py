@@ -1,9 +1,181 @@
-"""Shared CSV utilities using pandas."""
+"""Shared table utilities using pandas.
 
+Step hand-offs are typed Parquet by default (PIPELINE_FORMAT=csv for plain
+CSV); steps keep using the .csv names and column types come from SCHEMAS.
+"""
+
+import os
 from pathlib import Path
 
 import pandas as pd
 
+FORMAT = os.getenv("PIPELINE_FORMAT", "parquet").lower()
+CSV_EXPORT = os.getenv("PIPELINE_CSV_EXPORT", "0").lower() in ("1", "true", "yes", "on")
+COMPRESSION = os.getenv("PIPELINE_PARQUET_COMPRESSION", "zstd")
+
+_TRUE = ["TRUE", "YES", "1", "1.0", "T", "Y"]
+
+# Column dtypes added by each step (pandas nullable dtypes)
+_STEP_COLUMNS: dict[str, dict[str, str]] = {
+    "step2": {
+        "name": "string",
+        "full_address": "string",
+        "city": "category",
+        "state": "category",
+        "zip": "string",
+        "phone": "string",
+        "website": "string",
+        "rating": "Float64",
+        "reviews_count": "Int64",
+        "google_maps_url": "string",
+        "place_id": "string",
+        "latitude": "Float64",
+        "longitude": "Float64",
+        "business_status": "category",
+        "slug": "string",
+    },
+    "step3": {
+        "classification": "category",
+        "verification_confidence": "Int64",
+        "evidence": "string",
+    },
+    "step4": {
+        **{
+            f"svc_{svc}": "boolean"
+            for svc in (
+                "full_groom", "bath_only", "nail_trim", "deshedding", "teeth_brushing", "ear_cleaning",
+                "flea_treatment", "puppy_groom", "senior_groom", "dematting", "breed_cuts",
+            )
+        },
+        "pet_types": "string",
+        "breed_sizes": "string",
+        "price_range_low": "Float64",
+        "price_range_high": "Float64",
+    },
+    "step5": {
+        "image_url": "string",
+        "image_description": "string",
+    },
+    "step6": {
+        "is_licensed": "boolean",
+        "is_insured": "boolean",
+        "fear_free_certified": "boolean",
+        "years_experience": "Int64",
+        "uses_natural_products": "boolean",
+        "cage_free": "boolean",
+        "one_on_one_attention": "boolean",
+        "online_booking": "boolean",
+    },
+    "step7": {
+        "primary_city": "string",
+        "service_cities": "string",
+        "service_radius_miles": "Int64",
+    },
+}
+
+# SCHEMAS[step]: every column declared by that step and the steps before it
+SCHEMAS: dict[str, dict[str, str]] = {}
+_cumulative: dict[str, str] = {}
+for _step, _columns in _STEP_COLUMNS.items():
+    _cumulative = {**_cumulative, **_columns}
+    SCHEMAS[_step] = _cumulative
+COLUMN_TYPES = _cumulative
+
+
+def _parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _use_parquet() -> bool:
+    if FORMAT != "parquet":
+        return False
+    if not _parquet_available():
+        print("  [table] pyarrow not installed; falling back to CSV hand-offs")
+        return False
+    return True
+
+
+def _coerce(series: pd.Series, dtype: str) -> pd.Series:
+    """Convert one column to dtype, parsing text where needed."""
+    if str(series.dtype) == dtype:
+        return series
+    if dtype == "boolean":
+        if pd.api.types.is_bool_dtype(series):
+            return series.astype("boolean")
+        text = series.astype("string").str.strip().str.upper()
+        return text.isin(_TRUE).astype("boolean").mask(series.isna())
+    if dtype in ("Int64", "Float64"):
+        numeric = pd.to_numeric(series, errors="coerce")
+        if dtype == "Int64":
+            numeric = numeric.round()
+        return numeric.astype(dtype)
+    if dtype == "category" and series.dtype == object:
+        series = series.astype("string")
+    return series.astype(dtype)
+
+
+def apply_schema(df: pd.DataFrame, schema: str | dict[str, str] | None = None) -> pd.DataFrame:
+    """Coerce the declared columns of df (all known columns if schema is None)."""
+    types = SCHEMAS[schema] if isinstance(schema, str) else (schema or COLUMN_TYPES)
+    for col, dtype in types.items():
+        if col in df.columns:
+            df[col] = _coerce(df[col], dtype)
+    return df
+
+
+def table_path(path: str | Path) -> Path | None:
+    """Return the existing file behind a logical step path (newest of .parquet/.csv)."""
+    path = Path(path)
+    candidates = [p for p in (path.with_suffix(".parquet"), path.with_suffix(".csv")) if p.exists()]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda p: p.stat().st_mtime)
+
+
+def read_table(path: str | Path, columns: list[str] | None = None) -> pd.DataFrame:
+    """Read a step hand-off file, optionally loading only `columns` (those present)."""
+    source = table_path(path)
+    if source is None:
+        raise FileNotFoundError(f"No table found for {path} (.parquet or .csv)")
+    if source.suffix == ".parquet":
+        if columns is not None:
+            import pyarrow.parquet as pq
+
+            available = set(pq.read_schema(source).names)
+            columns = [c for c in columns if c in available]
+        return pd.read_parquet(source, columns=columns)
+
+    text_types = {c: t for c, t in COLUMN_TYPES.items() if t in ("string", "category")}
+    usecols = (lambda c: c in set(columns)) if columns is not None else None
+    df = pd.read_csv(source, dtype=text_types, usecols=usecols)
+    return apply_schema(df)
+
+
+def write_table(df: pd.DataFrame, path: str | Path, schema: str | None = None) -> Path:
+    """Write a step hand-off file with its declared schema; return the file written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = apply_schema(df.copy(), schema)
+    if not _use_parquet():
+        target = path.with_suffix(".csv")
+        df.to_csv(target, index=False)
+        return target
+
+    # Undeclared columns (extra Outscraper fields) may mix types; store them as text
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].astype("string")
+    if CSV_EXPORT:
+        # Written first so the Parquet file stays the newest (see table_path)
+        df.to_csv(path.with_suffix(".csv"), index=False)
+    target = path.with_suffix(".parquet")
+    df.to_parquet(target, index=False, compression=COMPRESSION)
+    return target
+
 
 def read_csv(path: str) -> pd.DataFrame:
     """Read a single CSV file into a DataFrame."""
@@ -22,6 +194,8 @@ def read_all_csvs(directory: str) -> pd.DataFrame:
     csv_files = sorted(csv_dir.glob("*.csv"))
     if not csv_files:
         raise FileNotFoundError(f"No CSV files found in {directory}")
-    frames = [pd.read_csv(f) for f in csv_files]
+    # Keep text columns such as zip as text (no "02101" -> 2101)
+    text_types = {c: "string" for c, t in COLUMN_TYPES.items() if t in ("string", "category")}
+    frames = [pd.read_csv(f, dtype=text_types) for f in csv_files]
     print(f"  Read {len(frames)} CSV files from {directory}")
     return pd.concat(frames, ignore_index=True)
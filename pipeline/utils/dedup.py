@@ -0,0 +1,332 @@
+"""Blocking-indexed fuzzy duplicate detection for step 2.
+
+Only rows sharing a blocking key (phone, website, geohash, name prefix or
+place id) are compared; matches are merged with union-find and each cluster
+keeps the listing with the most reviews.
+"""
+
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+from utils.urls import canonical_key, registrable_domain
+
+MAX_BLOCK = 200  # larger blocks (a franchise call centre, a mall) are skipped, not compared pairwise
+NAME_MATCH = 0.88  # name similarity at which two listings can be the same business
+NEAR_METERS = 150.0  # pins this close count as the same place
+# Pins further apart than this are different businesses, whatever the name
+FAR_METERS = 2000.0
+# A phone or site on more listings than this is a franchise (call centre, brand
+# site), not one business, and is not used as evidence
+SHARED_KEY = 5
+GEOHASH_PRECISION = 7  # ~150m x 150m cells
+
+# Columns the survivor rule counts, and fills from other cluster members
+FILL_COLUMNS = ["phone", "website", "full_address", "zip", "rating", "reviews_count", "latitude", "longitude"]
+
+LEGAL_SUFFIXES = {"llc", "inc", "co", "corp", "corporation", "ltd", "pllc", "lc", "company"}
+# Words too common in this niche to tell two businesses apart
+GENERIC_TOKENS = {
+    "the", "and", "of", "by", "on", "a", "at", "in", "n", "to", "for", "your", "my",
+    "mobile", "grooming", "groomer", "groomers", "groom", "pet", "pets", "dog", "dogs", "doggy", "doggie",
+    "spa", "salon", "services", "service", "styling", "stylist", "boutique", "van", "wash", "llc",
+}
+# Hosts where the domain is shared by unrelated businesses; the page path identifies them
+PLATFORM_DOMAINS = {
+    "facebook.com", "instagram.com", "yelp.com", "google.com", "linktr.ee", "booksy.com", "vagaro.com",
+    "square.site", "squareup.com", "wixsite.com", "business.site", "godaddysites.com", "myshopify.com",
+    "weebly.com", "wordpress.com", "nextdoor.com", "moego.pet", "petbooking.com", "tiktok.com",
+}
+CITY_ABBREVIATIONS = {"st": "saint", "ste": "sainte", "ft": "fort", "mt": "mount", "pt": "port"}
+
+
+@dataclass
+class DedupResult:
+    """Survivors, the cluster listing for review, and run statistics."""
+
+    df: pd.DataFrame
+    clusters: pd.DataFrame
+    stats: Counter = field(default_factory=Counter)
+
+    def summary(self) -> str:
+        s = self.stats
+        reasons = ", ".join(f"{k.removeprefix('match_')} {v}" for k, v in sorted(s.items()) if k.startswith("match_"))
+        return (
+            f"{s['clusters']} clusters, {s['removed']} rows merged "
+            f"({s['blocks']} blocks, {s['pairs']} pairs scored, {s['oversized']} oversized blocks skipped, "
+            f"{s['seconds']:.2f}s){' — ' + reasons if reasons else ''}"
+        )
+
+
+def _tokens(name: str) -> list[str]:
+    text = name.lower().replace("&", " and ").replace("'", "").replace("’", "")
+    return [t for t in re.split(r"[^a-z0-9]+", text) if t and t not in LEGAL_SUFFIXES]
+
+
+def normalize_name(name: str) -> str:
+    """Distinctive tokens of a business name (all tokens if every one is generic)."""
+    tokens = _tokens(name)
+    distinctive = [t for t in tokens if t not in GENERIC_TOKENS]
+    return " ".join(distinctive or tokens)
+
+
+def normalize_city(city: str) -> str:
+    """Lowercase, abbreviation-expanded city with punctuation and spaces removed."""
+    tokens = re.split(r"[^a-z0-9]+", city.lower())
+    return "".join(CITY_ABBREVIATIONS.get(t, t) for t in tokens if t)
+
+
+def normalize_phones(phones: pd.Series) -> pd.Series:
+    """Last 10 digits of each phone number (NA when fewer than 10)."""
+    digits = phones.astype("string").str.replace(r"\D", "", regex=True).str[-10:]
+    return digits.where(digits.str.len() == 10)
+
+
+def site_key(url: str) -> str | None:
+    """Blocking key for a website: its domain, or the page itself on shared platforms."""
+    if not url or not url.strip():
+        return None
+    domain = registrable_domain(url)
+    if not domain:
+        return None
+    if domain not in PLATFORM_DOMAINS:
+        return domain
+    page = canonical_key(url)
+    host = page.split("/")[0]
+    if host != domain:
+        return host  # pawsonwheels.wixsite.com
+    # facebook.com/pawsonwheels; a bare platform homepage says nothing about the business
+    return page if "/" in page else None
+
+
+def geohash_cells(lat: np.ndarray, lng: np.ndarray, precision: int = GEOHASH_PRECISION) -> np.ndarray:
+    """Integer geohash of each coordinate pair (-1 where missing).
+
+    Same bit interleaving as the base32 geohash string, kept as an int.
+    """
+    bits = 5 * precision
+    lng_bits, lat_bits = (bits + 1) // 2, bits // 2
+    valid = ~(np.isnan(lat) | np.isnan(lng))
+    qlng = np.clip(((np.nan_to_num(lng) + 180.0) / 360.0 * (1 << lng_bits)).astype(np.int64), 0, (1 << lng_bits) - 1)
+    qlat = np.clip(((np.nan_to_num(lat) + 90.0) / 180.0 * (1 << lat_bits)).astype(np.int64), 0, (1 << lat_bits) - 1)
+    code = np.zeros(len(lat), dtype=np.int64)
+    for bit in range(bits):
+        if bit % 2 == 0:
+            value = (qlng >> (lng_bits - 1 - bit // 2)) & 1
+        else:
+            value = (qlat >> (lat_bits - 1 - bit // 2)) & 1
+        code = (code << 1) | value
+    return np.where(valid, code, -1)
+
+
+def _meters(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Haversine distance in meters."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    a = math.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(math.radians(lng2 - lng1) / 2) ** 2
+    return 12_742_000 * math.asin(math.sqrt(a))
+
+
+def name_similarity(a: str, b: str) -> float:
+    """Similarity of two normalized names: token overlap or character ratio, whichever is higher."""
+    if a == b:
+        return 1.0
+    ta, tb = set(a.split()), set(b.split())
+    overlap = len(ta & tb) / len(ta | tb) if ta and tb else 0.0
+    if overlap >= NAME_MATCH:
+        return overlap
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    if matcher.real_quick_ratio() <= overlap or matcher.quick_ratio() <= overlap:
+        return overlap
+    return max(overlap, matcher.ratio())
+
+
+def _column(df: pd.DataFrame, col: str) -> pd.Series:
+    if col in df.columns:
+        return df[col].astype("string")
+    return pd.Series(pd.NA, index=df.index, dtype="string")
+
+
+def _numeric(df: pd.DataFrame, col: str) -> np.ndarray:
+    if col in df.columns:
+        return pd.to_numeric(df[col], errors="coerce").astype("float64").to_numpy(na_value=np.nan)
+    return np.full(len(df), np.nan)
+
+
+def _unshared(keys: pd.Series, stats: Counter, kind: str) -> pd.Series:
+    """Blank out keys carried by more than SHARED_KEY rows."""
+    shared = (keys.map(keys.value_counts()) > SHARED_KEY).fillna(False).astype(bool)
+    stats[f"shared_{kind}_rows"] = int(shared.sum())
+    return keys.mask(shared)
+
+
+def _values(series: pd.Series) -> list:
+    """Column as a plain list with None for missing values."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def _blocks(keys: pd.Series, stats: Counter):
+    """Yield arrays of row positions that share a blocking key (2..MAX_BLOCK rows)."""
+    codes, _ = pd.factorize(keys)
+    positions = np.asarray(keys.index)
+    order = np.argsort(codes, kind="stable")
+    codes, positions = codes[order], positions[order]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    sizes = np.diff(np.r_[starts, len(codes)])
+    stats["oversized"] += int((sizes > MAX_BLOCK).sum())
+    for start, size in zip(starts[sizes >= 2], sizes[sizes >= 2]):
+        if size <= MAX_BLOCK:
+            stats["blocks"] += 1
+            yield positions[start:start + size]
+
+
+def fuzzy_dedup(df: pd.DataFrame) -> DedupResult:
+    """Cluster near-duplicate listings and keep one survivor per cluster."""
+    started = time.perf_counter()
+    df = df.reset_index(drop=True)
+    n = len(df)
+    stats: Counter = Counter(rows=n)
+
+    # Per-row features as plain lists (the pair loop is pure Python)
+    names = [normalize_name(s) for s in _column(df, "name").fillna("")]
+    states = _column(df, "state").str.strip().str.upper().fillna("").tolist()
+    city_column = _column(df, "city").fillna("")
+    cities = city_column.map({c: normalize_city(c) for c in city_column.unique()}).tolist()
+    phones = _unshared(normalize_phones(_column(df, "phone")), stats, "phone")
+    sites = _unshared(_column(df, "website").map(site_key, na_action="ignore").astype("string"), stats, "site")
+    place_ids = _column(df, "place_id").str.strip()
+    maps = _column(df, "google_maps_url").map(canonical_key, na_action="ignore").astype("string")
+    places = place_ids.fillna(maps)
+    lat, lng = _numeric(df, "latitude"), _numeric(df, "longitude")
+    cells = geohash_cells(lat, lng)
+
+    phone_list, site_list, place_list = _values(phones), _values(sites), _values(places)
+    has_geo = ~np.isnan(lat) & ~np.isnan(lng)
+
+    # Blocking keys
+    prefixes = pd.Series(
+        [" ".join(t[:4] for t in name.split()[:2]) for name in names], index=df.index, dtype="string"
+    )
+    key_sets = {
+        "place": places,
+        "phone": phones,
+        "site": sites,
+        "geo": pd.Series(cells, index=df.index).where(cells >= 0).astype("Int64").astype("string"),
+        # Name matches need the same city (nearby pins come through the geo block)
+        "name": (pd.Series(states, index=df.index, dtype="string") + "|" + pd.Series(cities, index=df.index)
+                 + "|" + prefixes).where(prefixes.str.len() > 0),
+    }
+
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    reasons: Counter = Counter()
+    pair_reasons: dict[int, set[str]] = {}
+    # Phones and sites seen anywhere in each cluster (by root), so weak name
+    # matches cannot chain two businesses together through a sparse row
+    cluster_phones = {i: {p} for i, p in enumerate(phone_list) if p is not None}
+    cluster_sites = {i: {w} for i, w in enumerate(site_list) if w is not None}
+
+    def conflict(i: int, j: int, ri: int, rj: int) -> bool:
+        """The two clusters carry different phones or sites, or the rows' pins are far apart."""
+        for known in (cluster_phones, cluster_sites):
+            a, b = known.get(ri), known.get(rj)
+            if a and b and a.isdisjoint(b):
+                return True
+        return bool(has_geo[i] and has_geo[j] and _meters(lat[i], lng[i], lat[j], lng[j]) > FAR_METERS)
+
+    def match(i: int, j: int, ri: int, rj: int) -> str | None:
+        """Why rows i and j are the same business (None if they are not)."""
+        if place_list[i] is not None and place_list[i] == place_list[j]:
+            return "place"
+        same_state = states[i] == states[j]
+        if phone_list[i] is not None and phone_list[i] == phone_list[j] and same_state:
+            return "phone"
+        same_city = same_state and cities[i] == cities[j]
+        near = has_geo[i] and has_geo[j] and _meters(lat[i], lng[i], lat[j], lng[j]) <= NEAR_METERS
+        if not (same_city or near):
+            return None
+        similarity = name_similarity(names[i], names[j])
+        if site_list[i] is not None and site_list[i] == site_list[j] and similarity >= 0.5:
+            return "site"
+        if similarity < 0.6 or conflict(i, j, ri, rj):
+            return None
+        if near:
+            return "geo"
+        # "Bella's Grooming" twice in one city is two groomers unless something else agrees
+        if similarity < NAME_MATCH or len(names[i]) < 8:
+            return None
+        return "name"
+
+    def union(ri: int, rj: int, reason: str) -> None:
+        # Deterministic: the lower root survives as the cluster id
+        low, high = min(ri, rj), max(ri, rj)
+        parent[high] = low
+        for known in (cluster_phones, cluster_sites, pair_reasons):
+            if high in known:
+                known.setdefault(low, set()).update(known.pop(high))
+        pair_reasons.setdefault(low, set()).add(reason)
+
+    for kind, keys in key_sets.items():
+        keys = keys.dropna()
+        keys = keys[keys.str.len() > 0]
+        for block in _blocks(keys, stats):
+            block = block.tolist()
+            for a in range(len(block)):
+                i = block[a]
+                for j in block[a + 1:]:
+                    ri, rj = find(i), find(j)
+                    if ri == rj:
+                        continue
+                    stats["pairs"] += 1
+                    reason = match(i, j, ri, rj)
+                    if reason is not None:
+                        reasons[reason] += 1
+                        union(ri, rj, reason)
+
+    roots = np.array([find(i) for i in range(n)])
+    stats.update({f"match_{k}": v for k, v in reasons.items()})
+
+    sizes = np.bincount(roots, minlength=n)
+    in_cluster = sizes[roots] > 1
+    if not in_cluster.any():
+        stats["seconds"] = time.perf_counter() - started
+        return DedupResult(df, pd.DataFrame(columns=["cluster", "survivor", "reason"]), stats)
+
+    # Survivor rule: most reviews, then most filled-in fields, then input order
+    fill_columns = [c for c in FILL_COLUMNS if c in df.columns]
+    members = df[in_cluster].copy()
+    members["cluster"] = roots[in_cluster]
+    members["_reviews"] = np.nan_to_num(_numeric(members, "reviews_count"), nan=-1.0)
+    members["_filled"] = members[fill_columns].notna().sum(axis=1)
+    members["_order"] = members.index
+    members = members.sort_values(["cluster", "_reviews", "_filled", "_order"], ascending=[True, False, False, True])
+    survivors = members.groupby("cluster", sort=False)["_order"].first()
+
+    # Fill the survivor's gaps from the other members, best-ranked first
+    filled = members.groupby("cluster", sort=False)[fill_columns].first()
+    for col in fill_columns:
+        df.loc[survivors.to_numpy(), col] = filled.loc[survivors.index, col].to_numpy()
+
+    drop = members["_order"][~members["_order"].isin(survivors)]
+    clusters = members.drop(columns=["_reviews", "_filled", "_order", "cluster"])
+    clusters.insert(0, "cluster", members["cluster"])
+    clusters.insert(1, "survivor", clusters.index.isin(survivors.to_numpy()))
+    clusters.insert(2, "reason", clusters["cluster"].map(lambda c: "+".join(sorted(pair_reasons.get(c, ())))))
+
+    stats["clusters"] = len(survivors)
+    stats["removed"] = len(drop)
+    stats["largest"] = int(sizes.max())
+    stats["seconds"] = time.perf_counter() - started
+    kept = df.drop(index=drop.to_numpy()).reset_index(drop=True)
+    return DedupResult(kept, clusters.reset_index(drop=True), stats)
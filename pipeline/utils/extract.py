@@ -0,0 +1,304 @@
+"""Deterministic pre-extraction of services, prices and features.
+
+Each field has strong patterns (YES) and hint patterns; a field with neither
+is NO, and hint-only or negated matches are left for the LLM, which is then
+asked only about the unsettled fields.
+"""
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+
+# Fields at or above this confidence are taken from the matcher, not the LLM
+CONFIDENT = 0.85
+
+# field -> (strong patterns, hint patterns); regex fragments over lowercased text
+SERVICE_PATTERNS: dict[str, tuple[list[str], list[str]]] = {
+    "svc_full_groom": (
+        [r"full[- ]?(?:service )?groom", r"full[- ]service", r"complete groom", r"bath,? (?:and|&) (?:hair)?cut",
+         r"haircuts?\b"],
+        [r"groom(?:ing)? package", r"\bcuts?\b"],
+    ),
+    "svc_bath_only": (
+        [r"bath[- ]only", r"bath (?:and|&) brush", r"bath (?:and|&) tidy", r"just a bath", r"\bbath package"],
+        [r"\bbath"],
+    ),
+    "svc_nail_trim": (
+        [r"nail (?:trim|clip|grind|cut|filing|care)", r"nails? (?:trimmed|clipped|ground|buffed)", r"pawdicure",
+         r"nail grinding"],
+        [r"\bnails?\b"],
+    ),
+    "svc_deshedding": ([r"de-?shed", r"shed(?:ding)? (?:treatment|control|reduction)", r"furminat"], [r"\bshed"]),
+    "svc_teeth_brushing": (
+        [r"teeth (?:brush|clean)", r"tooth ?brush", r"dental (?:care|clean|hygiene)", r"brushing (?:of )?teeth"],
+        [r"\bteeth\b", r"\bdental\b", r"breath"],
+    ),
+    "svc_ear_cleaning": ([r"ear (?:clean|clear|care)", r"ears? (?:cleaned|plucked)", r"ear plucking"], [r"\bears?\b"]),
+    "svc_flea_treatment": (
+        [r"flea (?:and|&|/) ?tick (?:bath|treatment|shampoo|dip)", r"flea (?:bath|treatment|shampoo|dip)",
+         r"tick (?:treatment|removal)"],
+        [r"\bflea", r"\btick"],
+    ),
+    "svc_puppy_groom": (
+        [r"pupp(?:y|ies)(?:'s)? (?:first |intro(?:ductory)? )?(?:groom(?!er)|bath|package|special)",
+         r"first groom", r"puppy intro"],
+        [r"\bpupp(?:y|ies)"],
+    ),
+    "svc_senior_groom": (
+        [r"senior (?:dog|pet|cat)s?(?: groom)?", r"(?:older|elderly|geriatric) (?:dog|pet|cat)s?", r"senior groom(?!er)"],
+        [r"\bsenior", r"\belderly", r"\bgeriatric"],
+    ),
+    "svc_dematting": ([r"de-?matt", r"mat(?:ted)? removal", r"detangl", r"matted (?:coat|fur|hair)"], [r"\bmat(?:s|ted|ting)\b"]),
+    "svc_breed_cuts": (
+        [r"breed[- ]specific", r"breed (?:standard )?(?:cuts?|trims?|styles?)", r"hand[- ]strip", r"scissor (?:cut|finish)",
+         r"teddy bear cut", r"lion cut", r"puppy cut"],
+        [r"\bbreed"],
+    ),
+}
+
+FEATURE_PATTERNS: dict[str, tuple[list[str], list[str]]] = {
+    "is_licensed": ([r"\blicensed\b", r"\bstate licen[cs]e"], [r"licen[cs]"]),
+    "is_insured": ([r"\binsured\b", r"bonded (?:and|&) insured", r"fully insured"], [r"\binsur"]),
+    "fear_free_certified": ([r"fear[- ]free (?:certified|certification|professional|groomer)"], [r"fear[- ]free", r"low[- ]stress"]),
+    "uses_natural_products": (
+        [r"all[- ]natural", r"\borganic\b", r"natural (?:products|shampoos?|ingredients)", r"hypo-?allergenic shampoo",
+         r"plant[- ]based"],
+        [r"\bnatural\b", r"shampoo"],
+    ),
+    "cage_free": ([r"cage[- ]?free", r"no cages", r"never (?:caged|crated|kenneled)", r"kennel[- ]free", r"crate[- ]free"],
+                  [r"\bcages?\b", r"\bcrates?\b", r"\bkennel"]),
+    "one_on_one_attention": (
+        [r"one[- ]on[- ]one", r"1[- ]on[- ]1", r"individual(?:ized)? attention", r"undivided attention", r"one pet at a time"],
+        [r"individual", r"personal attention"],
+    ),
+    "online_booking": (
+        [r"book (?:an appointment )?online", r"online (?:booking|scheduling|appointment)", r"schedule (?:an appointment )?online",
+         r"book (?:your )?appointment online", r"booking portal", r"moego|gingr|petexec|time to pet|daysmart|square appointments"],
+        [r"\bbook(?:ing)?\b", r"\bschedul"],
+    ),
+}
+
+_PRICE = r"\$\s?(\d{1,4})(?:\.\d{2})?"
+_YEARS = r"(\d{1,2})\+?\s*(?:years?|yrs?)(?:\s+of)?\s+(?:professional\s+|grooming\s+|hands-on\s+)?(?:experience|grooming|in (?:the )?business)"
+_SIZE = r"\b(small|medium|large|x-?large|extra[- ]large|giant|xl)\s*(?:-?\s*sized?)?\s*(?:dogs?|breeds?|pups?|pets?)"
+_PETS = r"\b(dogs?|canines?|cats?|felines?|kittens?|rabbits?|bunn(?:y|ies)|guinea pigs?)\b"
+_ALL_SIZES = r"all (?:sizes|breeds)|any size|every size"
+
+_SIZE_WORDS = r"\bsizes?\b|\blbs?\b|\bpounds\b"
+
+# Context checks around a match, over the lowercased page
+_NEGATION = re.compile(
+    r"\b(?:not|no|never|without|don'?t|doesn'?t|isn'?t|aren'?t|can'?t|cannot|won'?t|unable to)\b"
+    r"(?:[^\w.!?;\n]+\w+){0,3}[^\w.!?;\n]*$"  # up to three words on, never past a sentence or line end
+)
+_PRICE_CONTEXT = re.compile(
+    r"\b(?:pric(?:e|es|ing)|rates?|charge[sd]?|costs?|starting at|starts at|from \$|groom\w*|bath(?:s|ing)?|"
+    r"trim(?:s|med|ming)?|nails?|(?:hair)?cuts?|(?:de-?)?shed(?:ding)?|mat(?:s|ted|ting)?|de-?matt\w*|"
+    r"brush(?:es|ing)?|teeth|ears?|fleas?|packages?|add-?ons?|small|medium|large|per (?:dog|cat|pet|visit))\b"
+)
+_PROMO = re.compile(r"\boff\b|coupon|gift ?cards?|certificate|deposit|discount|\bsave\b|credit|cancel|no[- ]show|fee")
+_SERVICE_CONTEXT = re.compile(r"groom|bath|trim|nail|haircut|\bspa\b|wash|clip|brush|de-?shed|\bcuts?\b")
+CONTEXT_CHARS = 60  # how far around a price or pet word to look for context
+_SENTENCE_END = re.compile(r"[.!?](?=\s|$)|\n\s*\n")
+
+_SIZE_CANONICAL = {"small": "small", "medium": "medium", "large": "large", "giant": "xl", "xl": "xl"}
+_PET_CANONICAL = {"dog": "dogs", "canine": "dogs", "cat": "cats", "feline": "cats", "kitten": "cats"}
+
+_stats: dict[str, Counter] = {}
+
+
+@dataclass
+class PageExtraction:
+    """Values and per-field confidence (0-1) from one page."""
+
+    values: dict = field(default_factory=dict)
+    confidence: dict = field(default_factory=dict)
+
+    def settled(self, threshold: float = CONFIDENT) -> set[str]:
+        """Fields whose confidence reaches threshold."""
+        return {name for name, conf in self.confidence.items() if conf >= threshold}
+
+    def is_complete(self, threshold: float = CONFIDENT) -> bool:
+        """True if every field is settled, so the page needs no LLM call."""
+        return len(self.settled(threshold)) == len(self.confidence)
+
+    def merge(self, parsed: dict | None, threshold: float = CONFIDENT) -> dict:
+        """Combine with a parsed LLM response: settled fields keep the matcher's value.
+
+        With no LLM response (skipped or failed), only settled fields are returned.
+        """
+        settled = self.settled(threshold)
+        if parsed is None:
+            return {name: value for name, value in self.values.items() if name in settled}
+        return {name: self.values[name] if name in settled else value for name, value in parsed.items()}
+
+
+class PatternMatcher:
+    """Many named patterns compiled into a single regex, matched in one pass."""
+
+    def __init__(self, patterns: dict[str, tuple[list[str], list[str]]], extra: dict[str, str] | None = None) -> None:
+        self.fields = list(patterns)
+        groups: list[str] = []
+        self._group_info: dict[str, tuple[str, str]] = {}
+        # Strong patterns first so they win over hints at the same position
+        for kind, position in (("strong", 0), ("hint", 1)):
+            for name, pair in patterns.items():
+                for pattern in pair[position]:
+                    group = f"g{len(groups)}"
+                    self._group_info[group] = (name, kind)
+                    groups.append(f"(?:{pattern})(?P<{group}>)")
+        for name, pattern in (extra or {}).items():
+            group = f"g{len(groups)}"
+            self._group_info[group] = (name, "extra")
+            groups.append(f"(?:{pattern})(?P<{group}>)")
+        # The empty marker group goes *after* each pattern so branches still start
+        # with a literal, which lets sre reject most of them on the first character.
+        # Matching only at word starts skips ~80% of positions.
+        self._regex = re.compile(r"(?<!\w)(?=[\w$])(?:" + "|".join(groups) + ")")
+
+    def scan(self, text: str) -> tuple[dict[str, set[str]], dict[str, list[tuple[int, str]]]]:
+        """Scan lowercased text; return ({field: {"strong", "hint"}}, {extra_name: [(start, matched string)]}).
+
+        A strong match right after a negation is reported as a hint.
+        """
+        kinds: dict[str, set[str]] = {name: set() for name in self.fields}
+        extras: dict[str, list[tuple[int, str]]] = {}
+        for match in self._regex.finditer(text):
+            name, kind = self._group_info[match.lastgroup]
+            if kind == "extra":
+                extras.setdefault(name, []).append((match.start(), match.group(0)))
+                continue
+            if kind == "strong" and _NEGATION.search(text, max(0, match.start() - 40), match.start()):
+                kind = "hint"
+            kinds[name].add(kind)
+        return kinds, extras
+
+
+def matcher_version() -> str:
+    """Fingerprint of the patterns and threshold, for checkpoint keys."""
+    return repr((SERVICE_PATTERNS, FEATURE_PATTERNS, _PRICE, _YEARS, _SIZE, _PETS, CONFIDENT,
+                 _NEGATION.pattern, _PRICE_CONTEXT.pattern, _PROMO.pattern, _SERVICE_CONTEXT.pattern))
+
+
+def _record(kind: str, result: PageExtraction) -> PageExtraction:
+    stats = _stats.setdefault(kind, Counter())
+    stats["pages"] += 1
+    stats["complete"] += result.is_complete()
+    stats["fields"] += len(result.confidence)
+    stats["settled"] += len(result.settled())
+    return result
+
+
+def format_coverage(kind: str) -> str:
+    """Summarize how much of kind ("services" / "features") the matcher settled."""
+    stats = _stats.get(kind)
+    if not stats or not stats["pages"]:
+        return f"[extract] {kind}: no pages"
+    return (
+        f"[extract] {kind}: {stats['complete']}/{stats['pages']} pages settled without the LLM "
+        f"({stats['complete'] / stats['pages'] * 100:.0f}%), "
+        f"{stats['settled']:,}/{stats['fields']:,} fields ({stats['settled'] / stats['fields'] * 100:.0f}%)"
+    )
+
+
+def _near(text: str, start: int, pattern: re.Pattern, chars: int = CONTEXT_CHARS) -> bool:
+    """True if pattern occurs within chars of position start, in the same sentence."""
+    lo, hi = max(0, start - chars), start + chars
+    for end in _SENTENCE_END.finditer(text, lo, start):
+        lo = end.end()
+    end = _SENTENCE_END.search(text, start, hi)
+    return pattern.search(text, lo, end.start() if end else hi) is not None
+
+
+def _booleans(kinds: dict[str, set[str]], result: PageExtraction) -> None:
+    for name, seen in kinds.items():
+        if "strong" in seen:
+            result.values[name], result.confidence[name] = True, 0.95
+        elif "hint" in seen:
+            result.values[name], result.confidence[name] = False, 0.4
+        else:
+            result.values[name], result.confidence[name] = False, 0.9
+
+
+_service_matcher = PatternMatcher(
+    SERVICE_PATTERNS,
+    extra={"price": _PRICE, "pricing_words": r"pric(?:e|es|ing)|rates?\b|starting at|starts at",
+           "size": _SIZE, "all_sizes": _ALL_SIZES, "size_words": _SIZE_WORDS, "pet": _PETS},
+)
+_feature_matcher = PatternMatcher(
+    FEATURE_PATTERNS,
+    extra={"years": _YEARS, "experience_words": r"experience|since (?:19|20)\d\d|established|est\. (?:19|20)\d\d"},
+)
+
+
+def match_services(text: str) -> PageExtraction:
+    """Pre-extract the step 4 columns (svc_*, pet_types, breed_sizes, price range)."""
+    text = text.lower()
+    kinds, extras = _service_matcher.scan(text)
+    result = PageExtraction()
+    _booleans(kinds, result)
+
+    prices, doubtful, promos = [], 0, 0
+    # "$50 off", "$25 gift card", "$20 deposit" are not service prices and are skipped
+    for start, match in extras.get("price", []):
+        amount = int(re.match(_PRICE, match).group(1))
+        if not 10 <= amount <= 1000:
+            continue
+        if _PROMO.search(text, max(0, start - 30), start + len(match) + 15):
+            promos += 1
+            continue
+        if _near(text, start, _PRICE_CONTEXT):
+            prices.append(amount)
+        else:
+            doubtful += 1  # an amount with nothing around it to say what it is for
+    prices.sort()
+    if prices:
+        low, high = float(prices[0]), float(prices[-1])
+        conf = 0.4 if doubtful else 0.9
+    else:
+        low = high = None
+        conf = 0.4 if doubtful or promos or extras.get("pricing_words") else 0.9
+    result.values["price_range_low"], result.confidence["price_range_low"] = low, conf
+    result.values["price_range_high"], result.confidence["price_range_high"] = high, conf
+
+    pets = ["dogs"] if any("dog" in m or "pup" in m for _, m in extras.get("size", [])) else []
+    groomed = set(pets)  # pets named next to a grooming word (or a dog size)
+    for start, match in extras.get("pet", []):
+        key = match.rstrip("s") if not match.startswith("bunn") else "bunny"
+        pet = _PET_CANONICAL.get(key, "other")
+        if pet not in pets:
+            pets.append(pet)
+        if _near(text, start, _SERVICE_CONTEXT):
+            groomed.add(pet)
+    result.values["pet_types"] = ",".join(pets)
+    # A pet only mentioned in passing (a blog post, a footer) is left for the LLM
+    result.confidence["pet_types"] = 0.9 if pets and groomed == set(pets) else 0.4
+
+    if extras.get("all_sizes"):
+        sizes = ["small", "medium", "large", "xl"]
+    else:
+        found = set()
+        for _, match in extras.get("size", []):
+            word = re.match(_SIZE, match).group(1).replace("-", "").replace(" ", "")
+            found.add(_SIZE_CANONICAL.get(word, "xl"))
+        sizes = [s for s in ("small", "medium", "large", "xl") if s in found]
+    result.values["breed_sizes"] = ",".join(sizes)
+    # No sizes named and the topic never comes up: nothing for the LLM to find either
+    result.confidence["breed_sizes"] = 0.9 if sizes or not extras.get("size_words") else 0.4
+    return _record("services", result)
+
+
+def match_features(text: str) -> PageExtraction:
+    """Pre-extract the step 6 columns (boolean features and years_experience)."""
+    kinds, extras = _feature_matcher.scan(text.lower())
+    result = PageExtraction()
+    _booleans(kinds, result)
+
+    years = [int(re.match(_YEARS, y).group(1)) for _, y in extras.get("years", [])]
+    years = [y for y in years if 0 < y <= 60]
+    if years:
+        result.values["years_experience"], result.confidence["years_experience"] = max(years), 0.95
+    else:
+        result.values["years_experience"] = None
+        result.confidence["years_experience"] = 0.4 if extras.get("experience_words") else 0.9
+    return _record("features", result)
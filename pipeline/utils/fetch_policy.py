@@ -0,0 +1,163 @@
+"""Fetch outcomes, failure taxonomy and adaptive timing for the crawler.
+
+Failures are classified (dns, timeout, http_5xx, ...) and transient ones
+retried; LatencyTracker sets timeouts from observed latency and hedges slow
+attempts.
+"""
+
+import os
+import random
+import socket
+import ssl
+from collections import deque
+from dataclasses import asdict, dataclass
+
+LATENCY_WINDOW = 500
+MIN_SAMPLES = 30
+TIMEOUT_FACTOR = float(os.getenv("CRAWL_TIMEOUT_FACTOR", "2.0"))
+TIMEOUT_MIN = float(os.getenv("CRAWL_TIMEOUT_MIN", "4"))
+TIMEOUT_MAX = float(os.getenv("CRAWL_TIMEOUT_MAX", "45"))
+HEDGE_BUDGET = float(os.getenv("CRAWL_HEDGE_BUDGET", "0.1"))
+RETRIES = int(os.getenv("CRAWL_RETRIES", "2"))
+RETRY_BACKOFF = float(os.getenv("CRAWL_RETRY_BACKOFF", "1.0"))
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/124.0 Safari/537.36"
+)
+
+# Failure kinds
+DNS = "dns"
+TLS = "tls"
+TIMEOUT = "timeout"
+CONNECT = "connect"
+HTTP_4XX = "http_4xx"
+HTTP_5XX = "http_5xx"
+EMPTY = "empty"
+ERROR = "error"
+DEAD = "dead"  # pre-flight: domain does not resolve or refuses connections
+PARKED = "parked"  # pre-flight: parked or for-sale domain
+SOCIAL = "social"  # pre-flight: the "website" is a social media page
+FAILURES = (DNS, TLS, TIMEOUT, CONNECT, HTTP_4XX, HTTP_5XX, EMPTY, ERROR, DEAD, PARKED, SOCIAL)
+
+# Worth another attempt: the site may answer next time
+TRANSIENT = {TIMEOUT, CONNECT, HTTP_5XX, ERROR}
+TRANSIENT_STATUSES = {408, 425, 429}
+
+# Browser (Chromium net::ERR_*) and library error text -> failure kind
+_MESSAGE_KINDS = [
+    (DNS, ("err_name_not_resolved", "name or service not known", "nodename nor servname", "getaddrinfo",
+           "name resolution", "no address associated")),
+    (TLS, ("err_cert", "err_ssl", "certificate", "ssl", "tls")),
+    (TIMEOUT, ("timeout", "timed out", "err_timed_out")),
+    (CONNECT, ("err_connection", "connection refused", "connection reset", "err_address_unreachable",
+               "err_empty_response", "network is unreachable", "connection closed", "remote end closed")),
+]
+
+
+@dataclass
+class FetchResult:
+    """The outcome of fetching one URL."""
+
+    url: str
+    text: str | None = None
+    via: str = ""  # path that produced the result: http, browser, cache, preflight
+    failure: str | None = None  # one of FAILURES, None on success
+    status: int | None = None  # HTTP status, when known
+    detail: str = ""  # human-readable cause ("HTTP 503", "app shell", exception text)
+    attempts: int = 1
+    seconds: float = 0.0
+    hedged: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.text is not None
+
+    @property
+    def transient(self) -> bool:
+        return self.failure in TRANSIENT or self.status in TRANSIENT_STATUSES
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def failure_for_status(status: int) -> str:
+    return HTTP_5XX if status >= 500 else HTTP_4XX
+
+
+def classify_message(message: str) -> str:
+    """Map an error message (browser or HTTP library) to a failure kind."""
+    text = message.lower()
+    for kind, markers in _MESSAGE_KINDS:
+        if any(marker in text for marker in markers):
+            return kind
+    return ERROR
+
+
+def classify_exception(exc: BaseException) -> str:
+    """Map an exception raised while fetching to a failure kind."""
+    seen: set[int] = set()
+    current: BaseException | None = exc
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, socket.gaierror):
+            return DNS
+        if isinstance(current, (ssl.SSLError, ssl.CertificateError)):
+            return TLS
+        if isinstance(current, TimeoutError) or "timeout" in type(current).__name__.lower():
+            return TIMEOUT
+        current = current.__cause__ or current.__context__
+    kind = classify_message(f"{type(exc).__name__}: {exc}")
+    if kind == ERROR and any(name in type(exc).__name__ for name in ("Connect", "ReadError", "Protocol")):
+        return CONNECT
+    return kind
+
+
+def backoff(attempt: int) -> float:
+    """Seconds to wait before retry number `attempt` (1-based), with jitter."""
+    return RETRY_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+
+
+class LatencyTracker:
+    """Rolling latency distribution per fetch path, with derived timeouts and hedge delays."""
+
+    def __init__(
+        self, window: int = LATENCY_WINDOW, min_samples: int = MIN_SAMPLES, hedge_budget: float = HEDGE_BUDGET
+    ) -> None:
+        self.window = window
+        self.min_samples = min_samples
+        self.hedge_budget = hedge_budget
+        self._samples: dict[str, deque] = {}
+        self.requests = 0
+        self.hedges = 0
+
+    def record(self, path: str, seconds: float) -> None:
+        self._samples.setdefault(path, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, path: str, q: float) -> float | None:
+        """Return the q-th percentile (0-100) for path, or None until min_samples are in."""
+        samples = self._samples.get(path)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q / 100))]
+
+    def timeout(self, path: str, default: float) -> float:
+        """Per-request timeout: p99 x TIMEOUT_FACTOR once known, else `default`."""
+        p99 = self.percentile(path, 99)
+        if p99 is None:
+            return default
+        return min(TIMEOUT_MAX, max(TIMEOUT_MIN, p99 * TIMEOUT_FACTOR))
+
+    def hedge_after(self, path: str) -> float | None:
+        """Seconds after which to hedge a request on path (its p95), or None to not hedge."""
+        self.requests += 1
+        if self.hedges >= self.hedge_budget * self.requests:
+            return None
+        return self.percentile(path, 95)
+
+    def stats(self) -> dict:
+        return {
+            path: {"n": len(samples), "p50": self.percentile(path, 50), "p95": self.percentile(path, 95),
+                   "p99": self.percentile(path, 99)}
+            for path, samples in self._samples.items()
+        } | {"hedges": self.hedges}
@@ -0,0 +1,153 @@
+"""Fast HTML -> markdown conversion for the crawler's HTTP fast path.
+
+needs_browser() decides whether a fetched page is usable as-is or has to be
+rendered in the browser.
+"""
+
+import os
+import re
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+MIN_TEXT_CHARS = int(os.getenv("CRAWL_FAST_PATH_MIN_CHARS", "200"))
+
+_SKIP = {"script", "style", "noscript", "template", "svg", "head", "iframe", "object", "canvas", "select"}
+_BLOCK = {
+    "p", "div", "section", "article", "header", "footer", "main", "aside", "nav", "ul", "ol", "table",
+    "tr", "form", "blockquote", "figure", "figcaption", "address", "dl", "dt", "dd", "pre", "hr", "br",
+}
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_EMPHASIS = {"strong": "**", "b": "**", "em": "*", "i": "*"}
+_VOID = {"br", "hr", "img", "input", "meta", "link", "source", "wbr", "area", "base", "col", "embed", "track"}
+
+_SPACE = re.compile(r"\s+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_WORD_CHARS = re.compile(r"[A-Za-z]")
+_MARKDOWN_SYNTAX = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+
+# Empty mount points of client-rendered apps (React, Vue, Next, Gatsby, Angular, Nuxt)
+_SPA_SHELL = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|___gatsby|__nuxt|main-app)[\"'][^>]*>\s*</div>|<app-root[^>]*>\s*</app-root>",
+    re.IGNORECASE,
+)
+_NOSCRIPT_WARNING = re.compile(
+    r"<noscript[^>]*>[^<]*(?:<[^/][^>]*>[^<]*)*?(?:enable javascript|javascript (?:is )?(?:required|disabled)|"
+    r"requires javascript|turn on javascript|javascript to run this app)",
+    re.IGNORECASE,
+)
+_CHALLENGE = re.compile(
+    r"<title>\s*(?:just a moment|attention required|access denied)|cf-browser-verification|challenge-platform",
+    re.IGNORECASE,
+)
+
+
+class _MarkdownParser(HTMLParser):
+    """Streaming HTML -> markdown; see html_to_markdown()."""
+
+    def __init__(self, base_url: str | None) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.out: list[str] = []
+        self.skip_depth = 0
+        self.list_depth = 0
+        self.pre_depth = 0
+        self.links: list[tuple[str, int]] = []  # (href, position in out) of open <a> tags
+
+    def _newline(self, count: int = 1) -> None:
+        self.out.append("\n" * count)
+
+    def _url(self, value: str | None) -> str:
+        value = (value or "").strip()
+        return urljoin(self.base_url, value) if self.base_url and value else value
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in _SKIP:
+            if tag not in _VOID:
+                self.skip_depth += 1
+            return
+        if self.skip_depth:
+            return
+        if tag in _HEADINGS:
+            self._newline(2)
+            self.out.append("#" * _HEADINGS[tag] + " ")
+        elif tag in ("ul", "ol"):
+            self.list_depth += 1
+            self._newline()
+        elif tag == "li":
+            self._newline()
+            self.out.append("  " * max(0, self.list_depth - 1) + "- ")
+        elif tag == "pre":
+            self.pre_depth += 1
+            self._newline(2)
+        elif tag in ("td", "th"):
+            self.out.append(" | ")
+        elif tag in _BLOCK:
+            self._newline(2 if tag in ("p", "blockquote", "table") else 1)
+        elif tag in _EMPHASIS:
+            self.out.append(_EMPHASIS[tag])
+        elif tag == "a":
+            self.links.append((dict(attrs).get("href") or "", len(self.out)))
+        elif tag == "img":
+            attributes = dict(attrs)
+            src = attributes.get("src") or attributes.get("data-src")
+            if src and not src.startswith("data:"):
+                alt = _SPACE.sub(" ", attributes.get("alt") or "").strip()
+                self.out.append(f"![{alt}]({self._url(src)})")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth:
+            return
+        if tag in _HEADINGS or tag in ("p", "blockquote", "table"):
+            self._newline(2)
+        elif tag in ("ul", "ol"):
+            self.list_depth = max(0, self.list_depth - 1)
+            self._newline()
+        elif tag == "pre":
+            self.pre_depth = max(0, self.pre_depth - 1)
+            self._newline(2)
+        elif tag in _BLOCK or tag == "li":
+            self._newline()
+        elif tag in _EMPHASIS:
+            self.out.append(_EMPHASIS[tag])
+        elif tag == "a" and self.links:
+            href, start = self.links.pop()
+            text = "".join(self.out[start:]).strip()
+            if text and href and not href.startswith(("#", "javascript:")):
+                self.out[start:] = [f"[{text}]({self._url(href)})"]
+
+    def handle_data(self, data: str) -> None:
+        if self.skip_depth:
+            return
+        self.out.append(data if self.pre_depth else _SPACE.sub(" ", data))
+
+
+def html_to_markdown(html: str, base_url: str | None = None) -> str:
+    """Convert an HTML page to markdown; relative links resolve against base_url."""
+    parser = _MarkdownParser(base_url)
+    parser.feed(html)
+    parser.close()
+    lines = (line.rstrip() for line in "".join(parser.out).splitlines())
+    text = "\n".join(line if line.strip() else "" for line in lines)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def text_chars(markdown: str) -> int:
+    """Count letters in markdown, ignoring link targets and image URLs."""
+    return len(_WORD_CHARS.findall(_MARKDOWN_SYNTAX.sub(r"\1", markdown)))
+
+
+def needs_browser(html: str, markdown: str, min_chars: int = MIN_TEXT_CHARS) -> str | None:
+    """Return why a fast-path page must be rendered in a browser, or None if it is usable."""
+    chars = text_chars(markdown)
+    if _CHALLENGE.search(html):
+        return "bot challenge"
+    if _SPA_SHELL.search(html) and chars < min_chars * 4:
+        return "app shell"
+    if chars < min_chars:
+        return "thin page"
+    if _NOSCRIPT_WARNING.search(html) and chars < min_chars * 3:
+        return "noscript warning"
+    return None
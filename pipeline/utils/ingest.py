@@ -0,0 +1,135 @@
+"""Streaming, incremental ingestion of raw Outscraper exports.
+
+Raw CSVs are read in chunks in a process pool and filtered per chunk; each
+file's rows are cached as a Parquet part, so only new or changed exports are
+parsed again.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = Path(os.getenv("INGEST_CACHE_DIR", str(PIPELINE_DIR / "data" / "cache" / "ingest")))
+MANIFEST_PATH = CACHE_DIR / "manifest.json"
+
+CHUNK_ROWS = 100_000
+WORKERS = int(os.getenv("INGEST_WORKERS", "0")) or os.cpu_count() or 1
+
+# Bump when the stored parts change shape, so old parts are re-ingested
+PART_FORMAT = 2
+
+ChunkFilter = Callable[[pd.DataFrame], tuple[pd.DataFrame, dict[str, int]]]
+
+
+def file_hash(path: Path) -> str:
+    """sha256 of a file's contents, streamed."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _load_manifest() -> dict:
+    if MANIFEST_PATH.exists():
+        return json.loads(MANIFEST_PATH.read_text())
+    return {}
+
+
+def _save_manifest(manifest: dict) -> None:
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2))
+    tmp.replace(MANIFEST_PATH)
+
+
+def _ingest_file(path: Path, digest: str, dtypes: dict[str, str], chunk_filter: ChunkFilter) -> dict:
+    """Parse one raw file chunk by chunk, filter, and store the survivors as a part."""
+    counts: Counter = Counter()
+    kept: list[pd.DataFrame] = []
+    header = pd.read_csv(path, nrows=0).columns
+    # Undeclared columns are kept as text so chunks and files always agree on their type
+    types = {col: dtypes.get(col, "string") for col in header}
+    reader = pd.read_csv(path, dtype=types, chunksize=CHUNK_ROWS)
+    for chunk in reader:
+        counts["rows"] += len(chunk)
+        chunk, removed = chunk_filter(chunk)
+        counts.update(removed)
+        kept.append(chunk)
+    df = pd.concat(kept, ignore_index=True) if kept else pd.DataFrame(columns=list(types))
+    part = CACHE_DIR / f"{digest[:32]}.parquet"
+    part.parent.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(part, index=False)
+    return {"hash": digest, "part": part.name, "counts": dict(counts), "kept": len(df)}
+
+
+def ingest_raw(
+    directory: str | Path,
+    dtypes: dict[str, str],
+    chunk_filter: ChunkFilter,
+    version: str = "",
+    full: bool = False,
+) -> tuple[pd.DataFrame, Counter]:
+    """Return (filtered rows of every raw CSV in directory, summed filter counts).
+
+    dtypes fixes the types of the declared columns; every other column of
+    the export is carried through as text.
+    version identifies the filter; when it changes (or full=True), every file
+    is re-ingested. chunk_filter(chunk) -> (kept_chunk, {"reason": removed})
+    must be a module-level function so worker processes can import it.
+    """
+    raw_dir = Path(directory)
+    files = sorted(raw_dir.glob("*.csv"))
+    if not files:
+        raise FileNotFoundError(f"No CSV files found in {directory}")
+
+    fingerprint = hashlib.sha256(json.dumps([version, dtypes, PART_FORMAT], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    manifest = _load_manifest()
+    if full or manifest.get("version") != fingerprint:
+        manifest = {"version": fingerprint, "files": {}}
+    known = manifest["files"]
+
+    todo: list[tuple[Path, str]] = []
+    entries: dict[str, dict] = {}
+    for path in files:
+        digest = file_hash(path)
+        entry = known.get(path.name)
+        if entry and entry["hash"] == digest and (CACHE_DIR / entry["part"]).exists():
+            entries[path.name] = entry
+        else:
+            todo.append((path, digest))
+    print(f"  [ingest] {len(files)} raw files: {len(files) - len(todo)} unchanged, {len(todo)} to parse")
+
+    if len(todo) > 1 and WORKERS > 1:
+        with ProcessPoolExecutor(max_workers=min(WORKERS, len(todo))) as pool:
+            futures = {path.name: pool.submit(_ingest_file, path, digest, dtypes, chunk_filter) for path, digest in todo}
+            for name, future in futures.items():
+                entries[name] = future.result()
+    else:
+        for path, digest in todo:
+            entries[path.name] = _ingest_file(path, digest, dtypes, chunk_filter)
+
+    manifest["files"] = {path.name: entries[path.name] for path in files}
+    _save_manifest(manifest)
+    # Drop parts of exports that were removed or replaced
+    live = {entry["part"] for entry in manifest["files"].values()}
+    for part in CACHE_DIR.glob("*.parquet"):
+        if part.name not in live:
+            part.unlink()
+
+    totals: Counter = Counter()
+    frames = []
+    for path in files:
+        entry = entries[path.name]
+        totals.update(entry["counts"])
+        frames.append(pd.read_parquet(CACHE_DIR / entry["part"]))
+    df = pd.concat(frames, ignore_index=True)
+    # Keep the projected dtypes even when some part came back empty
+    return df.astype({c: t for c, t in dtypes.items() if c in df.columns}), totals
@@ -0,0 +1,134 @@
+"""Append-only, row-level checkpoint journal for the enrichment steps.
+
+Each finished row is appended to data/journal/<step>.jsonl, keyed by a hash
+of its inputs and the step version; restore() brings them back on the next
+run and returns the rows still to do.
+"""
+
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from utils import crawl_cache
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent
+JOURNAL_DIR = Path(os.getenv("JOURNAL_DIR", str(PIPELINE_DIR / "data" / "journal")))
+
+
+def _enabled() -> bool:
+    return os.getenv("STEP_JOURNAL", "1").lower() not in ("0", "false", "no", "off")
+
+
+def _plain(value):
+    """Convert numpy/pandas scalars to JSON-safe Python values."""
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NA or value is pd.NaT:
+        return None
+    return value
+
+
+class StepJournal:
+    """Checkpoint journal for one step, keyed by slug + input-content hash."""
+
+    def __init__(self, step: str, version: str, inputs: list[str], path: Path | None = None) -> None:
+        self.step = step
+        self.inputs = inputs
+        self.path = path or JOURNAL_DIR / f"{step}.jsonl"
+        self._version = hashlib.sha256(version.encode("utf-8")).hexdigest()[:16]
+        self._entries: dict[tuple[str, str], dict] = {}
+        self._rows: dict = {}  # df index -> (slug, key) for rows restored or pending this run
+        self._file = None
+        self.enabled = _enabled()
+        self.restored = 0
+        self.recorded = 0
+        if self.enabled:
+            self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn write from a crash
+                self._entries[(entry["slug"], entry["key"])] = entry["values"]
+
+    def row_key(self, row: pd.Series) -> str:
+        """Hash of the step version and the row's input columns."""
+        parts = [self._version] + [str(_plain(row.get(col, ""))) for col in self.inputs]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:24]
+
+    def restore(self, df: pd.DataFrame, indices) -> list:
+        """Apply journaled values for indices to df; return the indices still to do.
+
+        With --refresh every row is redone.
+        """
+        pending = []
+        refresh = crawl_cache.get_mode() == "refresh"
+        for idx in indices:
+            row = df.loc[idx]
+            slug = str(row.get("slug", "") or idx)
+            key = self.row_key(row)
+            self._rows[idx] = (slug, key)
+            values = None if refresh or not self.enabled else self._entries.get((slug, key))
+            if values is None:
+                pending.append(idx)
+                continue
+            for column, value in values.items():
+                df.at[idx, column] = value
+            self.restored += 1
+        return pending
+
+    def record(self, idx, values: dict) -> None:
+        """Append the finished values for row idx (must have been passed to restore)."""
+        if not self.enabled:
+            return
+        slug, key = self._rows[idx]
+        values = {column: _plain(value) for column, value in values.items()}
+        self._entries[(slug, key)] = values
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"slug": slug, "key": key, "values": values}) + "\n")
+        self._file.flush()
+        self.recorded += 1
+
+    def compact(self) -> None:
+        """Rewrite the journal with one line per entry, dropping superseded ones.
+
+        An entry is superseded when its slug was seen this run under a
+        different key (the prompt or the row's inputs changed). Entries for
+        slugs absent from this run's input are kept: a filtered or partial
+        input must not throw away work a later full run can restore.
+        """
+        if not self.enabled:
+            return
+        self.close()
+        live = set(self._rows.values())
+        seen = {slug for slug, _ in live}
+        tmp = self.path.with_suffix(".tmp")
+        tmp.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            for (slug, key), values in self._entries.items():
+                if slug not in seen or (slug, key) in live:
+                    f.write(json.dumps({"slug": slug, "key": key, "values": values}) + "\n")
+        tmp.replace(self.path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return f"[journal] {self.step}: disabled"
+        return f"[journal] {self.step}: {self.restored} rows restored, {len(self._rows) - self.restored} to do"
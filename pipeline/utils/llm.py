@@ -2,66 +2,859 @@
 
 import asyncio
 import os
+import random
+import re
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
 
-from anthropic import Anthropic
+import httpx
+from anthropic import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    AsyncAnthropic,
+    DefaultAsyncHttpxClient,
+)
 from dotenv import load_dotenv
 
+from utils.llm_batch import BatchItemError, run_batches
+from utils.llm_cache import DEFAULT_NAMESPACE, get_cache, request_key
+from utils.llm_pack import (
+    HEADER_TOKENS,
+    PACK_INPUT_TOKENS,
+    PACK_LINGER,
+    PACK_MAX_OUTPUT_TOKENS,
+    PACK_SIZE,
+    pack_prompt,
+    split_answers,
+)
+
 load_dotenv()
 
-_client: Anthropic | None = None
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 60.0
+
+PROMPT_CACHE = os.getenv("LLM_PROMPT_CACHE", "1") != "0"
+# Cached prefix tokens are billed at 1.25x the base input price when written and 0.1x when read
+CACHE_WRITE_PRICE = 1.25
+CACHE_READ_PRICE = 0.1
+# Shortest prefix each model family caches (model name prefix -> tokens); shorter prefixes are sent
+# inline with the item, without a cache_control marker
+MIN_CACHEABLE_TOKENS = (
+    ("claude-haiku-4-5", 4096),
+    ("claude-opus-4-5", 4096),
+    ("claude-3-5-haiku", 2048),
+    ("claude-3-haiku", 2048),
+    ("claude", 1024),
+)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A step prompt laid out for prompt caching: static instructions, then the per-item part.
+
+    prefix is the same for every item and is marked cache_control when the model
+    can cache it (MIN_CACHEABLE_TOKENS); only `item` is filled in with
+    str.format_map(). str() gives the whole template, e.g. for journal versions.
+    """
+
+    prefix: str
+    item: str
+
+    def __str__(self) -> str:
+        return self.prefix + self.item
+
+
+def _split_template(template: "str | PromptTemplate") -> tuple[str, str]:
+    """Return (static prefix, per-item template); plain strings have no prefix."""
+    if isinstance(template, PromptTemplate):
+        return template.prefix, template.item
+    return "", template
+
+
+@dataclass
+class PromptCacheUsage:
+    """Prompt-cache token usage and response times of one step's requests."""
+
+    requests: int = 0
+    cached_requests: int = 0  # requests that read their prefix from the cache
+    input_tokens: int = 0  # input billed at the base price
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    seconds_cached: float = 0.0
+    seconds_uncached: float = 0.0
+
+    def add(self, usage, seconds: float) -> None:
+        """Count one response's usage block and its response time."""
+        read = getattr(usage, "cache_read_input_tokens", None) or 0
+        self.requests += 1
+        self.input_tokens += usage.input_tokens
+        self.cache_read_tokens += read
+        self.cache_write_tokens += getattr(usage, "cache_creation_input_tokens", None) or 0
+        if read:
+            self.cached_requests += 1
+            self.seconds_cached += seconds
+        else:
+            self.seconds_uncached += seconds
+
+    def savings(self) -> float:
+        """Share of the input cost saved against sending every prompt uncached."""
+        total = self.input_tokens + self.cache_read_tokens + self.cache_write_tokens
+        if not total:
+            return 0.0
+        cost = self.input_tokens + CACHE_WRITE_PRICE * self.cache_write_tokens + CACHE_READ_PRICE * self.cache_read_tokens
+        return 1 - cost / total
+
+    def summary(self, namespace: str) -> str:
+        text = (
+            f"[llm] Prompt cache ({namespace}): {self.cached_requests}/{self.requests} requests read a cached "
+            f"prefix ({self.cache_read_tokens:,} tokens read, {self.cache_write_tokens:,} written, "
+            f"{self.input_tokens:,} uncached); input cost {0.0 - self.savings():+.0%}"
+        )
+        uncached = self.requests - self.cached_requests
+        if self.cached_requests and uncached:
+            text += (
+                f"; mean response {self.seconds_cached / self.cached_requests:.2f}s with a cached prefix, "
+                f"{self.seconds_uncached / uncached:.2f}s without"
+            )
+        return text
+
+
+_prompt_usage: dict[str, PromptCacheUsage] = {}
+
+
+def prompt_cache_usage(namespace: str | None = None) -> PromptCacheUsage:
+    """Return the running prompt-cache usage of a cache namespace (one per step)."""
+    return _prompt_usage.setdefault(namespace or DEFAULT_NAMESPACE, PromptCacheUsage())
+
+
+def min_cacheable_tokens(model: str) -> int:
+    """Shortest prompt prefix, in tokens, that model caches."""
+    return next((tokens for name, tokens in MIN_CACHEABLE_TOKENS if model.startswith(name)), 1024)
+
+
+def prefix_cacheable(prefix: str, system: str, model: str) -> bool:
+    """Whether to mark prefix for the prompt cache: caching on and the prefix long enough for model."""
+    if not prefix or not PROMPT_CACHE:
+        return False
+    return get_governor().estimate_input_tokens(system + prefix) >= min_cacheable_tokens(model)
+
+
+def prompt_cache_status(
+    template: "str | PromptTemplate",
+    system: str = "",
+    model: str = "claude-haiku-4-5-20251001",
+    namespace: str | None = None,
+) -> str:
+    """One line for a step's start: whether its prompt prefix will be served from the prompt cache."""
+    prefix, _ = _split_template(template)
+    label = f"[llm] Prompt cache ({namespace or DEFAULT_NAMESPACE})"
+    if not prefix:
+        return f"{label}: off (prompt has no static prefix)"
+    if not PROMPT_CACHE:
+        return f"{label}: off (LLM_PROMPT_CACHE=0)"
+    tokens = get_governor().estimate_input_tokens(system + prefix)
+    minimum = min_cacheable_tokens(model)
+    if tokens < minimum:
+        return (f"{label}: off; the ~{tokens}-token instruction prefix is below {model}'s "
+                f"{minimum:,}-token minimum, so it is sent inline with every item")
+    return f"{label}: on; the ~{tokens}-token instruction prefix is marked for caching"
+
+
+@dataclass(frozen=True)
+class AnswerProfile:
+    """How long a step's answer may be, where it ends, and what a well-formed one looks like."""
+
+    max_tokens: int
+    stop: tuple[str, ...] = ()
+    pattern: str = ""  # re.search()ed (DOTALL, IGNORECASE) against packed answers before they are accepted
+
 
+# Keyed like utils.content.PROFILES; max_tokens leaves ~2x headroom over the longest answers seen
+ANSWER_PROFILES: dict[str, AnswerProfile] = {
+    "verify": AnswerProfile(150, ("\n\n",), r"\A(MOBILE_GROOMER|SALON_ONLY|NOT_GROOMER|UNCLEAR)\s*\|\s*\d+"),
+    "services": AnswerProfile(300, (), r"full_groom\s*\|.*price_range_high\s*\|"),
+    "features": AnswerProfile(150, (), r"is_licensed\s*\|.*online_booking\s*\|"),
+    "service_areas": AnswerProfile(250, (), r"primary_city\s*\|.*service_radius_miles\s*\|"),
+    "images": AnswerProfile(300, (), r"URL\s*\|.*DESC\s*\|"),
+}
 
-def _get_client() -> Anthropic:
-    """Lazy-init the Anthropic client."""
-    global _client
-    if _client is None:
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
-            raise RuntimeError("ANTHROPIC_API_KEY not set in environment or .env file")
-        _client = Anthropic(api_key=api_key)
-    return _client
 
+def _answer_limits(profile: str | None, max_tokens: int) -> tuple[int, tuple[str, ...]]:
+    """Return (max_tokens, stop sequences) for a step's answer profile (or the caller's max_tokens)."""
+    if profile is None:
+        return max_tokens, ()
+    answer = ANSWER_PROFILES[profile]
+    return answer.max_tokens, answer.stop
 
-def classify(prompt: str, system: str = "", model: str = "claude-haiku-4-5-20251001") -> str:
-    """Send a message to Claude and return the text response."""
-    client = _get_client()
-    messages = [{"role": "user", "content": prompt}]
-    kwargs: dict = {"model": model, "max_tokens": 1024, "messages": messages}
+
+def _api_key() -> str:
+    """Return the API key from the environment, or raise if missing."""
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        raise RuntimeError("ANTHROPIC_API_KEY not set in environment or .env file")
+    return api_key
+
+
+def _request_params(
+    prompt: str, system: str, model: str, max_tokens: int, stop: tuple[str, ...] = (), prefix: str = ""
+) -> dict:
+    """Build the Messages API parameters for one prompt (after its static prefix, if any).
+
+    A prefix the model can cache goes in its own content block marked
+    cache_control; a shorter one is sent inline.
+    """
+    content: str | list = prefix + prompt
+    if prefix_cacheable(prefix, system, model):
+        content = [
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt},
+        ]
+    params: dict = {"model": model, "max_tokens": max_tokens, "messages": [{"role": "user", "content": content}]}
     if system:
-        kwargs["system"] = system
-    response = client.messages.create(**kwargs)
-    return response.content[0].text.strip()
+        params["system"] = system
+    if stop:
+        params["stop_sequences"] = list(stop)
+    return params
+
+
+def classify(
+    prompt: str,
+    system: str = "",
+    model: str = "claude-haiku-4-5-20251001",
+    max_tokens: int = 1024,
+    cache_namespace: str = DEFAULT_NAMESPACE,
+    prefix: str = "",
+    stop: tuple[str, ...] = (),
+) -> str:
+    """Send a message to Claude and return the text response.
+
+    prefix, if given, is static text sent before prompt and marked for the
+    API's prompt cache when it is long enough (see PromptTemplate). Identical
+    requests are answered from the LLM cache (see utils.llm_cache). Like
+    classify_batch, the request is admitted by the process-wide RateGovernor
+    and retried on transient failures; call it outside an event loop.
+    """
+    cache = get_cache()
+    key = request_key(model, system, prefix + prompt, max_tokens, stop)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    async def _send() -> str:
+        async with _new_async_client(1) as client:
+            return await _create_async(
+                client, prompt, system, model, max_tokens, stop, prefix, prompt_cache_usage(cache_namespace)
+            )
+
+    text = asyncio.run(_send())
+    if cache is not None and text:
+        cache.put(key, text, cache_namespace)
+    return text
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `per_minute` units per minute."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.per_minute = per_minute
+        self.tokens = per_minute
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.per_minute, self.tokens + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.per_minute)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * 60 / self.per_minute
+
+    def take(self, amount: float) -> None:
+        """Remove amount (may go negative when correcting an underestimate)."""
+        self._refill()
+        self.tokens -= amount
+
+    def resize(self, per_minute: float) -> None:
+        self._refill()
+        self.tokens = min(self.tokens, per_minute)
+        self.per_minute = per_minute
+
+
+@dataclass
+class Reservation:
+    """Estimated usage admitted for one request."""
+
+    input_tokens: int
+    output_tokens: int
+
+
+class RateGovernor:
+    """Process-wide admission control for all Messages requests.
+
+    Paces requests to RPM / input / output token-per-minute buckets, from
+    ANTHROPIC_RPM / ANTHROPIC_ITPM / ANTHROPIC_OTPM or the rate-limit response
+    headers when unset.
+    """
+
+    def __init__(self, rpm: float | None = None, itpm: float | None = None, otpm: float | None = None) -> None:
+        self.buckets: dict[str, TokenBucket] = {}
+        self._pinned: set[str] = set()
+        for name, limit in (("requests", rpm), ("input_tokens", itpm), ("output_tokens", otpm)):
+            if limit:
+                self.buckets[name] = TokenBucket(limit)
+                self._pinned.add(name)
+        self.chars_per_token = 3.5
+        self.avg_output_tokens = 200.0
+        self._blocked_until = 0.0
+        self._window: deque[tuple[float, int, int]] = deque()
+        self._calibrated = bool(self._pinned)
+        self._probe_in_flight = False
+
+    def estimate_input_tokens(self, text: str) -> int:
+        return int(len(text) / self.chars_per_token) + 1
+
+    async def acquire(self, text: str, max_tokens: int) -> Reservation:
+        """Wait until the buckets can admit one request, then reserve its usage."""
+        reservation = Reservation(
+            self.estimate_input_tokens(text), int(min(max_tokens, self.avg_output_tokens)) + 1
+        )
+        needs = {"requests": 1, "input_tokens": reservation.input_tokens, "output_tokens": reservation.output_tokens}
+        while not self._calibrated:
+            if not self._probe_in_flight:
+                self._probe_in_flight = True
+                break
+            await asyncio.sleep(0.05)
+        while True:
+            wait = self._blocked_until - time.monotonic()
+            for name, bucket in self.buckets.items():
+                wait = max(wait, bucket.wait_time(needs[name]))
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait + random.uniform(0, 0.05))
+        for name, bucket in self.buckets.items():
+            bucket.take(needs[name])
+        return reservation
+
+    def record(
+        self, reservation: Reservation, text: str, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0
+    ) -> None:
+        """Charge the estimate error back to the buckets and refine the estimators.
 
+        input_tokens are the ones counted against ITPM; prompt-cache reads are
+        not, but are part of `text` when learning chars per token.
+        """
+        if "input_tokens" in self.buckets:
+            self.buckets["input_tokens"].take(input_tokens - reservation.input_tokens)
+        if "output_tokens" in self.buckets:
+            self.buckets["output_tokens"].take(output_tokens - reservation.output_tokens)
+        if input_tokens + cache_read_tokens > 0:
+            self.chars_per_token = 0.9 * self.chars_per_token + 0.1 * (len(text) / (input_tokens + cache_read_tokens))
+        self.avg_output_tokens = 0.9 * self.avg_output_tokens + 0.1 * output_tokens
+        self._calibrated = True
+        now = time.monotonic()
+        self._window.append((now, input_tokens, output_tokens))
+        while self._window and now - self._window[0][0] > 60:
+            self._window.popleft()
 
-async def _classify_single(sem: asyncio.Semaphore, client: Anthropic, prompt: str, system: str, model: str) -> str:
-    """Classify a single item with semaphore-limited concurrency."""
-    async with sem:
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, lambda: classify(prompt, system, model))
+    def release(self, reservation: Reservation) -> None:
+        """Return a failed request's token reservation (the request itself still counts)."""
+        self._probe_in_flight = False
+        if "input_tokens" in self.buckets:
+            self.buckets["input_tokens"].take(-reservation.input_tokens)
+        if "output_tokens" in self.buckets:
+            self.buckets["output_tokens"].take(-reservation.output_tokens)
+
+    def observe_headers(self, headers) -> None:
+        """Learn tier limits from anthropic-ratelimit-*-limit headers."""
+        for name in ("requests", "input_tokens", "output_tokens"):
+            if name in self._pinned:
+                continue
+            value = headers.get(f"anthropic-ratelimit-{name.replace('_', '-')}-limit")
+            if not value:
+                continue
+            limit = float(value)
+            if name in self.buckets:
+                if self.buckets[name].per_minute != limit:
+                    self.buckets[name].resize(limit)
+            else:
+                bucket = TokenBucket(limit)
+                recent = self.utilization()[name]["per_minute"]
+                bucket.take(recent)
+                self.buckets[name] = bucket
+
+    def pause(self, seconds: float) -> None:
+        """Hold all admissions for `seconds` (after a 429)."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def utilization(self) -> dict:
+        """Return observed per-minute usage over the last 60 s and its share of each limit."""
+        now = time.monotonic()
+        recent = [(i, o) for t, i, o in self._window if now - t <= 60]
+        used = {
+            "requests": len(recent),
+            "input_tokens": sum(i for i, _ in recent),
+            "output_tokens": sum(o for _, o in recent),
+        }
+        return {
+            name: {
+                "per_minute": value,
+                "limit": self.buckets[name].per_minute if name in self.buckets else None,
+                "utilization": value / self.buckets[name].per_minute if name in self.buckets else None,
+            }
+            for name, value in used.items()
+        }
+
+
+_governor: RateGovernor | None = None
+
+
+def get_governor() -> RateGovernor:
+    """Lazy-init the process-wide rate governor."""
+    global _governor
+    if _governor is None:
+
+        def _limit(var: str) -> float | None:
+            value = os.getenv(var)
+            return float(value) if value else None
+
+        _governor = RateGovernor(_limit("ANTHROPIC_RPM"), _limit("ANTHROPIC_ITPM"), _limit("ANTHROPIC_OTPM"))
+    return _governor
+
+
+def _format_utilization(util: dict) -> str:
+    parts = []
+    for name, label in (("requests", "RPM"), ("input_tokens", "ITPM"), ("output_tokens", "OTPM")):
+        entry = util[name]
+        text = f"{label} {entry['per_minute']:,}"
+        if entry["utilization"] is not None:
+            text += f" ({entry['utilization']:.0%} of {entry['limit']:,.0f})"
+        parts.append(text)
+    return ", ".join(parts)
+
+
+def _retry_delay(attempt: int, error: Exception) -> float:
+    """Backoff before retry `attempt`: honor retry-after, else exponential with full jitter."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after:
+            try:
+                return min(float(retry_after), RETRY_MAX_DELAY) + random.uniform(0, 1)
+            except ValueError:
+                pass
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+
+
+def _is_retryable(error: Exception) -> bool:
+    """True for rate limits (429), overload (529), 5xx and connection failures."""
+    if isinstance(error, (APIConnectionError, APITimeoutError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+async def _create_async(
+    client: AsyncAnthropic,
+    prompt: str,
+    system: str,
+    model: str,
+    max_tokens: int,
+    stop: tuple[str, ...] = (),
+    prefix: str = "",
+    usage: PromptCacheUsage | None = None,
+) -> str:
+    """Send one Messages request on the async client, retrying transient failures.
+
+    Every attempt is admitted through the process-wide RateGovernor. The
+    response's token usage, prompt-cache reads and writes included, is added
+    to `usage`.
+    """
+    kwargs = _request_params(prompt, system, model, max_tokens, stop, prefix)
+    text = system + prefix + prompt
+    governor = get_governor()
+    attempt = 0
+    while True:
+        reservation = await governor.acquire(text, max_tokens)
+        started = time.monotonic()
+        try:
+            raw = await client.messages.with_raw_response.create(**kwargs)
+        except Exception as e:
+            governor.release(reservation)
+            if attempt >= MAX_RETRIES or not _is_retryable(e):
+                raise
+            delay = _retry_delay(attempt, e)
+            if isinstance(e, APIStatusError) and e.status_code == 429:
+                governor.pause(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        governor.observe_headers(raw.headers)
+        response = await raw.parse()
+        seconds = time.monotonic() - started
+        tokens = response.usage
+        written = getattr(tokens, "cache_creation_input_tokens", None) or 0
+        read = getattr(tokens, "cache_read_input_tokens", None) or 0
+        governor.record(reservation, text, tokens.input_tokens + written, tokens.output_tokens, read)
+        if usage is not None:
+            usage.add(tokens, seconds)
+        return response.content[0].text.strip() if response.content else ""
+
+
+def _new_async_client(max_concurrent: int) -> AsyncAnthropic:
+    """Build an async client with a connection pool sized for max_concurrent."""
+    limits = httpx.Limits(max_connections=max_concurrent, max_keepalive_connections=max_concurrent)
+    return AsyncAnthropic(
+        api_key=_api_key(),
+        max_retries=0,
+        timeout=120.0,
+        http_client=DefaultAsyncHttpxClient(limits=limits),
+    )
+
+
+def _bind_namespace(cache, cache_namespace: str | None, system: str, prompt_template: str) -> None:
+    """Tie a cache namespace to its prompt; a changed prompt drops the namespace's entries."""
+    if cache_namespace:
+        dropped = cache.bind_namespace(cache_namespace, system + "\0" + prompt_template)
+        if dropped:
+            print(f"  [llm] Prompt changed: dropped {dropped} cached responses for {cache_namespace}")
+
+
+class AsyncClassifier:
+    """Classify items one at a time, as they become available, on one pooled client.
+
+    The streaming counterpart of aclassify_batch (see utils.stream): same cache,
+    RateGovernor admission and retries. With pack > 1, cache misses are sent
+    several per request (see utils.llm_pack).
+
+        async with AsyncClassifier(PROMPT, cache_namespace="step3", profile="verify") as llm:
+            text = await llm.classify({"content": ...})
+    """
+
+    def __init__(
+        self,
+        prompt_template: str | PromptTemplate,
+        system: str = "",
+        model: str = "claude-haiku-4-5-20251001",
+        max_concurrent: int = 64,
+        max_tokens: int = 1024,
+        cache_namespace: str | None = None,
+        profile: str | None = None,
+        pack: int = PACK_SIZE,
+    ) -> None:
+        self.prompt_template = prompt_template
+        self.prefix, self.item_template = _split_template(prompt_template)
+        self.system = system
+        self.model = model
+        self.max_concurrent = max_concurrent
+        self.max_tokens, self.stop = _answer_limits(profile, max_tokens)
+        self.cache_namespace = cache_namespace
+        self.usage = prompt_cache_usage(cache_namespace)
+        pattern = ANSWER_PROFILES[profile].pattern if profile else ""
+        self._valid = re.compile(pattern, re.DOTALL | re.IGNORECASE) if pattern else None
+        self.pack = max(1, min(pack, PACK_MAX_OUTPUT_TOKENS // (self.max_tokens + HEADER_TOKENS)))
+        self.pack_size = self.pack
+        self.hits = 0
+        self.misses = 0
+        self.packs = 0
+        self.packed_items = 0
+        self.resent = 0
+        self._cache = None
+        self._client: AsyncAnthropic | None = None
+        self._sem: asyncio.Semaphore | None = None
+        self._pending: list[tuple[dict, str, int, asyncio.Future]] = []  # item, cache key, est. tokens, future
+        self._linger: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "AsyncClassifier":
+        self._cache = get_cache()
+        if self._cache is not None:
+            _bind_namespace(self._cache, self.cache_namespace, self.system, str(self.prompt_template))
+        self._client = _new_async_client(self.max_concurrent)
+        self._sem = asyncio.Semaphore(self.max_concurrent)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._linger is not None:
+            self._linger.cancel()
+        for task in self._tasks:
+            task.cancel()
+        await self._client.close()
+        if self._cache is not None:
+            namespace = self.cache_namespace or DEFAULT_NAMESPACE
+            print(f"  [llm] Cache: {self.hits} hits, {self.misses} misses ({namespace})")
+        if self.packs:
+            print(
+                f"  [llm] Packing: {self.packed_items} items in {self.packs} requests "
+                f"(up to {self.pack} per request, {self.pack_size} at the end), {self.resent} answers re-sent alone"
+            )
+        if self.misses:
+            print(f"  [llm] Rate: {_format_utilization(get_governor().utilization())}")
+        if self.prefix and self.usage.requests:
+            print(f"  {self.usage.summary(self.cache_namespace or DEFAULT_NAMESPACE)}")
+
+    async def classify(self, item: dict) -> str:
+        """Return the response for one item (raises once retries are exhausted)."""
+        prompt = self.item_template.format_map(item)
+        key = request_key(self.model, self.system, self.prefix + prompt, self.max_tokens, self.stop)
+        if self._cache is not None:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+        self.misses += 1
+        if self.pack == 1:
+            return await self._single(prompt, key)
+        future = asyncio.get_running_loop().create_future()
+        tokens = get_governor().estimate_input_tokens(" ".join(str(value) for value in item.values()))
+        self._pending.append((item, key, tokens, future))
+        if len(self._pending) >= self.pack_size or sum(p[2] for p in self._pending) >= PACK_INPUT_TOKENS:
+            self._flush(partial=False)
+        elif self._linger is None:
+            self._linger = asyncio.get_running_loop().call_later(PACK_LINGER, self._flush)
+        return await future
+
+    async def _single(self, prompt: str, key: str) -> str:
+        """Send one item on its own request and cache the answer."""
+        async with self._sem:
+            text = await _create_async(
+                self._client, prompt, self.system, self.model, self.max_tokens, self.stop, self.prefix, self.usage
+            )
+        if self._cache is not None and text:
+            self._cache.put(key, text, self.cache_namespace or DEFAULT_NAMESPACE)
+        return text
+
+    def _flush(self, partial: bool = True) -> None:
+        """Send the pending items as packs; a last partial pack waits for more unless `partial`."""
+        if self._linger is not None:
+            self._linger.cancel()
+            self._linger = None
+        template_tokens = get_governor().estimate_input_tokens(self.system + str(self.prompt_template))
+        while self._pending:
+            size, tokens = 0, template_tokens
+            for _, _, item_tokens, _ in self._pending[: self.pack_size]:
+                if size and tokens + item_tokens > PACK_INPUT_TOKENS:
+                    break
+                size, tokens = size + 1, tokens + item_tokens
+            if size == len(self._pending) and size < self.pack_size and not partial:
+                break
+            batch, self._pending = self._pending[:size], self._pending[size:]
+            task = asyncio.ensure_future(self._send_pack(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._pending and self._linger is None:
+            self._linger = asyncio.get_running_loop().call_later(PACK_LINGER, self._flush)
+
+    async def _send_pack(self, batch: list[tuple[dict, str, int, asyncio.Future]]) -> None:
+        """Answer a pack with one request; re-send items whose answers do not parse."""
+        if len(batch) == 1:
+            item, key, _, future = batch[0]
+            await _settle(future, self._single(self.item_template.format_map(item), key))
+            if not future.cancelled() and future.exception() is None:
+                self.pack_size = min(self.pack, self.pack_size + 1)
+            return
+        prompt = pack_prompt(self.item_template, [item for item, _, _, _ in batch])
+        max_tokens = len(batch) * (self.max_tokens + HEADER_TOKENS)
+        # The step's stop sequences would end the whole pack at the first answer ("\n\n" in step 3),
+        # so the request goes without them and each answer is cut at them below instead
+        try:
+            async with self._sem:
+                text = await _create_async(
+                    self._client, prompt, self.system, self.model, max_tokens, prefix=self.prefix, usage=self.usage
+                )
+        except Exception as e:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self.packs += 1
+        self.packed_items += len(batch)
+        answers = split_answers(text, len(batch))
+        retry = []
+        for i, (item, key, _, future) in enumerate(batch):
+            answer = _cut_at_stop(answers.get(i), self.stop)
+            if not answer or (self._valid is not None and not self._valid.search(answer)):
+                retry.append((item, key, future))
+                continue
+            if self._cache is not None:
+                self._cache.put(key, answer, self.cache_namespace or DEFAULT_NAMESPACE)
+            if not future.done():
+                future.set_result(answer)
+        if retry:
+            self.pack_size = max(1, self.pack_size // 2)
+            self.resent += len(retry)
+            await asyncio.gather(
+                *(_settle(future, self._single(self.item_template.format_map(item), key)) for item, key, future in retry)
+            )
+        else:
+            self.pack_size = min(self.pack, self.pack_size + 1)
+
+
+def _cut_at_stop(answer: str | None, stop: tuple[str, ...]) -> str | None:
+    """Truncate answer at its first stop sequence, as the API does for a single request."""
+    if not answer:
+        return answer
+    for sequence in stop:
+        answer = answer.split(sequence, 1)[0]
+    return answer.strip()
+
+
+async def _settle(future: asyncio.Future, coro) -> None:
+    """Resolve future with coro's result or exception."""
+    try:
+        result = await coro
+    except Exception as e:
+        if not future.done():
+            future.set_exception(e)
+        return
+    if not future.done():
+        future.set_result(result)
+
+
+async def aclassify_batch(
+    items: list[dict],
+    prompt_template: str | PromptTemplate,
+    system: str = "",
+    model: str = "claude-haiku-4-5-20251001",
+    max_concurrent: int = 64,
+    max_tokens: int = 1024,
+    cache_namespace: str | None = None,
+    return_exceptions: bool = False,
+    mode: str = "interactive",
+    on_result: Callable[[int, str], None] | None = None,
+    profile: str | None = None,
+) -> list:
+    """Async version of classify_batch, for callers already inside an event loop."""
+    if not items:
+        return []
+    if mode not in ("interactive", "batch"):
+        raise ValueError(f"Unknown mode {mode!r}; expected 'interactive' or 'batch'")
+
+    max_tokens, stop = _answer_limits(profile, max_tokens)
+    prefix, item_template = _split_template(prompt_template)
+    prompts = [item_template.format_map(item) for item in items]
+    results: list = [None] * len(items)
+    keys = [request_key(model, system, prefix + prompt, max_tokens, stop) for prompt in prompts]
+
+    cache = get_cache()
+    namespace = cache_namespace or DEFAULT_NAMESPACE
+    if cache is not None:
+        _bind_namespace(cache, cache_namespace, system, str(prompt_template))
+        for i, key in enumerate(keys):
+            results[i] = cache.get(key)
+            if results[i] is not None and on_result is not None:
+                on_result(i, results[i])
+    pending = [i for i, r in enumerate(results) if r is None]
+    if cache is not None:
+        print(f"  [llm] Cache: {len(items) - len(pending)} hits, {len(pending)} misses ({namespace})")
+    if not pending:
+        return results
+
+    errors: list[tuple[int, Exception]] = []
+
+    def _store(i: int, value: str | Exception) -> None:
+        if isinstance(value, Exception):
+            errors.append((i, value))
+            results[i] = value if return_exceptions else None
+            return
+        results[i] = value
+        if cache is not None and value:
+            cache.put(keys[i], value, namespace)
+        if on_result is not None:
+            on_result(i, value)
+
+    if mode == "batch":
+        # Identical prompts share one custom_id (the cache key)
+        by_key: dict[str, list[int]] = {}
+        for i in pending:
+            by_key.setdefault(keys[i], []).append(i)
+        requests = {key: _request_params(prompts[idxs[0]], system, model, max_tokens, stop, prefix) for key, idxs in by_key.items()}
+        answered: set[str] = set()
+
+        def _on_result(key: str, value: str | Exception) -> None:
+            answered.add(key)
+            for i in by_key[key]:
+                _store(i, value)
+
+        async with _new_async_client(8) as client:
+            await run_batches(client, requests, _on_result)
+        for key in by_key.keys() - answered:
+            for i in by_key[key]:
+                _store(i, BatchItemError("missing from batch results"))
+    else:
+        usage = prompt_cache_usage(cache_namespace)
+        sem = asyncio.Semaphore(max_concurrent)
+
+        async with _new_async_client(max_concurrent) as client:
+
+            async def _one(i: int) -> None:
+                async with sem:
+                    try:
+                        text = await _create_async(client, prompts[i], system, model, max_tokens, stop, prefix, usage)
+                    except Exception as e:
+                        _store(i, e)
+                        return
+                _store(i, text)
+
+            await asyncio.gather(*(_one(i) for i in pending))
+        print(f"  [llm] Rate: {_format_utilization(get_governor().utilization())}")
+        if prefix and usage.requests:
+            print(f"  {usage.summary(namespace)}")
+
+    if errors:
+        first = errors[0][1]
+        print(f"  [llm] {len(errors)}/{len(pending)} requests failed (first: {type(first).__name__}: {first})")
+    return results
 
 
 def classify_batch(
     items: list[dict],
-    prompt_template: str,
+    prompt_template: str | PromptTemplate,
     system: str = "",
     model: str = "claude-haiku-4-5-20251001",
-    max_concurrent: int = 10,
-) -> list[str]:
+    max_concurrent: int = 64,
+    max_tokens: int = 1024,
+    cache_namespace: str | None = None,
+    return_exceptions: bool = False,
+    mode: str = "interactive",
+    on_result: Callable[[int, str], None] | None = None,
+    profile: str | None = None,
+) -> list:
     """Process multiple items concurrently through Claude.
 
     Each item dict is used to format prompt_template via str.format_map().
-    Returns a list of response strings in the same order as items.
+    Returns a list of response strings in the same order as items; an item
+    whose request still fails after retries gets None (or the exception, with
+    return_exceptions=True).
+
+    Cache hits are answered up front; cache_namespace ties cached entries to
+    prompt_template. mode="batch" sends misses as Message Batches jobs (see
+    utils.llm_batch). on_result(i, response) is called as each response
+    arrives. profile selects the step's ANSWER_PROFILES entry.
     """
     if not items:
         return []
-
-    async def _run() -> list[str]:
-        client = _get_client()
-        sem = asyncio.Semaphore(max_concurrent)
-        tasks = []
-        for item in items:
-            prompt = prompt_template.format_map(item)
-            tasks.append(_classify_single(sem, client, prompt, system, model))
-        return await asyncio.gather(*tasks)
-
-    return asyncio.run(_run())
+    return asyncio.run(
+        aclassify_batch(
+            items,
+            prompt_template,
+            system=system,
+            model=model,
+            max_concurrent=max_concurrent,
+            max_tokens=max_tokens,
+            cache_namespace=cache_namespace,
+            return_exceptions=return_exceptions,
+            mode=mode,
+            on_result=on_result,
+            profile=profile,
+        )
+    )
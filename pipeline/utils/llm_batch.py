@@ -0,0 +1,135 @@
+"""Message Batches execution for classify_batch(mode="batch").
+
+Requests are submitted as one or more Message Batches jobs (half the price
+of interactive calls, no client-side concurrency limit). Each request's
+custom_id is its LLM cache key, so ids are stable across runs. The batch id
+of every in-flight job is written to a small state file keyed by a
+fingerprint of its custom_ids; re-running the same step after a crash or
+restart resumes polling that job instead of submitting a new one.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from anthropic import AsyncAnthropic, NotFoundError
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent
+STATE_PATH = Path(os.getenv("LLM_BATCH_STATE_PATH", str(PIPELINE_DIR / "data" / "cache" / "llm_batches.json")))
+
+MAX_BATCH_REQUESTS = 10_000
+POLL_INITIAL_SECONDS = 10.0
+POLL_MAX_SECONDS = 300.0
+
+
+class BatchItemError(Exception):
+    """A batch request that did not succeed (errored, canceled, expired, or no text in the reply)."""
+
+
+def _load_state() -> dict:
+    if STATE_PATH.exists():
+        return json.loads(STATE_PATH.read_text())
+    return {}
+
+
+def _save_state(state: dict) -> None:
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_PATH.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(STATE_PATH)
+
+
+def _fingerprint(custom_ids: list[str]) -> str:
+    return hashlib.sha256("\n".join(sorted(custom_ids)).encode("utf-8")).hexdigest()[:32]
+
+
+async def _submit_or_resume(client: AsyncAnthropic, requests: dict[str, dict], label: str) -> str:
+    """Return the batch id for this chunk, resuming a recorded in-flight job if any."""
+    fingerprint = _fingerprint(list(requests))
+    state = _load_state()
+    recorded = state.get(fingerprint)
+    if recorded:
+        try:
+            batch = await client.messages.batches.retrieve(recorded["batch_id"])
+            if batch.processing_status in ("in_progress", "ended"):
+                print(f"  [llm] {label}: resuming batch {batch.id} ({batch.processing_status})")
+                return batch.id
+        except NotFoundError:
+            pass
+
+    batch = await client.messages.batches.create(
+        requests=[{"custom_id": custom_id, "params": params} for custom_id, params in requests.items()]
+    )
+    print(f"  [llm] {label}: submitted batch {batch.id} ({len(requests)} requests)")
+    state = _load_state()
+    state[fingerprint] = {"batch_id": batch.id, "submitted_at": time.time(), "requests": len(requests)}
+    _save_state(state)
+    return batch.id
+
+
+def _forget(requests: dict[str, dict]) -> None:
+    state = _load_state()
+    if state.pop(_fingerprint(list(requests)), None) is not None:
+        _save_state(state)
+
+
+async def _run_chunk(
+    client: AsyncAnthropic,
+    requests: dict[str, dict],
+    label: str,
+    on_result: Callable[[str, str | Exception], None],
+) -> None:
+    """Submit (or resume) one batch, poll until it ends, stream its results."""
+    batch_id = await _submit_or_resume(client, requests, label)
+
+    delay = POLL_INITIAL_SECONDS
+    while True:
+        batch = await client.messages.batches.retrieve(batch_id)
+        if batch.processing_status == "ended":
+            break
+        counts = batch.request_counts
+        print(f"  [llm] {label}: {batch.processing_status}, {counts.processing} processing, "
+              f"{counts.succeeded} succeeded (next poll in {delay:.0f}s)")
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, POLL_MAX_SECONDS)
+
+    async for entry in await client.messages.batches.results(batch_id):
+        if entry.custom_id not in requests:
+            continue
+        result = entry.result
+        if result.type == "succeeded":
+            text = next((block.text for block in result.message.content if block.type == "text"), None)
+            if text is None:
+                # e.g. stop_reason "refusal" or max_tokens hit before any text
+                on_result(entry.custom_id, BatchItemError(f"no text in response ({result.message.stop_reason})"))
+            else:
+                on_result(entry.custom_id, text.strip())
+        else:
+            detail = getattr(getattr(result, "error", None), "error", None)
+            on_result(entry.custom_id, BatchItemError(f"{result.type}: {detail}" if detail else result.type))
+    _forget(requests)
+
+
+async def run_batches(
+    client: AsyncAnthropic,
+    requests: dict[str, dict],
+    on_result: Callable[[str, str | Exception], None],
+) -> None:
+    """Run {custom_id: Messages params} through the Message Batches API.
+
+    on_result(custom_id, text_or_error) is called as results stream back.
+    Requests are split into jobs of at most MAX_BATCH_REQUESTS, polled
+    concurrently with exponential backoff.
+    """
+    ids = list(requests)
+    chunks = [
+        {custom_id: requests[custom_id] for custom_id in ids[i : i + MAX_BATCH_REQUESTS]}
+        for i in range(0, len(ids), MAX_BATCH_REQUESTS)
+    ]
+    await asyncio.gather(
+        *(_run_chunk(client, chunk, f"batch {n}/{len(chunks)}", on_result) for n, chunk in enumerate(chunks, 1))
+    )
@@ -0,0 +1,170 @@
+"""Persistent on-disk cache for Claude responses.
+
+Responses are stored in a single SQLite file keyed by a hash of
+(model, system, rendered prompt, max_tokens, stop sequences). Entries belong to a
+namespace — one per pipeline step — and each namespace remembers a hash of
+the prompt template it was filled with. Binding a namespace to a different
+template hash drops that namespace's entries only, so editing
+CLASSIFICATION_PROMPT invalidates step 3 and nothing else.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = PIPELINE_DIR / "data" / "cache" / "llm.sqlite"
+
+DEFAULT_NAMESPACE = "default"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    namespace   TEXT NOT NULL,
+    response    TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_namespace ON responses (namespace);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE TABLE IF NOT EXISTS namespaces (
+    namespace     TEXT PRIMARY KEY,
+    template_hash TEXT NOT NULL
+);
+"""
+
+
+def _hash(*parts: object) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def request_key(model: str, system: str, prompt: str, max_tokens: int, stop: tuple[str, ...] = ()) -> str:
+    """Return the cache key for one Messages request."""
+    return _hash(model, system, prompt, max_tokens, *stop)
+
+
+class LLMCache:
+    """SQLite-backed response cache with hit/miss counters and LRU/age eviction."""
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        max_entries: int = 200_000,
+        max_age_seconds: float = 30 * 86400,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._writes_since_evict = 0
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def bind_namespace(self, namespace: str, template: str) -> int:
+        """Tie namespace to a prompt template, dropping its entries if the template changed.
+
+        Returns the number of entries invalidated.
+        """
+        template_hash = _hash(template)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT template_hash FROM namespaces WHERE namespace = ?", (namespace,)
+            ).fetchone()
+            if row is not None and row[0] == template_hash:
+                return 0
+            removed = 0
+            if row is not None:
+                removed = self._conn.execute(
+                    "DELETE FROM responses WHERE namespace = ?", (namespace,)
+                ).rowcount
+            self._conn.execute(
+                "INSERT OR REPLACE INTO namespaces (namespace, template_hash) VALUES (?, ?)",
+                (namespace, template_hash),
+            )
+            self._conn.commit()
+        return removed
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for key, counting the hit or miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str, namespace: str = DEFAULT_NAMESPACE) -> None:
+        """Store a response under key."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, namespace, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, response, now, now),
+            )
+            self._conn.commit()
+            self._writes_since_evict += 1
+            evict_due = self._writes_since_evict >= 500
+        if evict_due:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drop expired entries, then least-recently-used ones above max_entries."""
+        with self._lock:
+            self._writes_since_evict = 0
+            removed = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+            ).rowcount
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            if count > self.max_entries:
+                removed += self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                ).rowcount
+            self._conn.commit()
+        return removed
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and per-namespace entry counts."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT namespace, COUNT(*) FROM responses GROUP BY namespace"
+            ).fetchall()
+        return {"hits": self.hits, "misses": self.misses, "entries": dict(rows)}
+
+
+_cache: LLMCache | None = None
+
+
+def get_cache() -> LLMCache | None:
+    """Lazy-init the process-wide LLM cache. Returns None if disabled."""
+    global _cache
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    if _cache is None:
+        _cache = LLMCache(
+            path=os.getenv("LLM_CACHE_PATH", str(DEFAULT_CACHE_PATH)),
+            max_entries=200_000,
+            max_age_seconds=30 * 86400,
+        )
+    return _cache
@@ -0,0 +1,64 @@
+"""Packing several items into one Messages request (AsyncClassifier's pack mode).
+
+The step instructions are rendered once, followed by numbered <listing>
+blocks; split_answers() maps the "### N" answers back to items, and the
+caller re-sends any item whose answer is missing or malformed.
+"""
+
+import os
+import re
+from string import Formatter
+
+PACK_SIZE = int(os.getenv("LLM_PACK", "1"))  # most items per request; 1 = packing off
+PACK_INPUT_TOKENS = 8000  # estimated prompt tokens per pack
+PACK_LINGER = 0.2  # seconds a partial pack waits for more items
+PACK_MAX_OUTPUT_TOKENS = 8192
+HEADER_TOKENS = 8  # output tokens per "### N" header and separator
+
+_NOTE = """
+
+---
+The instructions above apply to each of the {count} listings below, one listing at a time. \
+Wherever they refer to a field in [brackets], use that listing's own value.
+Answer every listing, in order. Start each answer with a line containing only ### and the \
+listing number (for example: ### 1), followed by the answer in exactly the format requested \
+above and nothing else.
+"""
+
+_HEADER = re.compile(r"^[ \t]*#{2,4}[ \t]*(?:listing[ \t]*)?(\d+)[ \t]*:?[ \t]*$", re.MULTILINE | re.IGNORECASE)
+
+
+def template_fields(template: str) -> list[str]:
+    """Return the {field} names used by a prompt template, in order."""
+    return list(dict.fromkeys(name for _, name, _, _ in Formatter().parse(template) if name))
+
+
+def pack_prompt(template: str, items: list[dict]) -> str:
+    """Render one prompt asking for an answer to each of items."""
+    fields = template_fields(template)
+    instructions = template.format_map({name: f"[{name}: given in each listing below]" for name in fields})
+    blocks = []
+    for n, item in enumerate(items, 1):
+        if len(fields) == 1:
+            body = str(item[fields[0]])
+        else:
+            body = "\n".join(f"{name}: {item[name]}" for name in fields)
+        blocks.append(f'<listing id="{n}">\n{body}\n</listing>')
+    return instructions + _NOTE.format(count=len(items)) + "\n" + "\n\n".join(blocks)
+
+
+def split_answers(text: str, count: int) -> dict[int, str]:
+    """Map item position (0-based) -> answer text for each listing answered exactly once."""
+    headers = list(_HEADER.finditer(text))
+    answers: dict[int, str] = {}
+    repeated: set[int] = set()
+    for i, header in enumerate(headers):
+        n = int(header.group(1)) - 1
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(text)
+        answer = text[header.end() : end].strip()
+        if not 0 <= n < count:
+            continue
+        if n in answers:
+            repeated.add(n)
+        answers[n] = answer
+    return {n: answer for n, answer in answers.items() if answer and n not in repeated}
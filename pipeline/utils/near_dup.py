@@ -0,0 +1,102 @@
+"""Near-duplicate detection for LLM items: MinHash signatures and an LSH index.
+
+NearDupIndex groups items whose trimmed text is near-identical (franchise and
+template sites), so utils.stream sends one per group to the LLM.
+"""
+
+import os
+import re
+import zlib
+from collections.abc import Hashable
+
+import numpy as np
+
+NEAR_DEDUP = os.getenv("LLM_NEAR_DEDUP", "1") != "0"
+THRESHOLD = 0.9
+SHINGLE_WORDS = 5
+NUM_PERM = 128
+LSH_BANDS = 32  # 4 rows per band: candidates from ~0.45 similarity up, confirmed exactly
+
+_PRIME = np.uint64(4294967311)  # smallest prime above 2**32
+_rng = np.random.default_rng(20240611)
+_A = _rng.integers(1, 2**32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, 2**32, NUM_PERM, dtype=np.uint64)
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def shingles(text: str, size: int = SHINGLE_WORDS) -> set[int]:
+    """Return the crc32 hashes of text's `size`-word shingles."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {zlib.crc32(" ".join(words[i : i + size]).encode("utf-8")) for i in range(len(words) - size + 1)}
+
+
+def minhash(hashes: set[int]) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint64 values) of a non-empty shingle set."""
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    return ((values[:, None] * _A + _B) % _PRIME).min(axis=0)
+
+
+def jaccard(a: set[int], b: set[int]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class NearDupIndex:
+    """LSH index of representative items; match() groups each new item with one of them.
+
+        index = NearDupIndex()
+        rep = index.match(key, {"content": text})  # None: key is now a representative
+    """
+
+    def __init__(self, threshold: float = THRESHOLD, bands: int = LSH_BANDS, field: str = "content") -> None:
+        self.threshold = threshold
+        self.bands = bands
+        self.field = field
+        self.matched = 0
+        self._buckets: dict[tuple, list[Hashable]] = {}
+        self._shingles: dict[Hashable, set[int]] = {}
+        self._bucket_keys: dict[Hashable, list[tuple]] = {}
+
+    def _bucket_keys_for(self, item: dict, hashes: set[int]) -> list[tuple]:
+        scope = tuple(sorted((name, str(value)) for name, value in item.items() if name != self.field))
+        signature = minhash(hashes)
+        rows = NUM_PERM // self.bands
+        return [(scope, band, signature[band * rows : (band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def match(self, key: Hashable, item: dict) -> Hashable | None:
+        """Return the representative item is a near-duplicate of, or None.
+
+        An item that matches nothing becomes a representative itself. Items
+        with no words in `field` never match.
+        """
+        hashes = shingles(str(item.get(self.field, "")))
+        if not hashes:
+            return None
+        bucket_keys = self._bucket_keys_for(item, hashes)
+        best, best_score = None, self.threshold
+        seen: set[Hashable] = set()
+        for bucket in bucket_keys:
+            for rep in self._buckets.get(bucket, ()):
+                if rep in seen:
+                    continue
+                seen.add(rep)
+                score = jaccard(hashes, self._shingles[rep])
+                if score >= best_score:
+                    best, best_score = rep, score
+        if best is not None:
+            self.matched += 1
+            return best
+        self._shingles[key] = hashes
+        self._bucket_keys[key] = bucket_keys
+        for bucket in bucket_keys:
+            self._buckets.setdefault(bucket, []).append(key)
+        return None
+
+    def discard(self, key: Hashable) -> None:
+        """Stop offering key as a representative (e.g. its LLM request failed)."""
+        for bucket in self._bucket_keys.pop(key, ()):
+            members = self._buckets.get(bucket, [])
+            if key in members:
+                members.remove(key)
+        self._shingles.pop(key, None)
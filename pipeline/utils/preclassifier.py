@@ -0,0 +1,360 @@
+"""Local pre-classifier: settle clear-cut pages on the CPU, send the rest to Claude.
+
+A logistic regression over hashed word features, trained on Claude's step 3
+answers. It settles a page only once it agrees with Claude on enough held-out
+pages, and a share of its answers is audited against Claude.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sqlite3
+import time
+import zlib
+from collections import Counter
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent
+CACHE_DIR = PIPELINE_DIR / "data" / "cache"
+
+PRECLASSIFIER = os.getenv("PRECLASSIFIER", "1") != "0"
+MARGIN = float(os.getenv("PRECLASSIFIER_MARGIN", "0.6"))
+AUDIT_RATE = float(os.getenv("PRECLASSIFIER_AUDIT", "0.05"))
+MIN_EXAMPLES = int(os.getenv("PRECLASSIFIER_MIN_EXAMPLES", "500"))
+MIN_AGREEMENT = 0.97
+MIN_COVERAGE = 0.25
+MIN_CONFIDENCE = 70  # Claude answers below this are not learned from
+AUDIT_MIN = 20  # audits before the agreement can stop the model
+HOLDOUT_MIN = 30  # held-out pages above margin before the agreement can trust the model
+MAX_EXAMPLES = 20000  # newest examples kept and trained on
+HOLDOUT = 0.2
+EPOCHS = 6
+FEATURE_BITS = 18
+
+EVIDENCE = "Local pre-classifier"  # evidence prefix of locally settled rows
+
+_MASK = (1 << FEATURE_BITS) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    key      TEXT PRIMARY KEY,
+    label    TEXT NOT NULL,
+    content  BLOB NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS examples_added_at ON examples (added_at);
+"""
+
+
+def features(text: str) -> tuple[np.ndarray, np.ndarray]:
+    """Hashed word unigrams and bigrams of text: (bucket indices, L2-normalised log counts)."""
+    words = _WORD.findall(text.lower())
+    grams = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+    hashed = np.fromiter((zlib.crc32(g.encode("utf-8")) & _MASK for g in grams), dtype=np.int64, count=len(grams))
+    buckets, counts = np.unique(hashed, return_counts=True)
+    values = 1.0 + np.log(counts.astype(np.float32))
+    return buckets, values / np.linalg.norm(values)
+
+
+def _softmax(scores: np.ndarray) -> np.ndarray:
+    scores = np.exp(scores - scores.max())
+    return scores / scores.sum()
+
+
+@dataclass
+class LinearModel:
+    """Multinomial logistic regression over hashed features."""
+
+    labels: tuple[str, ...]
+    weights: np.ndarray  # (labels, 2**FEATURE_BITS)
+    bias: np.ndarray
+    meta: dict = field(default_factory=dict)
+
+    def probabilities(self, x: tuple[np.ndarray, np.ndarray]) -> np.ndarray:
+        buckets, values = x
+        return _softmax(self.weights[:, buckets] @ values + self.bias)
+
+    def predict(self, x: tuple[np.ndarray, np.ndarray]) -> tuple[str, float, float]:
+        """Return (label, probability, margin over the runner-up)."""
+        p = self.probabilities(x)
+        second, top = np.argsort(p)[-2:]
+        return self.labels[top], float(p[top]), float(p[top] - p[second])
+
+    @classmethod
+    def fit(cls, labels: tuple[str, ...], examples: list, epochs: int = EPOCHS, seed: int = 0) -> "LinearModel":
+        """SGD on [(features, label)], with a learning rate that decays per epoch."""
+        weights = np.zeros((len(labels), 1 << FEATURE_BITS), dtype=np.float32)
+        bias = np.zeros(len(labels), dtype=np.float32)
+        targets = [labels.index(label) for _, label in examples]
+        rng = np.random.default_rng(seed)
+        for epoch in range(epochs):
+            rate = 0.5 / (1 + epoch)
+            for i in rng.permutation(len(examples)):
+                buckets, values = examples[i][0]
+                grad = _softmax(weights[:, buckets] @ values + bias)
+                grad[targets[i]] -= 1.0
+                weights[:, buckets] -= rate * np.outer(grad, values)
+                bias -= rate * grad
+        return cls(labels, weights, bias)
+
+    def save(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        np.savez_compressed(tmp, weights=self.weights, bias=self.bias, labels=np.array(self.labels),
+                            meta=np.array(json.dumps(self.meta)))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, labels: tuple[str, ...]) -> "LinearModel | None":
+        """The saved model, or None if there is none or it was trained for other labels or features."""
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            model = cls(tuple(str(label) for label in data["labels"]), data["weights"], data["bias"],
+                        json.loads(str(data["meta"])))
+        if model.labels != tuple(labels) or model.weights.shape[1] != 1 << FEATURE_BITS:
+            return None
+        return model
+
+
+def agreement(model: LinearModel, holdout: list, margin: float) -> tuple[float, int]:
+    """(agreement with the labels, number of pages) for the holdout pages scored above margin."""
+    above = agreed = 0
+    for x, label in holdout:
+        predicted, _, gap = model.predict(x)
+        if gap >= margin:
+            above += 1
+            agreed += predicted == label
+    return (agreed / above if above else 0.0), above
+
+
+class ExampleStore:
+    """SQLite store of (content, label) examples, one row per distinct content."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def add(self, content: str, label: str) -> None:
+        """Store an example; the same content learned again takes the newer label."""
+        key = hashlib.sha256(content.encode("utf-8")).hexdigest()[:24]
+        self._conn.execute(
+            "INSERT OR REPLACE INTO examples (key, label, content, added_at) VALUES (?, ?, ?, ?)",
+            (key, label, zlib.compress(content.encode("utf-8")), time.time()),
+        )
+        self._conn.commit()
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM examples").fetchone()[0]
+
+    def newest(self, limit: int = MAX_EXAMPLES) -> list[tuple[str, str]]:
+        """The newest examples as [(content, label)]; older ones are deleted."""
+        rows = self._conn.execute(
+            "SELECT content, label FROM examples ORDER BY added_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        self._conn.execute(
+            "DELETE FROM examples WHERE key NOT IN (SELECT key FROM examples ORDER BY added_at DESC LIMIT ?)",
+            (limit,),
+        )
+        self._conn.commit()
+        return [(zlib.decompress(content).decode("utf-8"), label) for content, label in rows]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+@dataclass
+class PreClassifierReport:
+    """What the pre-classifier settled, sent on, and how often Claude agreed."""
+
+    scored: int = 0
+    seconds: float = 0.0  # feature hashing + scoring
+    settled: int = 0  # LLM calls avoided
+    below_margin: int = 0
+    unscored: int = 0  # sent to Claude because the model is missing, untrusted or drifted
+    audited: int = 0
+    agreed: int = 0
+    disagreements: Counter = field(default_factory=Counter)  # (local label, Claude's label) -> pages
+    learned: int = 0
+
+    @property
+    def agreement(self) -> float:
+        return self.agreed / self.audited if self.audited else 0.0
+
+    def summary(self) -> str:
+        sent = self.below_margin + self.unscored + self.audited
+        text = f"[preclassifier] {self.settled}/{self.settled + sent} pages settled locally (LLM calls avoided)"
+        if self.scored:
+            rate = self.scored / self.seconds if self.seconds else float("inf")
+            text += f"; {self.scored} scored in {self.seconds:.2f}s ({rate:,.0f} pages/s)"
+        text += f"; sent to Claude: {self.below_margin} below margin, {self.audited} audits"
+        if self.unscored:
+            text += f", {self.unscored} unscored"
+        if self.audited:
+            text += f"; audit agreement {self.agreed}/{self.audited} ({self.agreement:.1%})"
+            if self.disagreements:
+                text += " (" + ", ".join(f"{a} -> {b} {n}" for (a, b), n in self.disagreements.most_common()) + ")"
+        return text + f"; {self.learned} new labels learned"
+
+
+class PreClassifier:
+    """Routes pages between a local linear model and Claude, and learns from Claude's answers."""
+
+    def __init__(
+        self,
+        namespace: str,
+        labels: tuple[str, ...],
+        margin: float = MARGIN,
+        audit_rate: float = AUDIT_RATE,
+        min_examples: int = MIN_EXAMPLES,
+        min_agreement: float = MIN_AGREEMENT,
+        min_coverage: float = MIN_COVERAGE,
+        cache_dir: str | Path = CACHE_DIR,
+        seed: int | None = None,
+    ) -> None:
+        self.labels = tuple(labels)
+        self.margin = margin
+        self.audit_rate = audit_rate
+        self.min_examples = min_examples
+        self.min_agreement = min_agreement
+        self.min_coverage = min_coverage
+        self.store = ExampleStore(Path(cache_dir) / f"{namespace}_examples.sqlite")
+        self.model_path = Path(cache_dir) / f"{namespace}_classifier.npz"
+        self.model = LinearModel.load(self.model_path, self.labels)
+        self.report = PreClassifierReport()
+        self.drifted = False
+        self._sent: dict = {}  # key -> content sent to Claude, until its answer is learned
+        self._audits: dict = {}  # key -> local label of a page audited against Claude
+        self._rng = random.Random(seed)
+
+    @property
+    def trusted(self) -> bool:
+        """Whether the model may settle pages: trained on enough examples and validated on enough pages."""
+        if self.model is None or self.drifted:
+            return False
+        meta = self.model.meta
+        return (
+            meta.get("examples", 0) >= self.min_examples
+            and meta.get("covered", 0) >= HOLDOUT_MIN
+            and meta.get("coverage", 0.0) >= self.min_coverage
+            and meta.get("agreement", 0.0) >= self.min_agreement
+        )
+
+    def route(self, key: Hashable, content: str) -> tuple[str, float] | None:
+        """Settle content locally as (label, probability), or return None to send it to Claude."""
+        if not self.trusted:
+            self.report.unscored += 1
+            self._sent[key] = content
+            return None
+        started = time.perf_counter()
+        label, probability, gap = self.model.predict(features(content))
+        self.report.seconds += time.perf_counter() - started
+        self.report.scored += 1
+        if gap < self.margin:
+            self.report.below_margin += 1
+        elif self._rng.random() < self.audit_rate:
+            self._audits[key] = label
+        else:
+            self.report.settled += 1
+            return label, probability
+        self._sent[key] = content
+        return None
+
+    def learn(self, key: Hashable, label: str, confidence: int, evidence: str = "") -> None:
+        """Take Claude's final answer for a page route() sent on: check audits, store the example."""
+        content = self._sent.pop(key, None)
+        local = self._audits.pop(key, None)
+        if local is not None:
+            self.report.audited += 1
+            if local == label:
+                self.report.agreed += 1
+            else:
+                self.report.disagreements[local, label] += 1
+            self._check_drift()
+        if content is not None and self.add_example(content, label, confidence, evidence):
+            self.report.learned += 1
+
+    def forget(self, key: Hashable) -> None:
+        """Drop what route() kept for a page that will get no answer to learn from."""
+        self._sent.pop(key, None)
+        self._audits.pop(key, None)
+
+    def add_example(self, content: str, label: str, confidence: int, evidence: str = "") -> bool:
+        """Store a Claude-labelled page; False if not learnable (locally settled rows never are)."""
+        if label not in self.labels or confidence < MIN_CONFIDENCE or evidence.startswith(EVIDENCE):
+            return False
+        self.store.add(content, label)
+        return True
+
+    def _check_drift(self) -> None:
+        report = self.report
+        if self.drifted or report.audited < AUDIT_MIN or report.agreement >= self.min_agreement:
+            return
+        self.drifted = True
+        print(f"  [preclassifier] Audit agreement {report.agreement:.1%} is below {self.min_agreement:.0%}: "
+              f"sending the remaining pages to Claude; the model is retrained after this run")
+
+    def train(self) -> bool:
+        """Train on the newest stored examples, validate on a held-out share, and save; False if too few."""
+        rows = self.store.newest(MAX_EXAMPLES)
+        if len(rows) < 2 or len({label for _, label in rows}) < 2:
+            return False
+        started = time.perf_counter()
+        examples = [(features(content), label) for content, label in rows]
+        random.Random(len(examples)).shuffle(examples)
+        cut = max(1, int(len(examples) * HOLDOUT))
+        probe = LinearModel.fit(self.labels, examples[cut:])
+        agreed, covered = agreement(probe, examples[:cut], self.margin)
+        coverage = covered / cut
+        self.model = LinearModel.fit(self.labels, examples)
+        self.model.meta = {
+            "examples": len(examples),
+            "agreement": agreed,
+            "covered": covered,
+            "coverage": coverage,
+            "margin": self.margin,
+            "trained_at": time.time(),
+        }
+        self.model.save(self.model_path)
+        self.drifted = False
+        print(f"  [preclassifier] Trained on {len(examples)} examples in {time.perf_counter() - started:.1f}s: "
+              f"held-out agreement {agreed:.1%} on the {covered} pages ({coverage:.0%}) above margin {self.margin:.2f}"
+              + ("" if self.trusted else " (not trusted yet: every page goes to Claude)"))
+        return True
+
+    def seed(self, examples: Iterable[tuple[str, str, int, str]]) -> None:
+        """Learn from earlier runs' answers, [(content, label, confidence, evidence)], and train if useful."""
+        added = sum(self.add_example(*example) for example in examples)
+        if added:
+            print(f"  [preclassifier] Seeded {added} examples from earlier answers")
+            self.train()
+
+    def finish(self) -> None:
+        """Retrain if this run brought new labels or the model drifted."""
+        if self.report.learned or self.drifted:
+            self.train()
+
+    def close(self) -> None:
+        self.store.close()
+
+    def describe(self) -> str:
+        """One line about the current model."""
+        if self.model is None:
+            return f"[preclassifier] No model yet ({self.store.count()} examples, {self.min_examples} needed)"
+        meta = self.model.meta
+        state = "trusted" if self.trusted else "not trusted"
+        return (f"[preclassifier] Model {state}: {meta.get('examples', 0)} examples, held-out agreement "
+                f"{meta.get('agreement', 0.0):.1%} on {meta.get('covered', 0)} pages "
+                f"({meta.get('coverage', 0.0):.0%} of the holdout, {self.min_coverage:.0%} needed)")
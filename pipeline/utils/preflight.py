@@ -0,0 +1,214 @@
+"""Pre-flight liveness probe: rule out dead, parked and social-only sites before crawling.
+
+preflight() checks DNS and a short GET per URL; negative verdicts are kept
+in the crawl cache for CRAWL_PREFLIGHT_TTL_DAYS.
+"""
+
+import asyncio
+import os
+import re
+import socket
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from utils.crawl_cache import get_cache, get_mode
+from utils.fetch_policy import DEAD, PARKED, SOCIAL, USER_AGENT
+from utils.scheduler import KeyedThrottle, sliding_window
+from utils.urls import registrable_domain
+
+PREFLIGHT = os.getenv("CRAWL_PREFLIGHT", "1") != "0"
+CONCURRENCY = 50
+TIMEOUT = 5.0
+MAX_BYTES = 64 * 1024
+MAX_REDIRECTS = 5
+PER_DOMAIN_CONCURRENCY = 2
+
+LIVE = "live"
+
+SOCIAL_DOMAINS = {
+    "facebook.com", "fb.com", "fb.me", "instagram.com", "twitter.com", "x.com", "tiktok.com", "linktr.ee",
+    "youtube.com", "pinterest.com", "nextdoor.com",
+}
+# Domain marketplaces and parking services that expired domains redirect to
+PARKING_DOMAINS = {
+    "sedoparking.com", "sedo.com", "parkingcrew.net", "bodis.com", "afternic.com", "dan.com", "hugedomains.com",
+    "above.com", "parklogic.com", "domainmarket.com", "undeveloped.com", "buydomains.com", "uniregistry.com",
+    "parked.com", "dsparking.com", "domainnamesales.com", "squadhelp.com", "atom.com",
+}
+_PARKING_TEXT = re.compile(
+    r"\b(?:this|the) domain(?: name)? (?:is|may be|might be) (?:for sale|available for purchase|parked)|"
+    r"buy this domain|this domain has (?:expired|been registered)|domain (?:is )?parked|parked free|"
+    r"sedoparking|parkingcrew|bodis\.com|hugedomains|afternic",
+    re.IGNORECASE,
+)
+
+# getaddrinfo errors that mean "no such name", as opposed to a resolver hiccup
+_NO_SUCH_NAME = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+Resolver = Callable[[str], Awaitable[list[str]]]
+
+
+@dataclass
+class Probe:
+    """The pre-flight verdict for one URL."""
+
+    url: str
+    verdict: str = LIVE  # live, or one of DEAD, PARKED, SOCIAL
+    detail: str = ""
+    lasting: bool = True  # worth keeping in the negative cache
+    cached: bool = False
+
+    @property
+    def live(self) -> bool:
+        return self.verdict == LIVE
+
+
+async def system_resolver(host: str) -> list[str]:
+    """Resolve host with the system resolver."""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+def _platform(host: str, domains: set[str]) -> str | None:
+    """Return host's registrable domain if it is one of domains."""
+    domain = registrable_domain(host) if host else ""
+    return domain if domain in domains else None
+
+
+def _caused_by(exc: BaseException, kind: type[BaseException]) -> bool:
+    seen: set[int] = set()
+    current: BaseException | None = exc
+    while current is not None and id(current) not in seen:
+        if isinstance(current, kind):
+            return True
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class Prober:
+    """Probes URLs: DNS first, then a short GET that follows redirects hop by hop.
+
+    Each host is resolved once per Prober. Must be used from a single event
+    loop; close() releases the HTTP connections.
+    """
+
+    def __init__(self, resolver: Resolver | None = None, timeout: float = TIMEOUT) -> None:
+        self.resolver = resolver or system_resolver
+        self.timeout = timeout
+        self._lookups: dict[str, asyncio.Future] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=False,
+                timeout=self.timeout,
+                headers={"User-Agent": USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=32),
+            )
+        return self._client
+
+    async def _lookup(self, host: str) -> str | None:
+        try:
+            addresses = await asyncio.wait_for(self.resolver(host), self.timeout)
+        except socket.gaierror as e:
+            return "no DNS record" if e.errno in _NO_SUCH_NAME else None
+        except (asyncio.TimeoutError, OSError):
+            return None
+        return None if addresses else "no DNS record"
+
+    async def _resolve(self, host: str) -> str | None:
+        """Return why host is dead, or None if it resolves (or the resolver could not tell)."""
+        if host not in self._lookups:
+            self._lookups[host] = asyncio.ensure_future(self._lookup(host))
+        return await self._lookups[host]
+
+    async def _follow(self, url: str) -> Probe:
+        current = url
+        for _ in range(MAX_REDIRECTS + 1):
+            async with self._http().stream("GET", current) as response:
+                if response.is_redirect and "location" in response.headers:
+                    current = urljoin(current, response.headers["location"])
+                    host = urlsplit(current).hostname or ""
+                    if domain := _platform(host, SOCIAL_DOMAINS):
+                        return Probe(url, SOCIAL, f"redirects to {domain}")
+                    if domain := _platform(host, PARKING_DOMAINS):
+                        return Probe(url, PARKED, f"redirects to {domain}")
+                    continue
+                if response.status_code >= 400 or "html" not in response.headers.get("content-type", "html"):
+                    return Probe(url, detail=f"HTTP {response.status_code}")
+                body = bytearray()
+                async for chunk in response.aiter_bytes():
+                    body += chunk
+                    if len(body) >= MAX_BYTES:
+                        break
+                html = body.decode(response.encoding or "utf-8", errors="replace")
+            if _PARKING_TEXT.search(html):
+                return Probe(url, PARKED, "parking page")
+            return Probe(url)
+        return Probe(url, detail="too many redirects")
+
+    async def probe(self, url: str) -> Probe:
+        """Return the verdict for url. Inconclusive probes come back live."""
+        host = (urlsplit(url if "://" in url else f"http://{url}").hostname or "").lower()
+        if not host:
+            return Probe(url, detail="no host")
+        if domain := _platform(host, SOCIAL_DOMAINS):
+            return Probe(url, SOCIAL, domain)
+        dead = await self._resolve(host)
+        if dead:
+            return Probe(url, DEAD, dead)
+        try:
+            return await asyncio.wait_for(self._follow(url), self.timeout * 2)
+        except httpx.ConnectTimeout:
+            return Probe(url, DEAD, "connect timeout", lasting=False)
+        except (httpx.HTTPError, asyncio.TimeoutError, OSError, UnicodeError, LookupError) as e:
+            if _caused_by(e, ConnectionRefusedError):
+                return Probe(url, DEAD, "connection refused", lasting=False)
+            return Probe(url, detail=f"inconclusive ({type(e).__name__})")
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+async def preflight(
+    urls: list[str], concurrency: int = CONCURRENCY, resolver: Resolver | None = None
+) -> dict[str, Probe]:
+    """Probe urls, return {url: Probe}.
+
+    Negative verdicts are served from and written to the crawl cache's
+    probes table (ignored in refresh mode, like cached pages).
+    """
+    cache = get_cache()
+    probes: dict[str, Probe] = {}
+    todo: list[str] = []
+    for url in urls:
+        entry = cache.get_probe(url) if cache is not None and get_mode() != "refresh" else None
+        if entry is not None:
+            probes[url] = Probe(url, entry.verdict, entry.detail, cached=True)
+        else:
+            todo.append(url)
+    if not todo:
+        return probes
+
+    prober = Prober(resolver)
+    throttle = KeyedThrottle(PER_DOMAIN_CONCURRENCY, 0)
+
+    async def probe(url: str) -> Probe:
+        async with throttle.slot(registrable_domain(url)):
+            return await prober.probe(url)
+
+    try:
+        async for result in sliding_window(todo, probe, concurrency):
+            probes[result.url] = result
+            if cache is not None and not result.live and result.lasting:
+                cache.put_probe(result.url, result.verdict, result.detail)
+    finally:
+        await prober.close()
+    return probes
@@ -0,0 +1,82 @@
+"""Row filters step 2 applies to every raw-export chunk.
+
+filter_chunk runs inside utils.ingest's worker processes. It lives here,
+not in step2_clean.py, so a spawned worker (the default on macOS and
+Windows) can import it by module name instead of re-running the step
+script as __main__.
+"""
+
+import re
+from pathlib import Path
+
+import pandas as pd
+
+PIPELINE_DIR = Path(__file__).resolve().parent.parent
+CHAINS_PATH = PIPELINE_DIR / "chains.txt"
+
+REQUIRED_COLUMNS = ["name", "full_address", "city", "state"]
+CLOSED_STATUSES = ["CLOSED_PERMANENTLY", "PERMANENTLY_CLOSED"]
+
+
+def load_chain_names(path: Path = CHAINS_PATH) -> list[str]:
+    """Read the chain list: one name per line, # comments and blank lines skipped."""
+    names = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        line = line.strip().lower()
+        if line and not line.startswith("#"):
+            names.append(line)
+    return names
+
+
+def compile_chain_pattern(names: list[str]) -> str:
+    """One alternation over every chain name (longest first), matched as whole words.
+
+    Letters match in any case, but a name also ends or starts where a capitalized
+    word runs into it ("PetSmartGrooming", "UnleashedByPetco"), words of a name may
+    be run together or hyphenated ("Pet-Valu"), and an apostrophe in a name is
+    optional ("Krisers"). Match against _matchable() names.
+    """
+    alternatives = "|".join(
+        r"[\s-]*".join(re.escape(word).replace("'", "['’]?") for word in name.split())
+        for name in sorted(set(names), key=len, reverse=True)
+    )
+    return rf"(?:(?<![A-Za-z0-9])|(?<=[a-z])(?=[A-Z]))(?i:{alternatives})(?![a-z])"
+
+
+CHAIN_NAMES = load_chain_names()
+CHAIN_PATTERN = compile_chain_pattern(CHAIN_NAMES)
+_CHAIN_RE = re.compile(CHAIN_PATTERN)
+
+
+def _matchable(names: pd.Series) -> pd.Series:
+    """Lowercase all-caps names, whose capitals say nothing about where words start."""
+    return names.where(~names.str.isupper().fillna(False).astype(bool), names.str.lower())
+
+
+def is_chain(name: str) -> bool:
+    """Check if a business name matches a known chain."""
+    return _CHAIN_RE.search(name.lower() if name.isupper() else name) is not None
+
+
+def chain_mask(names: pd.Series, pattern: str = CHAIN_PATTERN) -> pd.Series:
+    """Vectorized is_chain over a column of names."""
+    return _matchable(names).str.contains(pattern, regex=True).fillna(False).astype(bool)
+
+
+def filter_chunk(df: pd.DataFrame) -> tuple[pd.DataFrame, dict[str, int]]:
+    """Drop rows missing required fields, closed businesses and chains from one raw chunk."""
+    removed = {}
+
+    before = len(df)
+    df = df.dropna(subset=[c for c in REQUIRED_COLUMNS if c in df.columns])
+    removed["missing"] = before - len(df)
+
+    before = len(df)
+    if "business_status" in df.columns:
+        df = df[~df["business_status"].str.upper().isin(CLOSED_STATUSES).fillna(False)]
+    removed["closed"] = before - len(df)
+
+    before = len(df)
+    df = df[~chain_mask(df["name"])]
+    removed["chains"] = before - len(df)
+    return df, removed
@@ -0,0 +1,127 @@
+"""Async scheduling helpers shared by the crawler and LLM utilities."""
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+from contextlib import asynccontextmanager
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def sliding_window(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    concurrency: int,
+) -> AsyncIterator[R]:
+    """Run worker over items with `concurrency` calls always in flight.
+
+    A new item is started as soon as any running call finishes, and results
+    are yielded in completion order. Closing the iterator early cancels the
+    calls still running.
+    """
+    source = iter(items)
+    pending: set[asyncio.Future] = set()
+
+    def fill() -> None:
+        while len(pending) < concurrency:
+            try:
+                item = next(source)
+            except StopIteration:
+                return
+            pending.add(asyncio.ensure_future(worker(item)))
+
+    fill()
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            fill()
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def lock_step_batches(
+    items: Iterable[T],
+    worker: Callable[[T], Awaitable[R]],
+    batch_size: int,
+) -> AsyncIterator[R]:
+    """Run worker over fixed batches, waiting for each whole batch to finish.
+
+    This is the scheduling the crawler used before sliding_window; it is
+    kept as the baseline for benchmarks/bench_crawl_scheduler.py.
+    """
+    batch: list[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            for result in await asyncio.gather(*(worker(i) for i in batch)):
+                yield result
+            batch = []
+    if batch:
+        for result in await asyncio.gather(*(worker(i) for i in batch)):
+            yield result
+
+
+async def hedged(
+    call: Callable[[], Awaitable[R]],
+    delay: float | None,
+    accept: Callable[[R], bool] = lambda result: True,
+) -> tuple[R, bool]:
+    """Run call(); if it is still running after `delay` seconds, start a second call.
+
+    Returns (result, hedged): the first result that passes `accept`, or the
+    last one to finish if neither does. The slower call is cancelled.
+    delay=None disables hedging.
+    """
+    first = asyncio.ensure_future(call())
+    if delay is None:
+        return await first, False
+    done, _ = await asyncio.wait({first}, timeout=delay)
+    if done:
+        return first.result(), False
+
+    pending = {first, asyncio.ensure_future(call())}
+    result = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if accept(result):
+                    return result, True
+        return result, True
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class KeyedThrottle:
+    """Per-key concurrency cap plus a minimum delay between starts.
+
+    Used by the crawler to stay polite to each registrable domain no matter
+    how high the global concurrency is set.
+    """
+
+    def __init__(self, max_concurrent: int = 2, min_interval: float = 1.0) -> None:
+        self.max_concurrent = max_concurrent
+        self.min_interval = min_interval
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._last_start: dict[str, float] = {}
+
+    @asynccontextmanager
+    async def slot(self, key: str) -> AsyncIterator[None]:
+        """Hold one of key's slots, waiting out the minimum start interval."""
+        sem = self._semaphores.setdefault(key, asyncio.Semaphore(self.max_concurrent))
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with sem:
+            async with lock:
+                loop = asyncio.get_running_loop()
+                wait = self._last_start.get(key, float("-inf")) + self.min_interval - loop.time()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._last_start[key] = loop.time()
+            yield
@@ -0,0 +1,260 @@
+"""Crawl -> LLM streaming for the enrichment steps.
+
+crawl_and_classify() hands each page to the step's prepare() as soon as it is
+fetched and feeds the prepared items to the LLM through a bounded queue, so
+crawling and classification overlap and raw pages are dropped right away.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Hashable
+from dataclasses import dataclass, field
+
+from utils.fetch_policy import FetchResult
+from utils.llm import AsyncClassifier, PromptTemplate, aclassify_batch
+from utils.llm_pack import PACK_SIZE
+from utils.near_dup import NEAR_DEDUP, NearDupIndex
+
+QUEUE_SIZE = 32
+
+# fetch(urls, concurrency, timeout) -> async (url, FetchResult) pairs, like utils.crawler.iter_fetch
+Fetcher = Callable[[list[str], int, int], AsyncIterator[tuple[str, FetchResult]]]
+
+_DONE = object()
+
+
+@dataclass
+class StreamResult:
+    """What happened to each row handed to crawl_and_classify."""
+
+    responses: dict = field(default_factory=dict)  # key -> response (None if the request failed)
+    uncrawled: dict = field(default_factory=dict)  # key -> failure kind, for sites that could not be fetched
+    near_duplicates: dict = field(default_factory=dict)  # key -> key whose response it was given
+    settled: int = 0  # pages prepare() finished without the LLM
+    peak_queue: int = 0
+    crawl_seconds: float = 0.0
+    seconds: float = 0.0
+
+    @property
+    def failed(self) -> list:
+        return [key for key, response in self.responses.items() if response is None]
+
+    def summary(self) -> str:
+        sent = len(self.responses)
+        shared = len(self.near_duplicates)
+        return (
+            f"[stream] {sent + shared + self.settled + len(self.uncrawled)} rows: {sent} sent to the LLM "
+            f"({len(self.failed)} failed), {shared} answered by a near-duplicate page, "
+            f"{self.settled} settled locally, {len(self.uncrawled)} not crawled"
+            f"{self._failure_kinds()}; crawl {self.crawl_seconds:.1f}s, wall {self.seconds:.1f}s, "
+            f"peak queue {self.peak_queue}"
+        )
+
+    def _failure_kinds(self) -> str:
+        if not self.uncrawled:
+            return ""
+        kinds = Counter(self.uncrawled.values())
+        return " (" + ", ".join(f"{kind} {count}" for kind, count in kinds.most_common()) + ")"
+
+
+async def acrawl_and_classify(
+    urls: dict[Hashable, str],
+    prepare: Callable[[Hashable, str], dict | None],
+    prompt_template: str | PromptTemplate,
+    on_result: Callable[[Hashable, str], None],
+    system: str = "",
+    model: str = "claude-haiku-4-5-20251001",
+    max_tokens: int = 1024,
+    cache_namespace: str | None = None,
+    mode: str = "interactive",
+    concurrency: int = 5,
+    timeout: int = 15,
+    max_concurrent: int = 64,
+    queue_size: int = QUEUE_SIZE,
+    fetch: Fetcher | None = None,
+    near_dedup: bool = NEAR_DEDUP,
+    profile: str | None = None,
+    pack: int = PACK_SIZE,
+) -> StreamResult:
+    """Async version of crawl_and_classify, for callers already inside an event loop."""
+    started = time.monotonic()
+    result = StreamResult()
+    if not urls:
+        return result
+
+    if fetch is None:
+        from utils.crawler import iter_fetch as fetch  # imports Crawl4AI
+
+    by_url: dict[str, list[Hashable]] = {}
+    for key, url in urls.items():
+        by_url.setdefault(url, []).append(key)
+
+    index = NearDupIndex() if near_dedup else None
+    followers: dict[Hashable, list[tuple[Hashable, dict]]] = {}  # representative -> its near-duplicates
+
+    async def pages():
+        """Yield (key, prepared item) for each fetched page that needs its own LLM call, as it arrives."""
+        async for url, page in fetch(list(by_url), concurrency, timeout):
+            for key in by_url.get(url, ()):
+                if not page.ok:
+                    result.uncrawled[key] = page.failure
+                    continue
+                item = prepare(key, page.text)
+                if item is None:
+                    result.settled += 1
+                    continue
+                rep = index.match(key, item) if index is not None else None
+                if rep is None:
+                    yield key, item
+                    continue
+                result.near_duplicates[key] = rep
+                if result.responses.get(rep) is not None:
+                    on_result(key, result.responses[rep])
+                else:
+                    followers.setdefault(rep, []).append((key, item))
+        result.crawl_seconds = time.monotonic() - started
+
+    if mode == "batch":
+        keys, items = [], []
+        async for key, item in pages():
+            keys.append(key)
+            items.append(item)
+        if items:
+            print(f"\n  [stream] Sending {len(items)} prepared pages as Message Batches jobs ...")
+
+            def deliver(i: int, response: str) -> None:
+                on_result(keys[i], response)
+                for key, _ in followers.get(keys[i], ()):
+                    on_result(key, response)
+
+            responses = await aclassify_batch(
+                items,
+                prompt_template,
+                system=system,
+                model=model,
+                max_tokens=max_tokens,
+                cache_namespace=cache_namespace,
+                mode="batch",
+                on_result=deliver,
+                profile=profile,
+            )
+            result.responses = dict(zip(keys, responses))
+            for rep, group in followers.items():
+                if result.responses.get(rep) is None:
+                    # Not resubmitted here: the next run classifies them (the cache keeps the rest)
+                    for key, _ in group:
+                        result.near_duplicates.pop(key)
+                        result.responses[key] = None
+        result.seconds = time.monotonic() - started
+        return result
+
+    queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    workers = max(1, max_concurrent)
+    errors: list[Exception] = []
+
+    async with AsyncClassifier(
+        prompt_template, system, model, max_concurrent=max_concurrent, max_tokens=max_tokens,
+        cache_namespace=cache_namespace, profile=profile, pack=pack,
+    ) as llm:
+
+        async def produce() -> None:
+            try:
+                async for key, item in pages():
+                    await queue.put((key, item))  # blocks while the LLM is behind
+                    result.peak_queue = max(result.peak_queue, queue.qsize())
+            finally:
+                for _ in range(workers):
+                    await queue.put(_DONE)
+
+        async def answer(key: Hashable, item: dict) -> None:
+            try:
+                response = await llm.classify(item)
+            except Exception as e:
+                errors.append(e)
+                result.responses[key] = None
+                if index is not None:
+                    index.discard(key)
+                # The first near-duplicate waiting on it takes over as the group's representative
+                group = followers.pop(key, [])
+                if group:
+                    (rep, rep_item), rest = group[0], group[1:]
+                    del result.near_duplicates[rep]
+                    for follower, _ in rest:
+                        result.near_duplicates[follower] = rep
+                    followers[rep] = rest
+                    await answer(rep, rep_item)
+                return
+            result.responses[key] = response
+            on_result(key, response)
+            for follower, _ in followers.pop(key, ()):
+                on_result(follower, response)
+
+        async def consume() -> None:
+            while (entry := await queue.get()) is not _DONE:
+                await answer(*entry)
+
+        tasks = [asyncio.ensure_future(produce())] + [asyncio.ensure_future(consume()) for _ in range(workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    if errors:
+        first = errors[0]
+        print(f"  [llm] {len(errors)}/{len(result.responses)} requests failed (first: {type(first).__name__}: {first})")
+    result.seconds = time.monotonic() - started
+    return result
+
+
+def crawl_and_classify(
+    urls: dict[Hashable, str],
+    prepare: Callable[[Hashable, str], dict | None],
+    prompt_template: str | PromptTemplate,
+    on_result: Callable[[Hashable, str], None],
+    system: str = "",
+    model: str = "claude-haiku-4-5-20251001",
+    max_tokens: int = 1024,
+    cache_namespace: str | None = None,
+    mode: str = "interactive",
+    concurrency: int = 5,
+    timeout: int = 15,
+    max_concurrent: int = 64,
+    queue_size: int = QUEUE_SIZE,
+    fetch: Fetcher | None = None,
+    near_dedup: bool = NEAR_DEDUP,
+    profile: str | None = None,
+    pack: int = PACK_SIZE,
+) -> StreamResult:
+    """Crawl each row's website and classify it as soon as its page arrives.
+
+    urls maps a row key (the DataFrame index) to its website. prepare(key,
+    page_text) returns the prompt item, or None when the row needs no LLM call.
+    on_result(key, response) is called as each response arrives. Returns a
+    StreamResult with the responses, the uncrawled keys (with their failure
+    kind) and timing.
+    """
+    result = asyncio.run(
+        acrawl_and_classify(
+            urls,
+            prepare,
+            prompt_template,
+            on_result,
+            system=system,
+            model=model,
+            max_tokens=max_tokens,
+            cache_namespace=cache_namespace,
+            mode=mode,
+            concurrency=concurrency,
+            timeout=timeout,
+            max_concurrent=max_concurrent,
+            queue_size=queue_size,
+            fetch=fetch,
+            near_dedup=near_dedup,
+            profile=profile,
+            pack=pack,
+        )
+    )
+    print(f"  {result.summary()}")
+    return result
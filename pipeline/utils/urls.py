@@ -0,0 +1,135 @@
+"""URL canonicalization and grouping for the crawler.
+
+Outscraper rows often point at the same site through different spellings:
+http vs https, www vs bare host, trailing slashes, tracking query strings.
+canonical_key() collapses those spellings so each site is fetched once.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAMS = {
+    "gclid",
+    "fbclid",
+    "msclkid",
+    "dclid",
+    "yclid",
+    "mc_cid",
+    "mc_eid",
+    "ref",
+    "y_source",
+    "_ga",
+    "hsa_acc",
+    "hsa_cam",
+    "hsa_grp",
+    "hsa_ad",
+    "hsa_src",
+    "hsa_net",
+    "hsa_ver",
+}
+
+# Second-level labels under which registrations happen one level deeper
+# (e.g. example.co.uk). Not a full public suffix list — just the suffixes
+# that show up in North American / UK / AU business listings.
+MULTI_LABEL_SUFFIXES = {
+    "co.uk",
+    "org.uk",
+    "me.uk",
+    "com.au",
+    "net.au",
+    "org.au",
+    "co.nz",
+    "com.mx",
+    "com.br",
+    "co.za",
+}
+
+
+def _split(url: str):
+    url = url.strip()
+    if "://" not in url:
+        url = f"http://{url}"
+    return urlsplit(url)
+
+
+def _clean_query(query: str) -> str:
+    """Drop tracking parameters (utm_*, gclid, ...) and sort the rest."""
+    pairs = [
+        (k, v)
+        for k, v in parse_qsl(query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    return urlencode(sorted(pairs))
+
+
+def _host(parts) -> str:
+    host = (parts.hostname or "").lower().rstrip(".")
+    port = parts.port
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    return host
+
+
+def canonical_key(url: str) -> str:
+    """Return a scheme- and www-insensitive key identifying the page behind url."""
+    parts = _split(url)
+    host = _host(parts).removeprefix("www.")
+    path = parts.path.rstrip("/")
+    query = _clean_query(parts.query)
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+def clean_url(url: str) -> str:
+    """Return url with a scheme, lowercased host, and no fragment or tracking params."""
+    parts = _split(url)
+    scheme = parts.scheme.lower()
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((scheme, _host(parts), path, _clean_query(parts.query), ""))
+
+
+def registrable_domain(url: str) -> str:
+    """Return the registrable domain of url (e.g. shop.example.co.uk -> example.co.uk)."""
+    host = (_split(url).hostname or "").lower().rstrip(".")
+    labels = host.split(".")
+    if len(labels) <= 2 or host.replace(".", "").isdigit():
+        return host
+    if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES:
+        return ".".join(labels[-3:])
+    return ".".join(labels[-2:])
+
+
+def group_urls(urls: list[str]) -> dict[str, list[str]]:
+    """Group raw URLs by canonical key, return {fetch_url: [original urls]}.
+
+    The fetch URL for each group is a cleaned copy of one of its members,
+    preferring an https spelling when the group has one.
+    """
+    groups: dict[str, list[str]] = {}
+    for url in urls:
+        groups.setdefault(canonical_key(url), []).append(url)
+
+    result: dict[str, list[str]] = {}
+    for members in groups.values():
+        originals = list(dict.fromkeys(members))
+        https = [u for u in originals if u.strip().lower().startswith("https://")]
+        result[clean_url(https[0] if https else originals[0])] = originals
+    return result
+
+
+def interleave_by_domain(urls: list[str]) -> list[str]:
+    """Reorder urls round-robin across registrable domains.
+
+    Keeps runs of same-domain URLs from filling every crawl slot and then
+    queueing behind the per-domain limit.
+    """
+    by_domain: dict[str, list[str]] = {}
+    for url in urls:
+        by_domain.setdefault(registrable_domain(url), []).append(url)
+    queues = list(by_domain.values())
+    ordered: list[str] = []
+    depth = 0
+    while len(ordered) < len(urls):
+        for queue in queues:
+            if depth < len(queue):
+                ordered.append(queue[depth])
+        depth += 1
+    return ordered